@@ -0,0 +1,207 @@
+"""
+Org-wide API governor - token-bucket rate limit plus concurrency cap for
+every call made through SalesforceClient's HTTP session.
+
+Tracks DailyApiRequests from /limits and the Sforce-Limit-Info response
+header, and slows down before the org runs out of API calls instead of
+waiting for 429 / REQUEST_LIMIT_EXCEEDED.
+"""
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from config import (
+    API_MAX_CONCURRENT_REQUESTS,
+    API_REQUESTS_PER_SECOND,
+    API_DAILY_RESERVE_PERCENT
+)
+
+
+class ApiGovernor:
+    """Thread-safe token bucket + semaphore shared by all exporters"""
+
+    MIN_RATE = 0.2  # Requests/second floor when the daily budget is nearly gone
+    LIMIT_INFO_PATTERN = re.compile(r'api-usage=(\d+)/(\d+)')
+
+    def __init__(self, max_concurrent: int = API_MAX_CONCURRENT_REQUESTS,
+                 requests_per_second: float = API_REQUESTS_PER_SECOND,
+                 reserve_percent: float = API_DAILY_RESERVE_PERCENT,
+                 status_callback: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the governor
+
+        Args:
+            max_concurrent: Maximum requests in flight at once
+            requests_per_second: Sustained request rate when budget is healthy
+            reserve_percent: Share of DailyApiRequests left for other integrations
+            status_callback: Optional logger for throttling messages
+        """
+        self.max_concurrent = max_concurrent
+        self.base_rate = float(requests_per_second)
+        self.reserve_percent = reserve_percent
+        self._log_callback = status_callback
+
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+
+        # Token bucket state
+        self.capacity = max(1.0, self.base_rate)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self.rate = self.base_rate
+
+        # Multiplicative penalty after 429s, recovers on healthy responses
+        self._penalty = 1.0
+        self._paused_until = 0.0
+
+        # Daily API budget (None until /limits or a response header is seen)
+        self.daily_max: Optional[int] = None
+        self.daily_remaining: Optional[int] = None
+
+        # Counters
+        self.total_requests = 0
+        self.throttle_events = 0
+
+    # ------------------------------------------------------------------
+    # Request gating
+    # ------------------------------------------------------------------
+
+    def acquire(self):
+        """Block until a concurrency slot and a rate token are available"""
+        self._semaphore.acquire()
+        try:
+            self._take_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self):
+        """Release the concurrency slot taken by acquire()"""
+        self._semaphore.release()
+
+    def _take_token(self):
+        """Wait for one token from the bucket"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    elapsed = now - self._last_refill
+                    self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                    self._last_refill = now
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        self.total_requests += 1
+                        return
+                    wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    # ------------------------------------------------------------------
+    # Feedback from Salesforce
+    # ------------------------------------------------------------------
+
+    def observe_response(self, response):
+        """Update budget and back off based on a completed response"""
+        limit_info = response.headers.get('Sforce-Limit-Info')
+        if limit_info:
+            self.update_from_header(limit_info)
+
+        if self._is_limit_error(response):
+            retry_after = response.headers.get('Retry-After')
+            try:
+                pause = float(retry_after) if retry_after else 5.0
+            except ValueError:
+                pause = 5.0
+            self._back_off(pause, response.status_code)
+        elif response.status_code < 400:
+            with self._lock:
+                if self._penalty < 1.0:
+                    self._penalty = min(1.0, self._penalty * 1.05)
+                    self._recompute_rate()
+
+    def update_from_header(self, header_value: str):
+        """Parse 'api-usage=used/max' from the Sforce-Limit-Info header"""
+        match = self.LIMIT_INFO_PATTERN.search(header_value or '')
+        if not match:
+            return
+        used, maximum = int(match.group(1)), int(match.group(2))
+        with self._lock:
+            self.daily_max = maximum
+            self.daily_remaining = max(0, maximum - used)
+            self._recompute_rate()
+
+    def update_from_limits(self, limits: Dict):
+        """Seed the daily budget from the /limits resource"""
+        daily = (limits or {}).get('DailyApiRequests') or {}
+        if 'Max' not in daily or 'Remaining' not in daily:
+            return
+        with self._lock:
+            self.daily_max = int(daily['Max'])
+            self.daily_remaining = int(daily['Remaining'])
+            self._recompute_rate()
+
+    def get_stats(self) -> Dict:
+        """Return a snapshot of governor state"""
+        with self._lock:
+            return {
+                'total_requests': self.total_requests,
+                'throttle_events': self.throttle_events,
+                'current_rate': round(self.rate, 2),
+                'daily_max': self.daily_max,
+                'daily_remaining': self.daily_remaining
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _is_limit_error(self, response) -> bool:
+        """Detect 429 and REQUEST_LIMIT_EXCEEDED responses"""
+        if response.status_code == 429:
+            return True
+        if response.status_code == 403:
+            try:
+                return 'REQUEST_LIMIT_EXCEEDED' in response.text
+            except Exception:
+                return False
+        return False
+
+    def _back_off(self, pause_seconds: float, status_code: int):
+        """Pause all callers and halve the rate after a limit error"""
+        with self._lock:
+            self.throttle_events += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + pause_seconds)
+            self._penalty = max(0.05, self._penalty / 2)
+            self._recompute_rate()
+            new_rate = self.rate
+        self._log(f"⚠️ API limit hit (HTTP {status_code}) - pausing {pause_seconds:.0f}s, "
+                  f"rate reduced to {new_rate:.1f} req/s")
+
+    def _recompute_rate(self):
+        """Derive the current rate from the daily budget and penalty (lock held)"""
+        budget_factor = 1.0
+        if self.daily_max and self.daily_remaining is not None:
+            remaining_pct = 100.0 * self.daily_remaining / self.daily_max
+            reserve = self.reserve_percent
+            if remaining_pct <= reserve:
+                budget_factor = 0.0
+            elif remaining_pct <= reserve * 2:
+                budget_factor = 0.25
+            elif remaining_pct <= reserve * 4:
+                budget_factor = 0.5
+
+        old_rate = self.rate
+        self.rate = max(self.MIN_RATE, self.base_rate * budget_factor * self._penalty)
+
+        if budget_factor == 0.0 and old_rate > self.MIN_RATE:
+            self._log(f"⚠️ Daily API budget at reserve ({self.daily_remaining}/{self.daily_max} left) - "
+                      f"throttling to {self.MIN_RATE} req/s")
+
+    def _log(self, message: str):
+        """Log status message"""
+        if self._log_callback:
+            self._log_callback(message)
+        else:
+            print(message)
@@ -0,0 +1,210 @@
+"""
+Bulk API 2.0 query jobs - for SOQL extracts too large for REST paging
+
+Creates a query job, polls it until Salesforce has finished, then downloads
+the result CSV chunk by chunk (following the Sforce-Locator header) and
+streams every chunk straight into the output file.
+"""
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+
+from config import (
+    BULK_QUERY_POLL_INTERVAL,
+    BULK_QUERY_MAX_POLL_INTERVAL,
+    BULK_QUERY_MAX_RECORDS_PER_CHUNK,
+    CONTENT_DOWNLOAD_CHUNK_SIZE
+)
+
+
+class BulkQueryError(Exception):
+    """Raised when a Bulk API 2.0 query job cannot be completed"""
+
+
+class BulkQueryJob:
+    """One Bulk API 2.0 query job (create -> poll -> download results)"""
+
+    FINAL_STATES = {'JobComplete', 'Failed', 'Aborted'}
+
+    def __init__(self, http_session: requests.Session, base_url: str, api_version: str,
+                 headers: Dict[str, str]):
+        """
+        Initialize the job client
+
+        Args:
+            http_session: Shared pooled session
+            base_url: Salesforce instance URL
+            api_version: API version (e.g., "65.0")
+            headers: Request headers with authorization
+        """
+        self.http = http_session
+        self.base_url = base_url
+        self.api_version = str(api_version)
+        self.headers = headers
+        self.job_id: Optional[str] = None
+
+    @classmethod
+    def from_client(cls, sf_client) -> 'BulkQueryJob':
+        """Build a job bound to a connected SalesforceClient (reuses its pooled session)"""
+        return cls(
+            http_session=sf_client.http_session,
+            base_url=sf_client.base_url,
+            api_version=sf_client.api_version,
+            headers=sf_client.headers
+        )
+
+    def run_to_csv(self, soql: str, output_path: str, include_deleted: bool = False,
+                   progress_callback: Optional[Callable[[str], None]] = None) -> int:
+        """
+        Run a query job and stream its results into a CSV file
+
+        Args:
+            soql: SOQL query (no aggregates or child subqueries - Bulk API limits)
+            output_path: CSV file to write
+            include_deleted: Use queryAll (deleted and archived records included)
+            progress_callback: Optional callback for status lines
+
+        Returns:
+            Number of records written
+        """
+        self.create(soql, include_deleted)
+        if progress_callback:
+            progress_callback(f"Bulk API job {self.job_id} created")
+
+        job_info = self.wait(progress_callback)
+        if progress_callback:
+            progress_callback(f"Bulk API job finished: {job_info.get('numberRecordsProcessed', 0)} records")
+
+        return self.download_results(output_path, progress_callback)
+
+    def create(self, soql: str, include_deleted: bool = False) -> str:
+        """
+        Create the query job
+
+        Returns:
+            Job Id
+        """
+        response = self.http.post(
+            self._url('jobs/query'),
+            headers=self.headers,
+            json={
+                'operation': 'queryAll' if include_deleted else 'query',
+                'query': soql,
+                'contentType': 'CSV',
+                'columnDelimiter': 'COMMA',
+                'lineEnding': 'LF'
+            },
+            timeout=60
+        )
+        if response.status_code not in (200, 201):
+            raise BulkQueryError(f"Could not create Bulk API job (HTTP {response.status_code}): {response.text}")
+
+        self.job_id = response.json()['id']
+        return self.job_id
+
+    def wait(self, progress_callback: Optional[Callable[[str], None]] = None) -> Dict:
+        """
+        Poll the job until it reaches a final state
+
+        The interval starts at BULK_QUERY_POLL_INTERVAL and doubles up to
+        BULK_QUERY_MAX_POLL_INTERVAL, so long jobs cost few API calls.
+
+        Returns:
+            Final job info
+
+        Raises:
+            BulkQueryError: When the job failed or was aborted
+        """
+        interval = BULK_QUERY_POLL_INTERVAL
+        while True:
+            response = self.http.get(self._url(f"jobs/query/{self.job_id}"), headers=self.headers, timeout=60)
+            if response.status_code != 200:
+                raise BulkQueryError(f"Could not poll Bulk API job (HTTP {response.status_code}): {response.text}")
+
+            job_info = response.json()
+            state = job_info.get('state')
+            if state in self.FINAL_STATES:
+                if state != 'JobComplete':
+                    raise BulkQueryError(f"Bulk API job {state}: {job_info.get('errorMessage', '')}")
+                return job_info
+
+            if progress_callback:
+                progress_callback(f"Bulk API job {state} ({job_info.get('numberRecordsProcessed', 0)} records so far)")
+            time.sleep(interval)
+            interval = min(interval * 2, BULK_QUERY_MAX_POLL_INTERVAL)
+
+    def download_results(self, output_path: str,
+                         progress_callback: Optional[Callable[[str], None]] = None) -> int:
+        """
+        Stream every result chunk into one CSV file
+
+        Each chunk is a complete CSV with its own header row; the header is
+        kept from the first chunk only. Chunks are read with Sforce-Locator
+        until Salesforce returns the locator "null".
+
+        Returns:
+            Number of records written
+        """
+        records_written = 0
+        locator = None
+
+        with open(output_path, 'wb') as csv_file:
+            while True:
+                params = {'maxRecords': BULK_QUERY_MAX_RECORDS_PER_CHUNK}
+                if locator:
+                    params['locator'] = locator
+
+                with self.http.get(
+                    self._url(f"jobs/query/{self.job_id}/results"),
+                    headers={**self.headers, 'Accept': 'text/csv'},
+                    params=params,
+                    timeout=300,
+                    stream=True
+                ) as response:
+                    if response.status_code != 200:
+                        raise BulkQueryError(
+                            f"Could not download Bulk API results (HTTP {response.status_code}): {response.text}"
+                        )
+
+                    self._write_chunk(response, csv_file, skip_header=locator is not None)
+
+                    records_written += int(response.headers.get('Sforce-NumberOfRecords', 0))
+                    locator = response.headers.get('Sforce-Locator')
+
+                if progress_callback:
+                    progress_callback(f"Downloaded {records_written} records")
+
+                if not locator or locator == 'null':
+                    break
+
+        return records_written
+
+    def abort(self):
+        """Abort the job (e.g. when the user cancels)"""
+        if not self.job_id:
+            return
+        try:
+            self.http.patch(
+                self._url(f"jobs/query/{self.job_id}"),
+                headers=self.headers,
+                json={'state': 'Aborted'},
+                timeout=30
+            )
+        except Exception:
+            pass
+
+    def _write_chunk(self, response: requests.Response, csv_file, skip_header: bool):
+        """Copy one result chunk to the file, optionally dropping its header line"""
+        for block in response.iter_content(chunk_size=CONTENT_DOWNLOAD_CHUNK_SIZE):
+            if skip_header:
+                newline = block.find(b'\n')
+                if newline == -1:
+                    continue
+                block = block[newline + 1:]
+                skip_header = False
+            csv_file.write(block)
+
+    def _url(self, path: str) -> str:
+        """Build a full Bulk API 2.0 URL"""
+        return f"{self.base_url}/services/data/v{self.api_version}/{path}"
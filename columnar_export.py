@@ -0,0 +1,204 @@
+"""
+Typed columnar output (Parquet / Arrow IPC) for query exports
+
+Column types are mapped from Salesforce describe field types, so numbers,
+dates and booleans keep their types instead of turning into CSV strings.
+Rows are buffered column by column and written one row group (Parquet) or
+record batch (Arrow IPC) at a time, keeping memory bounded by
+COLUMNAR_ROW_GROUP_SIZE regardless of the export size. A typed column whose
+first row group does not convert is written as strings instead of failing
+the export.
+
+pyarrow is optional: without it PYARROW_AVAILABLE is False and only CSV
+exports are offered.
+"""
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config import COLUMNAR_ROW_GROUP_SIZE
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    PYARROW_AVAILABLE = False
+
+# File extension -> columnar format
+COLUMNAR_FORMATS = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+
+# Describe field type -> Arrow type name (anything else is stored as a string)
+FIELD_TYPE_MAP = {
+    'boolean': 'bool',
+    'int': 'int64',
+    'long': 'int64',
+    'double': 'float64',
+    'currency': 'float64',
+    'percent': 'float64',
+    'date': 'date',
+    'datetime': 'timestamp',
+}
+
+
+def columnar_format_for(path: str) -> Optional[str]:
+    """
+    Get the columnar format an output path asks for
+
+    Returns:
+        'parquet', 'arrow', or None for CSV (and any other extension)
+    """
+    return COLUMNAR_FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def _arrow_type_for(type_name: Optional[str]):
+    """Arrow type of a FIELD_TYPE_MAP type name (None -> string)"""
+    if type_name == 'bool':
+        return pa.bool_()
+    if type_name == 'int64':
+        return pa.int64()
+    if type_name == 'float64':
+        return pa.float64()
+    if type_name == 'date':
+        return pa.date32()
+    if type_name == 'timestamp':
+        return pa.timestamp('ms', tz='UTC')
+    return pa.string()
+
+
+def _convert_value(value, type_name: Optional[str]):
+    """Convert one API value to the Python type Arrow expects for its column"""
+    if value is None or value == '':
+        return None
+    if type_name == 'date':
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    if type_name == 'timestamp':
+        # e.g. 2024-05-01T10:00:00.000+0000
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f%z')
+    if type_name == 'int64':
+        return int(value)
+    if type_name == 'float64':
+        return float(value)
+    if type_name == 'bool':
+        return value if isinstance(value, bool) else str(value).lower() == 'true'
+    return value if isinstance(value, str) else str(value)
+
+
+def _convert_values(values: List, type_name: Optional[str]) -> Tuple[List, int]:
+    """
+    Convert a column's values, replacing the ones that do not fit with None
+
+    Returns:
+        Tuple of (converted values, number of values that did not convert)
+    """
+    converted = []
+    failures = 0
+    for value in values:
+        try:
+            converted.append(_convert_value(value, type_name))
+        except (ValueError, TypeError):
+            converted.append(None)
+            failures += 1
+    return converted, failures
+
+
+class ColumnarWriter:
+    """Streams rows into a Parquet or Arrow IPC file, one row group at a time"""
+
+    def __init__(self, output_path: str, columns: List[str], field_types: Dict[str, Optional[str]],
+                 file_format: str = 'parquet', row_group_size: int = COLUMNAR_ROW_GROUP_SIZE):
+        """
+        Prepare the output file (opened when the first row group is written)
+
+        Args:
+            output_path: File to write
+            columns: Column names, in output order
+            field_types: Column name -> describe field type (None when unknown)
+            file_format: 'parquet' or 'arrow'
+            row_group_size: Rows buffered before a row group is written
+        """
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet/Arrow export needs pyarrow (pip install pyarrow)")
+
+        self.output_path = output_path
+        self.file_format = file_format
+        self.columns = columns
+        self.type_names = [FIELD_TYPE_MAP.get((field_types.get(column) or '').lower()) for column in columns]
+        self.schema = None
+        self.row_group_size = max(1, row_group_size)
+        self.rows_written = 0
+        self.unconverted_values = 0
+        # Records are matched to columns ignoring field-name case
+        self._column_index = {column.lower(): index for index, column in enumerate(columns)}
+        self._buffer: List[List] = [[] for _ in columns]
+        self._buffered = 0
+        self._writer = None
+
+    def write_rows(self, rows: List[Dict]):
+        """Buffer cleaned records, writing a row group whenever the buffer is full"""
+        for row in rows:
+            values = [None] * len(self.columns)
+            for key, value in row.items():
+                index = self._column_index.get(key.lower())
+                if index is not None:
+                    values[index] = value
+            for column_values, value in zip(self._buffer, values):
+                column_values.append(value)
+            self._buffered += 1
+            if self._buffered >= self.row_group_size:
+                self._flush()
+
+    def close(self):
+        """
+        Write the last (partial) row group and finish the file
+
+        Values that did not match their column type (written as null) are
+        counted in unconverted_values for the caller to report.
+        """
+        self._flush()
+        if self._writer is None:
+            # No rows at all - still leave a valid (empty) file
+            self._open()
+        self._writer.close()
+
+    def _open(self):
+        """
+        Fix the schema and open the writer
+
+        Typed columns whose first row group does not convert (e.g. localized
+        FORMAT() output) are written as strings instead.
+        """
+        for index, type_name in enumerate(self.type_names):
+            if type_name and _convert_values(self._buffer[index], type_name)[1]:
+                self.type_names[index] = None
+
+        self.schema = pa.schema([
+            pa.field(column, _arrow_type_for(type_name))
+            for column, type_name in zip(self.columns, self.type_names)
+        ])
+
+        if self.file_format == 'parquet':
+            self._writer = pyarrow.parquet.ParquetWriter(self.output_path, self.schema, compression='snappy')
+        else:
+            self._writer = pyarrow.ipc.new_file(self.output_path, self.schema)
+
+    def _flush(self):
+        """Write the buffered rows as one row group / record batch"""
+        if not self._buffered:
+            return
+        if self._writer is None:
+            self._open()
+
+        arrays = []
+        for values, type_name, field in zip(self._buffer, self.type_names, self.schema):
+            converted, failures = _convert_values(values, type_name)
+            # The schema is fixed once the file is open - later misfits become null
+            self.unconverted_values += failures
+            arrays.append(pa.array(converted, type=field.type))
+
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.rows_written += self._buffered
+        self._buffer = [[] for _ in self.columns]
+        self._buffered = 0
@@ -0,0 +1,170 @@
+"""
+Composite batch helper - packs up to 25 REST or Tooling subrequests into a
+single /composite/batch (or /tooling/composite/batch) round trip.
+
+Call sites queue subrequests with add() / add_query() and then call
+execute(), which returns one result per subrequest in the order queued.
+"""
+import urllib.parse
+from typing import Dict, List, Optional
+
+import requests
+
+
+class CompositeBatch:
+    """Queues subrequests and sends them in composite batches of 25"""
+
+    MAX_SUBREQUESTS = 25
+
+    def __init__(self, http_session: requests.Session, base_url: str, api_version: str,
+                 headers: Dict[str, str], tooling: bool = False, halt_on_error: bool = False):
+        """
+        Initialize the batch
+
+        Args:
+            http_session: Shared pooled session used for the batch calls
+            base_url: Salesforce instance URL
+            api_version: API version (e.g., "65.0")
+            headers: Request headers with authorization
+            tooling: Send to /tooling/composite/batch instead of /composite/batch
+            halt_on_error: Stop the remaining subrequests of a batch after the first failure
+        """
+        self.http = http_session
+        self.base_url = base_url
+        self.api_version = str(api_version)
+        self.headers = headers
+        self.tooling = tooling
+        self.halt_on_error = halt_on_error
+        self._pending: List[Dict] = []
+
+    @classmethod
+    def from_sf(cls, sf, tooling: bool = False, halt_on_error: bool = False) -> 'CompositeBatch':
+        """
+        Build a batch from a simple_salesforce connection, reusing its session
+
+        Args:
+            sf: simple_salesforce connection
+            tooling: Target the Tooling API
+            halt_on_error: Stop a batch after the first failing subrequest
+
+        Returns:
+            CompositeBatch bound to the connection's instance and session
+        """
+        return cls(
+            http_session=getattr(sf, 'session', None) or requests.Session(),
+            base_url=f"https://{sf.sf_instance}",
+            api_version=sf.sf_version,
+            headers={
+                'Authorization': f'Bearer {sf.session_id}',
+                'Content-Type': 'application/json'
+            },
+            tooling=tooling,
+            halt_on_error=halt_on_error
+        )
+
+    def add(self, path: str, method: str = 'GET', rich_input: Optional[Dict] = None) -> int:
+        """
+        Queue a subrequest
+
+        Args:
+            path: Resource path relative to the API root,
+                  e.g. "sobjects/Account/describe" or "query/?q=..."
+            method: HTTP method of the subrequest
+            rich_input: Optional request body for PATCH/POST subrequests
+
+        Returns:
+            Index of the subrequest in the results returned by execute()
+        """
+        prefix = 'tooling/' if self.tooling else ''
+        subrequest = {
+            'method': method,
+            'url': f"v{self.api_version}/{prefix}{path.lstrip('/')}"
+        }
+        if rich_input is not None:
+            subrequest['richInput'] = rich_input
+        self._pending.append(subrequest)
+        return len(self._pending) - 1
+
+    def add_query(self, soql: str) -> int:
+        """Queue a SOQL query subrequest (first page of results only)"""
+        return self.add(f"query/?q={urllib.parse.quote(soql)}")
+
+    def execute(self) -> List[Dict]:
+        """
+        Send all queued subrequests, 25 per round trip
+
+        Returns:
+            One {'statusCode': int, 'result': ...} dict per queued subrequest,
+            in queue order. A failed batch call yields its status code and
+            error text for every subrequest in that batch.
+        """
+        pending, self._pending = self._pending, []
+        results: List[Dict] = []
+
+        prefix = 'tooling/' if self.tooling else ''
+        url = f"{self.base_url}/services/data/v{self.api_version}/{prefix}composite/batch"
+
+        for start in range(0, len(pending), self.MAX_SUBREQUESTS):
+            chunk = pending[start:start + self.MAX_SUBREQUESTS]
+            payload = {
+                'haltOnError': self.halt_on_error,
+                'batchRequests': chunk
+            }
+
+            try:
+                response = self.http.post(url, headers=self.headers, json=payload, timeout=120)
+            except Exception as e:
+                results.extend(self._failed_chunk(len(chunk), 0, str(e)))
+                continue
+
+            if response.status_code != 200:
+                results.extend(self._failed_chunk(len(chunk), response.status_code, response.text))
+                continue
+
+            chunk_results = response.json().get('results', [])
+            # Pad in case Salesforce returned fewer entries than requested
+            if len(chunk_results) < len(chunk):
+                chunk_results = chunk_results + self._failed_chunk(
+                    len(chunk) - len(chunk_results), 0, 'No result returned'
+                )
+            results.extend(chunk_results[:len(chunk)])
+
+        return results
+
+    def query_many(self, queries: List[str]) -> List[Dict]:
+        """
+        Run several SOQL queries in composite batches
+
+        Args:
+            queries: SOQL statements
+
+        Returns:
+            Query result dict per statement, in order. Failed subrequests
+            come back as {'records': [], 'error': <message>}.
+        """
+        for soql in queries:
+            self.add_query(soql)
+
+        query_results = []
+        for item in self.execute():
+            if item.get('statusCode') == 200 and isinstance(item.get('result'), dict):
+                query_results.append(item['result'])
+            else:
+                query_results.append({'records': [], 'error': self.error_message(item)})
+        return query_results
+
+    @staticmethod
+    def error_message(item: Dict) -> str:
+        """Extract a readable error message from a failed subrequest result"""
+        result = item.get('result')
+        if isinstance(result, list) and result and isinstance(result[0], dict):
+            return result[0].get('message') or str(result[0])
+        return f"HTTP {item.get('statusCode')}: {result}"
+
+    @staticmethod
+    def _failed_chunk(count: int, status_code: int, message: str) -> List[Dict]:
+        """Build placeholder results for subrequests whose batch call failed"""
+        return [
+            {'statusCode': status_code, 'result': [{'message': message}]}
+            for _ in range(count)
+        ]
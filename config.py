@@ -16,4 +16,35 @@ COLOR_THEME = "blue"
 # Export Configuration
 DEFAULT_PICKLIST_FILENAME = 'Picklist_Export_{timestamp}.xlsx'
 DEFAULT_METADATA_FILENAME = 'Object_Metadata_{timestamp}.csv'
-DEFAULT_CONTENTDOCUMENT_FILENAME = 'ContentDocument_Export_{timestamp}.csv'
\ No newline at end of file
+DEFAULT_CONTENTDOCUMENT_FILENAME = 'ContentDocument_Export_{timestamp}.csv'
+# HTTP Connection Pool Configuration
+HTTP_POOL_CONNECTIONS = 10  # Number of distinct hosts kept in the pool
+HTTP_POOL_MAXSIZE = 20  # Keep-alive connections kept per host
+HTTP_MAX_RETRIES = 3  # Transport-level retries for connection errors
+
+# Local Cache Configuration
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.sf_meta_exporter')
+DESCRIBE_CACHE_MEMORY_SIZE = 256  # sObject describes kept in memory (LRU)
+DESCRIBE_PREFETCH_WINDOW = 128  # Describes prefetched at a time just ahead of an export loop (<= LRU size)
+
+# API Governor Configuration
+API_MAX_CONCURRENT_REQUESTS = 10  # Requests in flight across all exporters
+API_REQUESTS_PER_SECOND = 20  # Sustained request rate while the daily budget is healthy
+API_DAILY_RESERVE_PERCENT = 10  # Share of DailyApiRequests left for other integrations
+
+# Export Pipeline Configuration
+PICKLIST_EXPORT_WORKERS = 8  # Objects processed in parallel by the picklist exporter
+METADATA_EXPORT_WORKERS = 4  # Objects processed in parallel by the metadata exporter
+USAGE_CATEGORY_TIMEOUT = 300  # Seconds a usage category may take before it is skipped
+CONTENT_DOWNLOAD_WORKERS = 8  # ContentDocuments downloaded in parallel (keep <= HTTP_POOL_MAXSIZE)
+CONTENT_DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # Bytes per streamed write while downloading files
+CONTENT_DEDUPLICATE = False  # Download each distinct ContentVersion.Checksum once, hardlink the rest
+
+# SOQL Export Configuration
+BULK_QUERY_THRESHOLD = 200000  # Rows (from a COUNT() probe) above which exports use Bulk API 2.0
+BULK_QUERY_POLL_INTERVAL = 2  # Seconds before the first Bulk API job status poll (doubles each time)
+BULK_QUERY_MAX_POLL_INTERVAL = 30  # Longest wait between Bulk API job status polls
+BULK_QUERY_MAX_RECORDS_PER_CHUNK = 100000  # Records per Bulk API result download (Sforce-Locator page)
+COLUMNAR_ROW_GROUP_SIZE = 50000  # Rows per Parquet row group / Arrow record batch (bounds memory)
+PK_CHUNK_SIZE = 250000  # Target rows per Id range (SOQL CSV exports above it run PK-chunked)
+PK_CHUNK_WORKERS = 4  # Id ranges exported in parallel (capped by API_MAX_CONCURRENT_REQUESTS)
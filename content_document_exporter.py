@@ -3,28 +3,71 @@ ContentDocument export functionality - exports metadata and downloads files
 """
 import os
 import csv
-import requests
-from typing import List, Dict, Tuple
+import hashlib
+import shutil
+import threading
+from datetime import datetime, timezone
+from typing import Iterator, List, Dict, Optional, Tuple
+from config import CONTENT_DOWNLOAD_WORKERS, CONTENT_DOWNLOAD_CHUNK_SIZE, CONTENT_DEDUPLICATE
 from salesforce_client import SalesforceClient
+from content_manifest import DownloadManifest
+from worker_pool import OrderedWorkerPool
+
+
+# How a version's file came to be on disk
+DOWNLOADED = 'downloaded'  # Fetched from Salesforce in this run
+RESUMED = 'resumed'        # Verified by the manifest of an earlier run
+LINKED = 'linked'          # Hardlink (or copy) of an identical file fetched in this run
 
 
 class ContentDocumentExporter:
     """Handles ContentDocument metadata export and file downloads from Salesforce"""
     
-    def __init__(self, sf_client: SalesforceClient):
-        """Initialize with Salesforce client"""
+    VERSION_QUERY_CHUNK_SIZE = 200  # ContentDocument Ids per ContentVersion query
+    
+    def __init__(self, sf_client: SalesforceClient, max_workers: int = CONTENT_DOWNLOAD_WORKERS):
+        """
+        Initialize with Salesforce client
+        
+        Args:
+            sf_client: Connected client (its pooled keep-alive session is shared by all workers)
+            max_workers: Documents downloaded in parallel
+        """
         self.sf_client = sf_client
         self.sf = sf_client.sf
         self.base_url = sf_client.base_url
         self.headers = sf_client.headers
+        self.http = sf_client.http_session
+        
+        # ✅ PARALLEL: documents are downloaded on a bounded pool; results,
+        # stats and CSV rows are still handled in query order
+        self.worker_pool = OrderedWorkerPool(
+            max_workers,
+            emit=self._emit_status,
+            thread_name_prefix='content-download'
+        )
+        
+        # Dedup mode: checksum -> first file written with that content
+        self._deduplicate = False
+        self._locks_guard = threading.Lock()
+        self._checksum_locks: Dict[str, threading.Lock] = {}
+        self._checksum_paths: Dict[str, str] = {}
     
     
-    def export_content_documents(self, output_path: str) -> Tuple[str, Dict]:
+    def export_content_documents(self, output_path: str,
+                                 deduplicate: bool = CONTENT_DEDUPLICATE,
+                                 incremental: bool = False) -> Tuple[str, Dict]:
         """
         Export ContentDocument metadata to CSV and download all file versions
         
         Args:
             output_path: Path for the CSV file
+            deduplicate: Download each distinct ContentVersion.Checksum once and
+                         hardlink the file for every other version with that content
+            incremental: Only export documents and versions modified since the
+                         org's last complete export into this folder; files are
+                         added to the existing Documents/ folder and the rows go
+                         to a separate delta CSV next to output_path
             
         Returns:
             Tuple of (csv_path, statistics_dict)
@@ -35,9 +78,13 @@ class ContentDocumentExporter:
             'total_documents': 0,
             'total_versions': 0,
             'successful_downloads': 0,
+            'skipped_downloads': 0,
+            'deduplicated_downloads': 0,
+            'deduplicated_bytes': 0,
             'failed_downloads': 0,
             'total_size_bytes': 0,
-            'failed_files': []
+            'failed_files': [],
+            'incremental_since': None
         }
         
         # Create Documents folder in same directory as CSV
@@ -48,72 +95,177 @@ class ContentDocumentExporter:
             os.makedirs(documents_folder)
             self._log_status(f"Created folder: {documents_folder}")
         
-        # Query all ContentDocuments
-        self._log_status("Querying ContentDocument records...")
-        content_documents = self._query_content_documents()
-        stats['total_documents'] = len(content_documents)
+        # ✅ RESUMABLE: versions verified by an earlier run into this folder are skipped
+        manifest = DownloadManifest(csv_dir)
+        try:
+            since = manifest.get_watermark(self.sf_client.org_id) if incremental else None
+            if since:
+                stats['incremental_since'] = since
+                output_path = self._delta_csv_path(output_path)
+                self._log_status(f"Incremental export: changes since {since}")
+            elif incremental:
+                self._log_status("Incremental export: no previous export in this folder, exporting everything")
+            
+            # Query all ContentDocuments
+            self._log_status("Querying ContentDocument records...")
+            content_documents = self._query_content_documents(since)
+            stats['total_documents'] = len(content_documents)
+            
+            self._log_status(f"Found {len(content_documents)} ContentDocument records")
+            
+            if len(content_documents) == 0:
+                self._log_status("No ContentDocument records found in org" if not since
+                                 else "No ContentDocument changes since the last export")
+                # Still create empty CSV
+                self._create_csv_file([], output_path)
+                return output_path, stats
+            
+            # Query the versions of every document up front (chunked, not one query per document)
+            self._log_status("Querying ContentVersion records...")
+            versions_by_document, failed_documents = self._query_all_versions(
+                [doc['Id'] for doc in content_documents]
+            )
+            self._log_status(f"Found {sum(len(versions) for versions in versions_by_document.values())} "
+                             f"ContentVersion records")
+            
+            # Documents whose versions could not be queried count as failures,
+            # so the watermark below is not advanced past them
+            for doc in content_documents:
+                if doc['Id'] in failed_documents:
+                    stats['failed_downloads'] += 1
+                    stats['failed_files'].append({
+                        'filename': doc.get('Title', ''),
+                        'id': doc['Id'],
+                        'version': 'all',
+                        'reason': f"ContentVersion query failed: {failed_documents[doc['Id']]}"
+                    })
+            
+            # Total_Versions_Available always counts every version of a document,
+            # even when a delta export only downloads the changed ones
+            version_totals = {doc_id: len(versions) for doc_id, versions in versions_by_document.items()}
+            high_water_mark = self._high_water_mark(content_documents, versions_by_document, since)
+            if since:
+                versions_by_document = {
+                    doc_id: [version for version in versions if (version.get('LastModifiedDate') or '') > since]
+                    for doc_id, versions in versions_by_document.items()
+                }
+            
+            # This will hold all version data for CSV
+            all_version_data = []
+            
+            self._deduplicate = deduplicate
+            self._checksum_locks = {}
+            self._checksum_paths = {}
+            if deduplicate:
+                self._log_status("Deduplication enabled: identical files are downloaded once and hardlinked")
+            
+            self._collect_downloads(content_documents, versions_by_document, version_totals,
+                                    documents_folder, manifest, stats, all_version_data)
+            
+            # Only advance the watermark when nothing failed (downloads or version
+            # queries), so failed versions are picked up again by the next incremental run
+            if stats['failed_downloads'] == 0 and high_water_mark:
+                manifest.set_watermark(self.sf_client.org_id, high_water_mark)
+            elif stats['failed_downloads']:
+                self._log_status("⚠️ Some downloads failed - the incremental watermark was not advanced")
+        finally:
+            manifest.close()
         
-        self._log_status(f"Found {len(content_documents)} ContentDocument records")
+        if stats['deduplicated_downloads']:
+            saved_mb = stats['deduplicated_bytes'] / (1024 * 1024)
+            self._log_status(f"\n🔗 Linked {stats['deduplicated_downloads']} duplicate version(s) "
+                             f"instead of downloading them ({saved_mb:.2f} MB saved)")
         
-        if len(content_documents) == 0:
-            self._log_status("No ContentDocument records found in org")
-            # Still create empty CSV
-            self._create_csv_file([], output_path)
-            return output_path, stats
+        if stats['skipped_downloads']:
+            self._log_status(f"\n⏭️ Skipped {stats['skipped_downloads']} version(s) already downloaded by a previous run")
+        
+        # Create CSV with all version data
+        self._log_status("\n=== Creating CSV File ===")
+        final_output_path = self._create_csv_file(all_version_data, output_path)
         
-        # This will hold all version data for CSV
-        all_version_data = []
+        return final_output_path, stats
+    
+    def get_incremental_watermark(self, output_path: str) -> Optional[str]:
+        """
+        Get the high-water mark an incremental export into this folder would start from
         
-        # Process each ContentDocument
-        for doc_index, doc in enumerate(content_documents, 1):
+        Args:
+            output_path: Path for the CSV file (its folder holds the manifest)
+            
+        Returns:
+            Salesforce datetime string, or None when no complete export exists there
+        """
+        csv_dir = os.path.dirname(output_path)
+        if not os.path.exists(os.path.join(csv_dir, DownloadManifest.FILENAME)):
+            return None
+        manifest = DownloadManifest(csv_dir)
+        try:
+            return manifest.get_watermark(self.sf_client.org_id)
+        finally:
+            manifest.close()
+    
+    def _collect_downloads(self, content_documents: List[Dict], versions_by_document: Dict[str, List[Dict]],
+                           version_totals: Dict[str, int], documents_folder: str,
+                           manifest: DownloadManifest, stats: Dict, all_version_data: List[Dict]):
+        """
+        Download all documents on the worker pool and fold the results into stats and CSV rows
+        
+        Args:
+            content_documents: ContentDocument records in output order
+            versions_by_document: ContentDocument Id -> ContentVersion records to download
+            version_totals: ContentDocument Id -> number of versions in the org
+            documents_folder: Folder to save the files
+            manifest: Journal of verified downloads
+            stats: Statistics dict (updated in place)
+            all_version_data: CSV rows (appended in place)
+        """
+        # Process each ContentDocument (downloads run on the worker pool)
+        for doc_index, doc, downloads, error in self._iter_downloaded_documents(
+                content_documents, versions_by_document, documents_folder, manifest):
             doc_id = doc['Id']
             title = doc['Title']
             file_extension = doc.get('FileExtension', '')
             
-            self._log_status(f"\n[{doc_index}/{len(content_documents)}] Processing: {title}")
-            
-            # Query all versions for this document
-            versions = self._query_all_versions(doc_id)
+            if error:
+                self._log_status(f"  ❌ ERROR: {str(error)}")
+                # Every version the document was meant to download failed with it
+                failed_versions = versions_by_document.get(doc_id, [])
+                stats['total_versions'] += len(failed_versions)
+                for version_number in [version['VersionNumber'] for version in failed_versions] or ['all']:
+                    stats['failed_downloads'] += 1
+                    stats['failed_files'].append({
+                        'filename': self._failed_filename(title, doc_id, version_number, file_extension),
+                        'id': doc_id,
+                        'version': version_number,
+                        'reason': str(error)
+                    })
+                continue
             
+            versions = [download[0] for download in downloads]
             if not versions:
-                self._log_status(f"  ⚠️ No versions found for {title}")
                 continue
             
             stats['total_versions'] += len(versions)
-            total_versions_count = len(versions)
-            
-            self._log_status(f"  Found {total_versions_count} version(s)")
+            total_versions_count = version_totals.get(doc_id, len(versions))
             
-            # Download each version
-            for version_index, version in enumerate(versions, 1):
-                version_id = version['Id']
+            for version, file_path, download_error, outcome in downloads:
                 version_number = version['VersionNumber']
-                is_latest = version['IsLatest']
-                content_size = version.get('ContentSize', 0)
                 
-                self._log_status(f"  [{version_index}/{total_versions_count}] Downloading version {version_number}...")
-                
-                try:
-                    # Download the file
-                    file_path = self._download_file(
-                        document_id=doc_id,
-                        title=title,
-                        file_extension=file_extension,
-                        version_id=version_id,
-                        version_number=version_number,
-                        destination_folder=documents_folder
-                    )
-                    
+                if download_error is None:
                     # Extract just the filename from full path
                     downloaded_filename = os.path.basename(file_path)
                     
                     # Build PathOnClient (relative path for DataLoader)
                     path_on_client = f"Documents/{downloaded_filename}"
                     
-                    stats['successful_downloads'] += 1
-                    stats['total_size_bytes'] += content_size
-                    
-                    self._log_status(f"    ✅ Downloaded: {downloaded_filename}")
+                    if outcome == RESUMED:
+                        stats['skipped_downloads'] += 1
+                    elif outcome == LINKED:
+                        stats['deduplicated_downloads'] += 1
+                        stats['deduplicated_bytes'] += version.get('ContentSize', 0)
+                    else:
+                        stats['successful_downloads'] += 1
+                        stats['total_size_bytes'] += version.get('ContentSize', 0)
                     
                     # Build version data for CSV
                     version_data = {
@@ -122,48 +274,200 @@ class ContentDocumentExporter:
                         'downloaded_filename': downloaded_filename,
                         'path_on_client': path_on_client,
                         'version_number': version_number,
-                        'is_latest': is_latest,
+                        'is_latest': version['IsLatest'],
                         'total_versions': total_versions_count
                     }
                     
                     all_version_data.append(version_data)
                     
-                except Exception as e:
-                    error_msg = str(e)
-                    self._log_status(f"    ❌ ERROR: {error_msg}")
+                else:
                     stats['failed_downloads'] += 1
-                    
-                    # Build filename for error reporting
-                    if file_extension:
-                        filename = f"{title}_{doc_id}_v{version_number}.{file_extension}"
-                    else:
-                        filename = f"{title}_{doc_id}_v{version_number}"
-                    
                     stats['failed_files'].append({
-                        'filename': filename,
+                        'filename': self._failed_filename(title, doc_id, version_number, file_extension),
                         'id': doc_id,
                         'version': version_number,
-                        'reason': error_msg
+                        'reason': str(download_error)
                     })
+    
+    
+    def _failed_filename(self, title: str, doc_id: str, version_number, file_extension: str) -> str:
+        """Build the filename shown for a failed download in error reports"""
+        if file_extension:
+            return f"{title}_{doc_id}_v{version_number}.{file_extension}"
+        return f"{title}_{doc_id}_v{version_number}"
+    
+    def _iter_downloaded_documents(
+        self,
+        content_documents: List[Dict],
+        versions_by_document: Dict[str, List[Dict]],
+        documents_folder: str,
+        manifest: DownloadManifest
+    ) -> Iterator[Tuple[int, Dict, Optional[List[Tuple[Dict, Optional[str], Optional[Exception], str]]], Optional[Exception]]]:
+        """
+        ✅ PARALLEL: Run _download_document on the worker pool, yielding in query order
         
-        # Create CSV with all version data
-        self._log_status("\n=== Creating CSV File ===")
-        final_output_path = self._create_csv_file(all_version_data, output_path)
+        Args:
+            content_documents: ContentDocument records in output order
+            versions_by_document: ContentDocument Id -> ContentVersion records
+            documents_folder: Folder to save the files
+            manifest: Journal of verified downloads
+            
+        Yields:
+            Tuple of (position, document, downloads or None, error or None)
+        """
+        return self.worker_pool.imap(
+            lambda doc: self._download_document(
+                doc, versions_by_document.get(doc['Id'], []), documents_folder, manifest
+            ),
+            content_documents,
+            header=lambda i, total, doc: f"\n[{i}/{total}] Processing: {doc['Title']}"
+        )
+    
+    def _download_document(self, doc: Dict, versions: List[Dict], documents_folder: str,
+                           manifest: DownloadManifest
+                           ) -> List[Tuple[Dict, Optional[str], Optional[Exception], str]]:
+        """
+        Download every version of one ContentDocument (worker thread)
         
-        return final_output_path, stats
+        Args:
+            doc: ContentDocument record
+            versions: Its ContentVersion records in version order
+            documents_folder: Folder to save the files
+            manifest: Journal of verified downloads
+            
+        Returns:
+            List of (version, file path or None, error or None, outcome) in version order,
+            where outcome is DOWNLOADED, RESUMED or LINKED
+        """
+        doc_id = doc['Id']
+        title = doc['Title']
+        
+        if not versions:
+            self._log_status(f"  ⚠️ No versions found for {title}")
+            return []
+        
+        total_versions_count = len(versions)
+        self._log_status(f"  Found {total_versions_count} version(s)")
+        
+        downloads = []
+        for version_index, version in enumerate(versions, 1):
+            version_number = version['VersionNumber']
+            file_path = self._version_file_path(
+                doc_id, title, doc.get('FileExtension', ''), version_number, documents_folder
+            )
+            
+            if manifest.is_complete(version['Id'], file_path, version.get('ContentSize'), version.get('Checksum')):
+                self._log_status(f"  [{version_index}/{total_versions_count}] ⏭️ Already downloaded: "
+                                 f"{os.path.basename(file_path)}")
+                self._register_checksum(version.get('Checksum'), file_path)
+                downloads.append((version, file_path, None, RESUMED))
+                continue
+            
+            self._log_status(f"  [{version_index}/{total_versions_count}] Downloading version {version_number}...")
+            
+            try:
+                file_path, checksum, outcome = self._fetch_version(doc, version, file_path, documents_folder)
+                manifest.record(version['Id'], doc_id, file_path, os.path.getsize(file_path), checksum)
+                if outcome == LINKED:
+                    self._log_status(f"    🔗 Linked identical file: {os.path.basename(file_path)}")
+                else:
+                    self._log_status(f"    ✅ Downloaded: {os.path.basename(file_path)}")
+                downloads.append((version, file_path, None, outcome))
+                
+            except Exception as e:
+                self._log_status(f"    ❌ ERROR: {str(e)}")
+                downloads.append((version, None, e, DOWNLOADED))
+        
+        return downloads
+    
+    def _fetch_version(self, doc: Dict, version: Dict, file_path: str,
+                       documents_folder: str) -> Tuple[str, str, str]:
+        """
+        Put one version on disk - downloaded, or linked to identical content in dedup mode
+        
+        In dedup mode versions sharing a checksum are handled one at a time:
+        the first downloads, the others hardlink its file.
+        
+        Returns:
+            Tuple of (file path, MD5, outcome)
+        """
+        checksum = (version.get('Checksum') or '').lower()
+        
+        def download() -> Tuple[str, str, str]:
+            path, md5 = self._download_file(
+                document_id=doc['Id'],
+                title=doc['Title'],
+                file_extension=doc.get('FileExtension', ''),
+                version_id=version['Id'],
+                version_number=version['VersionNumber'],
+                destination_folder=documents_folder,
+                content_size=version.get('ContentSize'),
+                checksum=checksum
+            )
+            return path, md5, DOWNLOADED
+        
+        if not self._deduplicate or not checksum:
+            return download()
+        
+        with self._checksum_lock(checksum):
+            source_path = self._checksum_paths.get(checksum)
+            if source_path and os.path.isfile(source_path):
+                self._link_file(source_path, file_path)
+                return file_path, checksum, LINKED
+            
+            path, md5, outcome = download()
+            self._checksum_paths[checksum] = path
+            return path, md5, outcome
     
+    def _register_checksum(self, checksum: Optional[str], file_path: str):
+        """Offer an existing file as the dedup source for its checksum"""
+        if self._deduplicate and checksum:
+            with self._checksum_lock(checksum.lower()):
+                self._checksum_paths.setdefault(checksum.lower(), file_path)
+    
+    def _checksum_lock(self, checksum: str) -> threading.Lock:
+        """Get (or create) the lock guarding one checksum"""
+        with self._locks_guard:
+            if checksum not in self._checksum_locks:
+                self._checksum_locks[checksum] = threading.Lock()
+            return self._checksum_locks[checksum]
+    
+    def _link_file(self, source_path: str, target_path: str):
+        """
+        Hardlink target to source, copying when the filesystem has no hardlinks
+        
+        The link is created under a temp name and renamed into place, so a
+        stale file at the target is replaced atomically.
+        """
+        temp_path = f"{target_path}.part"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        try:
+            os.link(source_path, temp_path)
+        except OSError:
+            shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, target_path)
     
-    def _query_content_documents(self) -> List[Dict]:
-        """Query all ContentDocument records with standard fields"""
+    def _query_content_documents(self, since: Optional[str] = None) -> List[Dict]:
+        """
+        Query ContentDocument records with standard fields
+        
+        Args:
+            since: Optional Salesforce datetime; only documents modified after it are returned
+        """
         try:
+            # New versions bump the document's LastModifiedDate, so one filter covers both
+            where_clause = f"WHERE LastModifiedDate > {self._soql_datetime(since)}" if since else ""
+            
             # Query ContentDocument with standard fields
-            query = """
+            query = f"""
                 SELECT Id, Title, FileExtension, FileType, ContentSize, 
                        CreatedDate, CreatedById, LastModifiedDate, LastModifiedById,
                        OwnerId, ParentId, IsArchived, IsDeleted, 
                        ArchivedDate, ArchivedById, Description,
                        PublishStatus, LatestPublishedVersionId
                 FROM ContentDocument
+                {where_clause}
                 ORDER BY CreatedDate DESC
             """
             
@@ -174,37 +478,78 @@ class ContentDocumentExporter:
             self._log_status(f"ERROR querying ContentDocument: {str(e)}")
             raise
         
-    def _query_all_versions(self, document_id: str) -> List[Dict]:
+    def _high_water_mark(self, content_documents: List[Dict], versions_by_document: Dict[str, List[Dict]],
+                         since: Optional[str]) -> Optional[str]:
+        """Latest LastModifiedDate seen in this export (server time, so no clock skew)"""
+        timestamps = [doc.get('LastModifiedDate') or '' for doc in content_documents]
+        timestamps.extend(
+            version.get('LastModifiedDate') or ''
+            for versions in versions_by_document.values() for version in versions
+        )
+        if since:
+            timestamps.append(since)
+        return max(timestamps) or None
+    
+    def _soql_datetime(self, value: str) -> str:
+        """Convert a Salesforce datetime string (2024-05-01T10:00:00.000+0000) to a SOQL literal"""
+        parsed = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+        # Truncating to seconds can only re-include a record, never skip one
+        return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    
+    def _delta_csv_path(self, output_path: str) -> str:
+        """Path of the delta CSV written next to the full export CSV"""
+        root, extension = os.path.splitext(output_path)
+        return f"{root}_delta_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension or '.csv'}"
+    
+    def _query_all_versions(self, document_ids: List[str]) -> Tuple[Dict[str, List[Dict]], Dict[str, str]]:
         """
-        Query all versions for a specific ContentDocument
+        Query all versions for many ContentDocuments at once
+        
+        Versions are fetched in chunks of VERSION_QUERY_CHUNK_SIZE documents
+        and grouped in memory, instead of one query per document.
         
         Args:
-            document_id: ContentDocument Id
+            document_ids: ContentDocument Ids
             
         Returns:
-            List of ContentVersion records with version info
+            Tuple of (ContentDocument Id -> ContentVersion records ordered by
+            VersionNumber, ContentDocument Id -> error for documents whose
+            chunk query failed)
         """
-        try:
-            # Query ALL versions (removed IsLatest = true filter)
-            query = f"""
-                SELECT Id, ContentDocumentId, VersionNumber, IsLatest,
-                    ContentSize, CreatedDate, LastModifiedDate
-                FROM ContentVersion
-                WHERE ContentDocumentId = '{document_id}'
-                ORDER BY VersionNumber ASC
-            """
-            
-            result = self.sf.query(query)
-            return result['records']
+        versions_by_document: Dict[str, List[Dict]] = {document_id: [] for document_id in document_ids}
+        failed_documents: Dict[str, str] = {}
+        
+        for start in range(0, len(document_ids), self.VERSION_QUERY_CHUNK_SIZE):
+            chunk = document_ids[start:start + self.VERSION_QUERY_CHUNK_SIZE]
+            id_list = ", ".join(f"'{document_id}'" for document_id in chunk)
             
-        except Exception as e:
-            self._log_status(f"    ⚠️ Error querying versions for {document_id}: {str(e)}")
-            return []
+            try:
+                # Query ALL versions (removed IsLatest = true filter)
+                query = f"""
+                    SELECT Id, ContentDocumentId, VersionNumber, IsLatest,
+                        ContentSize, Checksum, CreatedDate, LastModifiedDate
+                    FROM ContentVersion
+                    WHERE ContentDocumentId IN ({id_list})
+                    ORDER BY ContentDocumentId, VersionNumber ASC
+                """
+                
+                result = self.sf.query_all(query)
+                for version in result['records']:
+                    versions_by_document.setdefault(version['ContentDocumentId'], []).append(version)
+                    
+            except Exception as e:
+                self._log_status(f"    ⚠️ Error querying versions for {len(chunk)} documents: {str(e)}")
+                for document_id in chunk:
+                    versions_by_document[document_id] = []
+                    failed_documents[document_id] = str(e)
+        
+        return versions_by_document, failed_documents
     
     def _download_file(self, document_id: str, title: str, file_extension: str, 
-                    version_id: str, version_number: int, destination_folder: str) -> str:
+                    version_id: str, version_number: int, destination_folder: str,
+                    content_size: Optional[int] = None, checksum: Optional[str] = None) -> Tuple[str, str]:
         """
-        Download a single file version from Salesforce
+        Download a single file version from Salesforce (streamed to disk)
         
         Args:
             document_id: ContentDocument Id
@@ -213,39 +558,63 @@ class ContentDocumentExporter:
             version_id: ContentVersion Id
             version_number: Version number (1, 2, 3, etc.)
             destination_folder: Folder to save the file
+            content_size: Expected size in bytes (ContentVersion.ContentSize), verified when given
+            checksum: Expected MD5 (ContentVersion.Checksum), verified when given
             
         Returns:
-            Full path of downloaded file
+            Tuple of (full path of downloaded file, MD5 of its content)
         """
         try:
-            # Build filename: {Title}_{ContentDocumentId}_v{VersionNumber}.{Extension}
-            if file_extension:
-                filename = f"{title}_{document_id}_v{version_number}.{file_extension}"
-            else:
-                filename = f"{title}_{document_id}_v{version_number}"
-            
-            # Sanitize filename to remove invalid characters
-            safe_filename = self._sanitize_filename(filename)
-            
             # Build download URL
             download_url = f"{self.base_url}/services/data/v{self.sf_client.api_version}/sobjects/ContentVersion/{version_id}/VersionData"
             
-            # Download the file
-            response = requests.get(download_url, headers=self.headers, timeout=120)
-            response.raise_for_status()
-            
             # Full file path
-            file_path = os.path.join(destination_folder, safe_filename)
+            file_path = self._version_file_path(
+                document_id, title, file_extension, version_number, destination_folder
+            )
             
-            # Write file to disk
-            with open(file_path, 'wb') as f:
-                f.write(response.content)
+            # ✅ STREAMING: fixed-size chunks into a temp file, renamed into place
+            # only once complete, so memory stays constant and no partial file
+            # is ever left under its final name
+            temp_path = f"{file_path}.part"
+            bytes_written = 0
+            md5 = hashlib.md5()
+            try:
+                with self.http.get(download_url, headers=self.headers, timeout=120, stream=True) as response:
+                    response.raise_for_status()
+                    with open(temp_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=CONTENT_DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                            md5.update(chunk)
+                            bytes_written += len(chunk)
+                
+                if content_size is not None and bytes_written != content_size:
+                    raise Exception(f"Size mismatch: expected {content_size} bytes, received {bytes_written}")
+                if checksum and md5.hexdigest() != checksum.lower():
+                    raise Exception("Checksum mismatch: content differs from ContentVersion.Checksum")
+                
+                os.replace(temp_path, file_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
             
-            return file_path
+            return file_path, md5.hexdigest()
             
         except Exception as e:
             raise Exception(f"Failed to download version {version_number}: {str(e)}")
     
+    def _version_file_path(self, document_id: str, title: str, file_extension: str,
+                           version_number: int, destination_folder: str) -> str:
+        """Full path a version is saved to (stable across runs, so reruns can resume)"""
+        # Build filename: {Title}_{ContentDocumentId}_v{VersionNumber}.{Extension}
+        if file_extension:
+            filename = f"{title}_{document_id}_v{version_number}.{file_extension}"
+        else:
+            filename = f"{title}_{document_id}_v{version_number}"
+        
+        # Sanitize filename to remove invalid characters
+        return os.path.join(destination_folder, self._sanitize_filename(filename))
+    
     def _sanitize_filename(self, filename: str) -> str:
         """Remove invalid characters from filename"""
         invalid_chars = '<>:"/\\|?*'
@@ -337,6 +706,10 @@ class ContentDocumentExporter:
         return output_path
     
     def _log_status(self, message: str):
-        """Log status message"""
+        """Log status message (buffered while running on a worker thread)"""
+        self.worker_pool.log(message)
+    
+    def _emit_status(self, message: str):
+        """Send a status message to the GUI"""
         if self.sf_client.status_callback:
             self.sf_client.status_callback(message, verbose=True)
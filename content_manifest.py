@@ -0,0 +1,171 @@
+"""
+Download manifest for resumable ContentDocument exports
+
+A small SQLite journal kept in the export folder. Every ContentVersion that
+was downloaded and verified is recorded with its size and MD5 checksum, so a
+rerun into the same folder skips files that are already complete and only
+fetches missing or changed versions. The journal also holds each org's
+LastModifiedDate high-water mark for incremental (delta) exports.
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Optional
+
+
+class DownloadManifest:
+    """Journal of verified ContentVersion downloads in one export folder"""
+
+    FILENAME = '.sf_download_manifest.sqlite'
+
+    def __init__(self, folder: str):
+        """
+        Open (or create) the manifest of an export folder
+
+        Args:
+            folder: Export folder (the one holding the CSV and Documents/)
+        """
+        self.folder = folder
+        self._lock = threading.RLock()
+
+        self._db: Optional[sqlite3.Connection] = None
+        try:
+            os.makedirs(folder, exist_ok=True)
+            self._db = sqlite3.connect(
+                os.path.join(folder, self.FILENAME),
+                check_same_thread=False
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS downloads ("
+                " version_id TEXT PRIMARY KEY,"
+                " document_id TEXT NOT NULL,"
+                " path TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " checksum TEXT NOT NULL,"
+                " completed_at TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks ("
+                " org_id TEXT PRIMARY KEY,"
+                " high_water_mark TEXT NOT NULL,"
+                " updated_at TEXT NOT NULL)"
+            )
+            self._db.commit()
+        except Exception as e:
+            # Resume is an optimization - without a manifest everything is downloaded
+            print(f"⚠️ Download manifest unavailable: {str(e)}")
+            self._db = None
+
+    def is_complete(self, version_id: str, path: str, size: Optional[int],
+                    checksum: Optional[str]) -> bool:
+        """
+        Check whether a version was already downloaded and is still intact
+
+        Args:
+            version_id: ContentVersion Id
+            path: Full path the version is (or would be) saved to
+            size: Current ContentSize in the org
+            checksum: Current ContentVersion.Checksum (MD5) in the org
+
+        Returns:
+            True when the manifest entry matches the org and the file on disk
+        """
+        if not self._db:
+            return False
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT path, size, checksum FROM downloads WHERE version_id = ?",
+                    (version_id,)
+                ).fetchone()
+        except Exception:
+            return False
+
+        if not row:
+            return False
+        recorded_path, recorded_size, recorded_checksum = row
+
+        if recorded_path != os.path.relpath(path, self.folder):
+            return False
+        if size is not None and recorded_size != size:
+            return False
+        if checksum and recorded_checksum.lower() != checksum.lower():
+            return False
+        return os.path.isfile(path) and os.path.getsize(path) == recorded_size
+
+    def record(self, version_id: str, document_id: str, path: str, size: int, checksum: str):
+        """
+        Record a verified download
+
+        Args:
+            version_id: ContentVersion Id
+            document_id: ContentDocument Id
+            path: Full path of the downloaded file
+            size: Bytes written
+            checksum: MD5 of the bytes written
+        """
+        if not self._db:
+            return
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO downloads "
+                    "(version_id, document_id, path, size, checksum, completed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (version_id, document_id, os.path.relpath(path, self.folder), size,
+                     checksum, datetime.now().isoformat())
+                )
+                self._db.commit()
+        except Exception:
+            pass
+
+    def get_watermark(self, org_id: str) -> Optional[str]:
+        """
+        Get the LastModifiedDate up to which an org was fully exported
+
+        Returns:
+            Salesforce datetime string, or None before the first complete export
+        """
+        if not self._db:
+            return None
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT high_water_mark FROM watermarks WHERE org_id = ?",
+                    (org_id,)
+                ).fetchone()
+            return row[0] if row else None
+        except Exception:
+            return None
+
+    def set_watermark(self, org_id: str, high_water_mark: str):
+        """
+        Store the LastModifiedDate up to which an org is now fully exported
+
+        Args:
+            org_id: Organization Id
+            high_water_mark: Salesforce datetime string (e.g. 2024-05-01T10:00:00.000+0000)
+        """
+        if not self._db:
+            return
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO watermarks (org_id, high_water_mark, updated_at) "
+                    "VALUES (?, ?, ?)",
+                    (org_id, high_water_mark, datetime.now().isoformat())
+                )
+                self._db.commit()
+        except Exception:
+            pass
+
+    def close(self):
+        """Close the manifest"""
+        with self._lock:
+            if self._db:
+                try:
+                    self._db.close()
+                except Exception:
+                    pass
+                self._db = None
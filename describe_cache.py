@@ -0,0 +1,209 @@
+"""
+sObject describe cache - in-memory LRU backed by a persistent SQLite store
+Entries are keyed by org ID, API version and object name, and are
+revalidated with If-Modified-Since so unchanged objects cost a 304 at most.
+"""
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+from typing import Dict, Optional
+
+import requests
+
+from config import CACHE_DIR, DESCRIBE_CACHE_MEMORY_SIZE
+
+
+class DescribeCache:
+    """Caches sObject describe results across calls and sessions"""
+
+    DB_FILENAME = 'describe_cache.sqlite'
+
+    def __init__(self, http_session: requests.Session, base_url: str, api_version: str,
+                 headers: Dict[str, str], org_id: str,
+                 cache_dir: str = CACHE_DIR,
+                 max_memory_entries: int = DESCRIBE_CACHE_MEMORY_SIZE):
+        """
+        Initialize the describe cache
+
+        Args:
+            http_session: Shared pooled session used for describe calls
+            base_url: Salesforce instance URL
+            api_version: API version (e.g., "65.0")
+            headers: Request headers with authorization
+            org_id: Organization Id (partition key for the persistent store)
+            cache_dir: Folder holding the SQLite database
+            max_memory_entries: Number of describes kept in the in-memory LRU
+        """
+        self.http = http_session
+        self.base_url = base_url
+        self.api_version = api_version
+        self.headers = headers
+        self.org_id = org_id
+        self.max_memory_entries = max_memory_entries
+
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        # Counters exposed through get_stats()
+        self.hits = 0            # Served from the in-memory LRU
+        self.disk_hits = 0       # Served from SQLite after a 304 revalidation
+        self.misses = 0          # Full describe downloaded from Salesforce
+
+        self._db: Optional[sqlite3.Connection] = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(
+                os.path.join(cache_dir, self.DB_FILENAME),
+                check_same_thread=False
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS describe_cache ("
+                " org_id TEXT NOT NULL,"
+                " api_version TEXT NOT NULL,"
+                " object_name TEXT NOT NULL,"
+                " last_modified TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " PRIMARY KEY (org_id, api_version, object_name))"
+            )
+            self._db.commit()
+        except Exception as e:
+            # Persistent store is an optimization - fall back to memory only
+            print(f"⚠️ Describe cache running in memory only: {str(e)}")
+            self._db = None
+
+    def describe(self, object_name: str) -> Dict:
+        """
+        Get the describe result for an object
+
+        Args:
+            object_name: Object API name
+
+        Returns:
+            Describe dictionary (same shape as simple_salesforce describe())
+
+        Raises:
+            Exception: If Salesforce rejects the describe (message contains
+                       the errorCode, e.g. NOT_FOUND / INVALID_TYPE)
+        """
+        key = object_name.lower()
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+        stored = self._load(key)
+
+        url = f"{self.base_url}/services/data/v{self.api_version}/sobjects/{object_name}/describe"
+        request_headers = dict(self.headers)
+        if stored:
+            request_headers['If-Modified-Since'] = stored[0]
+
+        response = self.http.get(url, headers=request_headers, timeout=60)
+
+        if response.status_code == 304 and stored:
+            describe = stored[1]
+            with self._lock:
+                self.disk_hits += 1
+        elif response.status_code == 200:
+            describe = response.json()
+            last_modified = response.headers.get('Last-Modified') or formatdate(usegmt=True)
+            self._save(key, last_modified, describe)
+            with self._lock:
+                self.misses += 1
+        else:
+            raise Exception(f"Describe failed for {object_name} "
+                            f"(HTTP {response.status_code}): {response.text}")
+
+        self._remember(key, describe)
+        return describe
+
+    def invalidate(self, object_name: Optional[str] = None):
+        """Drop one object (or everything for this org) from both cache tiers"""
+        with self._lock:
+            if object_name:
+                self._memory.pop(object_name.lower(), None)
+            else:
+                self._memory.clear()
+
+            if not self._db:
+                return
+            try:
+                if object_name:
+                    self._db.execute(
+                        "DELETE FROM describe_cache WHERE org_id = ? AND api_version = ? AND object_name = ?",
+                        (self.org_id, self.api_version, object_name.lower())
+                    )
+                else:
+                    self._db.execute(
+                        "DELETE FROM describe_cache WHERE org_id = ? AND api_version = ?",
+                        (self.org_id, self.api_version)
+                    )
+                self._db.commit()
+            except Exception:
+                pass
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return hit/miss counters"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'memory_entries': len(self._memory)
+            }
+
+    def close(self):
+        """Close the persistent store"""
+        with self._lock:
+            if self._db:
+                try:
+                    self._db.close()
+                except Exception:
+                    pass
+                self._db = None
+
+    def _remember(self, key: str, describe: Dict):
+        """Insert into the in-memory LRU, evicting the oldest entry if full"""
+        with self._lock:
+            self._memory[key] = describe
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[tuple]:
+        """Load (last_modified, describe) from SQLite"""
+        if not self._db:
+            return None
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT last_modified, payload FROM describe_cache "
+                    "WHERE org_id = ? AND api_version = ? AND object_name = ?",
+                    (self.org_id, self.api_version, key)
+                ).fetchone()
+            if row:
+                return row[0], json.loads(row[1])
+        except Exception:
+            pass
+        return None
+
+    def _save(self, key: str, last_modified: str, describe: Dict):
+        """Persist a describe result to SQLite"""
+        if not self._db:
+            return
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO describe_cache "
+                    "(org_id, api_version, object_name, last_modified, payload) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.org_id, self.api_version, key, last_modified, json.dumps(describe))
+                )
+                self._db.commit()
+        except Exception:
+            pass
@@ -287,7 +287,7 @@ class ExcelStyleHelper:
             Object label (fallback to API name if not found)
         """
         try:
-            obj_describe = getattr(sf_client.sf, object_api_name).describe()
+            obj_describe = sf_client.describe(object_api_name)
             return obj_describe.get('label', object_api_name)
         except:
             return object_api_name
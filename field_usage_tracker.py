@@ -1,8 +1,18 @@
 """
 Enhanced Field usage tracking functionality for Salesforce metadata
 """
-from typing import Dict, List, Set
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from simple_salesforce import Salesforce
+from composite_batch import CompositeBatch
+from usage_index import UsageIndex
+from flow_usage_index import FlowUsageIndex
+from layout_usage_index import LayoutUsageIndex
+from usage_store import UsageStore
+from field_reference_matcher import find_field_references, ANY_KIND, CODE_KINDS
+from worker_pool import OrderedWorkerPool
+from config import USAGE_CATEGORY_TIMEOUT
+import threading
+import time
 import urllib.parse
 import re
 
@@ -10,12 +20,46 @@ import re
 class FieldUsageTracker:
     """Tracks where fields are used across Salesforce metadata"""
 
-    def __init__(self, sf: Salesforce, status_callback=None):
-        """Initialize with Salesforce connection"""
+    def __init__(self, sf: Salesforce, status_callback=None,
+                 describe_func: Optional[Callable[[str], Dict]] = None,
+                 usage_store: Optional[UsageStore] = None):
+        """
+        Initialize with Salesforce connection
+        
+        Args:
+            sf: simple_salesforce connection
+            status_callback: Optional callback for status updates
+            describe_func: Optional cached describe (e.g. SalesforceClient.describe)
+            usage_store: Optional persistent artifact store; only artifacts whose
+                         LastModifiedDate changed since the last session are downloaded
+        """
         self.sf = sf
         self.status_callback = status_callback
+        self.describe_func = describe_func
+        self.usage_store = usage_store
         # Cache to store usage data
         self.usage_cache: Dict[str, Dict[str, List[str]]] = {}
+        # Org-wide source corpora, downloaded and tokenized once per session
+        self.usage_index = UsageIndex(sf, self._index_status, store=usage_store)
+        # Active Flow versions, parsed once per version
+        self.flow_index = FlowUsageIndex(sf, self._index_status, store=usage_store)
+        # Page layouts, listed and downloaded for many objects at once
+        self.layout_index = LayoutUsageIndex(sf, self._index_status, store=usage_store)
+
+        # Single-flight locks: concurrent exporters never build the same object twice
+        self._locks_guard = threading.Lock()
+        self._object_locks: Dict[str, threading.Lock] = {}
+
+        self._shared_indexes_built = False
+
+        # Usage categories of one object are collected concurrently (one worker
+        # per category, so none waits behind another); their log lines are
+        # replayed in category order on the calling thread
+        self.category_pool = OrderedWorkerPool(
+            len(self._usage_collectors()),
+            self._emit_status,
+            thread_name_prefix='usage-category'
+        )
 
     def get_field_usage(self, object_name: str, field_api_name: str) -> str:
         """
@@ -29,7 +73,9 @@ class FieldUsageTracker:
         - Class1
         """
         if object_name not in self.usage_cache:
-            self._build_usage_cache_for_object(object_name)
+            with self._key_lock(self._object_locks, object_name):
+                if object_name not in self.usage_cache:
+                    self._build_usage_cache_for_object(object_name)
 
         field_key = f"{object_name}.{field_api_name}"
         usage_data = self.usage_cache.get(object_name, {}).get(field_key, {})
@@ -66,67 +112,99 @@ class FieldUsageTracker:
 
         return "\n".join(formatted_sections).strip()
 
-    def _build_usage_cache_for_object(self, object_name: str):
-        """Build usage cache for all fields in an object"""
-        self._log_status(f"  Building field usage cache for {object_name}...")
-
-        usage_data = {}
-
-        try:
-            # Query Validation Rules
-            validation_usage = self._get_validation_rule_usage(object_name)
-            self._merge_usage_data(usage_data, validation_usage, 'Validation Rules')
-
-            # Query Workflows
-            workflow_usage = self._get_workflow_usage(object_name)
-            self._merge_usage_data(usage_data, workflow_usage, 'Workflows')
-
-            # Query Flows
-            flow_usage = self._get_flow_usage(object_name)
-            self._merge_usage_data(usage_data, flow_usage, 'Flows')
-
-            # Query Apex Classes
-            apex_usage = self._get_apex_usage(object_name)
-            self._merge_usage_data(usage_data, apex_usage, 'Apex Classes')
-
-            # Query Apex Triggers
-            trigger_usage = self._get_trigger_usage(object_name)
-            self._merge_usage_data(usage_data, trigger_usage, 'Apex Triggers')
-
-            # Query Visualforce Pages
-            vf_page_usage = self._get_visualforce_page_usage(object_name)
-            self._merge_usage_data(usage_data, vf_page_usage, 'Visualforce Pages')
-
-            # Query Visualforce Components
-            vf_comp_usage = self._get_visualforce_component_usage(object_name)
-            self._merge_usage_data(usage_data, vf_comp_usage, 'Visualforce Components')
-
-            # Query Page Layouts (ENHANCED)
-            page_layout_usage = self._get_page_layout_usage(object_name)
-            self._merge_usage_data(usage_data, page_layout_usage, 'Page Layouts')
+    def prefetch_layouts(self, object_names: List[str]):
+        """
+        Index the page layouts of every object in an export up front
 
-            # Query Record Types
-            record_type_usage = self._get_record_type_usage(object_name)
-            self._merge_usage_data(usage_data, record_type_usage, 'Record Types')
+        Layout Metadata is then downloaded in full composite batches instead
+        of a few layouts at a time per object.
+        """
+        self.layout_index.prefetch(object_names)
 
-            # Query Custom Buttons/Links
-            button_usage = self._get_custom_button_usage(object_name)
-            self._merge_usage_data(usage_data, button_usage, 'Custom Buttons/Links')
+    def _build_usage_cache_for_object(self, object_name: str):
+        """
+        Build usage cache for all fields in an object
 
-            # Query Email Templates
-            email_template_usage = self._get_email_template_usage(object_name)
-            self._merge_usage_data(usage_data, email_template_usage, 'Email Templates')
+        Category collectors run concurrently, each under its own timeout. A
+        failed or timed-out category is logged and skipped; the others are
+        still merged into the cache. The org-wide indexes are built first,
+        outside the timeout, so a slow first download is never cut short.
+        """
+        self._build_shared_indexes()
+        self._log_status(f"  Building field usage cache for {object_name}...")
 
-            # Query Lightning Components (Aura)
-            aura_usage = self._get_aura_component_usage(object_name)
-            self._merge_usage_data(usage_data, aura_usage, 'Lightning Components')
+        usage_data = {}
+        timings: Dict[str, float] = {}
+        failed = []
+        started = time.perf_counter()
+
+        def collect(collector: Tuple[str, Callable[[str], Dict[str, Set[str]]]]):
+            category, collect_usage = collector
+            category_started = time.perf_counter()
+            try:
+                return collect_usage(object_name)
+            finally:
+                timings[category] = time.perf_counter() - category_started
+
+        collectors = self._usage_collectors()
+        for _, (category, _), field_usage, error in self.category_pool.imap(
+                collect, collectors, timeout=USAGE_CATEGORY_TIMEOUT):
+            if error:
+                failed.append(category)
+                self._log_status(f"    ⚠️  Could not collect {category}: {str(error)}")
+                continue
+            self._merge_usage_data(usage_data, field_usage, category)
+
+        self.usage_cache[object_name] = usage_data
+
+        slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:3]
+        timing_summary = ', '.join(f"{category} {elapsed:.1f}s" for category, elapsed in slowest)
+        elapsed = time.perf_counter() - started
+        if failed:
+            self._log_status(f"  ⚠️  Usage cache built without {', '.join(failed)} "
+                             f"in {elapsed:.1f}s (slowest: {timing_summary})")
+        else:
+            self._log_status(f"  ✅ Usage cache built in {elapsed:.1f}s (slowest: {timing_summary})")
+
+    def _build_shared_indexes(self):
+        """
+        Build the org-wide Apex/Visualforce/Email/Aura and Flow indexes once
 
-            self.usage_cache[object_name] = usage_data
-            self._log_status(f"  ✅ Usage cache built")
+        They download whole corpora on first use, which can take longer than
+        USAGE_CATEGORY_TIMEOUT; built here, the per-object collectors only
+        look them up.
+        """
+        if self._shared_indexes_built:
+            return
 
-        except Exception as e:
-            self._log_status(f"  ⚠️  Warning: Could not build complete usage cache: {str(e)}")
-            self.usage_cache[object_name] = usage_data
+        builds = [
+            (category, lambda category=category: self.usage_index.build(category))
+            for category in self.usage_index.specs
+        ]
+        builds.append(('Flows', self.flow_index.build))
+
+        for _, (category, _), _, error in self.category_pool.imap(lambda build: build[1](), builds):
+            if error:
+                self._log_status(f"    ⚠️  Could not index {category}: {str(error)}")
+        self._shared_indexes_built = True
+
+    def _usage_collectors(self) -> List[Tuple[str, Callable[[str], Dict[str, Set[str]]]]]:
+        """Usage category collectors, as (category, collector) pairs"""
+        return [
+            ('Validation Rules', self._get_validation_rule_usage),
+            ('Workflows', self._get_workflow_usage),
+            ('Flows', self._get_flow_usage),
+            ('Process Builder', self._get_process_builder_usage),
+            ('Apex Classes', self._get_apex_usage),
+            ('Apex Triggers', self._get_trigger_usage),
+            ('Visualforce Pages', self._get_visualforce_page_usage),
+            ('Visualforce Components', self._get_visualforce_component_usage),
+            ('Page Layouts', self._get_page_layout_usage),
+            ('Record Types', self._get_record_type_usage),
+            ('Custom Buttons/Links', self._get_custom_button_usage),
+            ('Email Templates', self._get_email_template_usage),
+            ('Lightning Components', self._get_aura_component_usage),
+        ]
 
     def _merge_usage_data(self, usage_data: Dict, field_usage: Dict[str, Set[str]], category: str):
         """Merge field usage data into the main usage dictionary"""
@@ -137,83 +215,117 @@ class FieldUsageTracker:
                 usage_data[field_key][category] = []
             usage_data[field_key][category].extend(sorted(items))
 
-    def _tooling_query(self, soql: str):
-        """Execute a Tooling API query with proper URL encoding"""
+    def _describe(self, object_name: str) -> Dict:
+        """Describe an object, using the shared describe cache when available"""
+        if self.describe_func:
+            return self.describe_func(object_name)
+        return getattr(self.sf, object_name).describe()
+
+    def _tooling_query(self, soql: str, raise_errors: bool = False):
+        """
+        Execute a Tooling API query with proper URL encoding
+
+        Args:
+            soql: Tooling SOQL query
+            raise_errors: Raise on failure instead of returning no records
+                          (for listings that drive cache refreshes)
+        """
         try:
             encoded_query = urllib.parse.quote(soql)
             url = f"tooling/query/?q={encoded_query}"
             return self.sf.restful(url, method='GET')
         except Exception as e:
+            if raise_errors:
+                raise
             self._log_status(f"    ⚠️  Tooling query error: {str(e)}")
             return {'records': []}
 
-    def _get_page_layout_usage(self, object_name: str) -> Dict[str, Set[str]]:
-        """Get page layout usage for object fields using Tooling API (ENHANCED)"""
-        field_usage = {}
+    def _key_lock(self, locks: Dict[str, threading.Lock], key: str) -> threading.Lock:
+        """Get (or create) the lock guarding one cache key"""
+        with self._locks_guard:
+            if key not in locks:
+                locks[key] = threading.Lock()
+            return locks[key]
 
+    def _get_indexed_usage(self, object_name: str, category: str) -> Dict[str, Set[str]]:
+        """Answer a category from the org-wide usage index (corpus downloaded once per session)"""
         try:
-            # First, get list of layout IDs (without Metadata - avoids the "no more than one row" error)
-            soql = f"SELECT Id, Name FROM Layout WHERE EntityDefinitionId = '{object_name}'"
-            result = self._tooling_query(soql)
+            obj_describe = self._describe(object_name)
+            field_names = [field.get('name', '') for field in obj_describe['fields']]
+            return self.usage_index.get_field_usage(category, object_name, field_names)
+        except Exception as e:
+            self._log_status(f"    ⚠️  Could not look up {category}: {str(e)}")
+            return {}
 
-            # Now query each layout individually with Metadata
-            for layout in result.get('records', []):
-                layout_id = layout.get('Id', '')
-                layout_name = layout.get('Name', '')
+    def _tooling_query_many(self, queries: List[str]) -> List[Dict]:
+        """Execute several Tooling API queries through composite batches (25 per call)"""
+        if not queries:
+            return []
+        try:
+            return CompositeBatch.from_sf(self.sf, tooling=True).query_many(queries)
+        except Exception as e:
+            self._log_status(f"    ⚠️  Tooling batch error: {str(e)}")
+            return [{'records': [], 'error': str(e)} for _ in queries]
 
-                if not layout_id:
-                    continue
+    def _get_page_layout_usage(self, object_name: str) -> Dict[str, Set[str]]:
+        """Get page layout usage for object fields (from the shared layout index)"""
+        return self.layout_index.get_field_usage(object_name)
 
+    def _refresh_metadata_artifacts(self, category: str, sobject: str, name_field: str,
+                                    records: List[Dict], parse_metadata: Callable[[Dict], Set[str]]
+                                    ) -> List[Tuple[str, List[str]]]:
+        """
+        Get the fields referenced by each artifact of a per-object listing
+
+        Metadata can only be queried one row at a time, so changed artifacts
+        are fetched with single-row queries sent in composite batches. With a
+        usage store, artifacts whose LastModifiedDate is unchanged since the
+        last session are served from disk and deleted ones are dropped.
+        Artifacts that fail or come back without Metadata are left out, so
+        they are not cached and are fetched again next session.
+
+        Args:
+            category: Store category (e.g. "Page Layouts:Account")
+            sobject: Tooling object holding the Metadata (e.g. 'Layout')
+            name_field: Field of the listing records used as display name
+            records: Listing records with Id, name field and LastModifiedDate
+            parse_metadata: Extracts referenced field names from a Metadata dict
+
+        Returns:
+            List of (artifact name, referenced field names)
+        """
+        records = [record for record in records if record.get('Id')]
+        names = {record['Id']: record.get(name_field, '') for record in records}
+        listing = {record['Id']: record.get('LastModifiedDate') or '' for record in records}
+
+        def fetch(artifact_ids: List[str]) -> Dict[str, Tuple[str, List[str]]]:
+            single_results = self._tooling_query_many([
+                f"SELECT Id, Metadata FROM {sobject} WHERE Id = '{artifact_id}'"
+                for artifact_id in artifact_ids
+            ])
+            fetched = {}
+            for artifact_id, single_result in zip(artifact_ids, single_results):
                 try:
-                    # Query individual layout with Metadata (only 1 row at a time)
-                    soql_single = f"SELECT Id, Name, Metadata FROM Layout WHERE Id = '{layout_id}'"
-                    single_result = self._tooling_query(soql_single)
-
-                    if not single_result.get('records'):
-                        continue
-
-                    metadata = single_result['records'][0].get('Metadata', {})
-
+                    if single_result.get('error'):
+                        raise Exception(single_result['error'])
+                    single_records = single_result.get('records') or []
+                    metadata = single_records[0].get('Metadata') if single_records else None
                     if not metadata:
-                        continue
-
-                    # Parse layoutItems to find fields on the layout
-                    layout_sections = metadata.get('layoutSections', [])
-                    
-                    # Safety check: ensure layout_sections is not None
-                    if not layout_sections:
-                        layout_sections = []
-
-                    for section in layout_sections:
-                        layout_columns = section.get('layoutColumns', [])
-                        
-                        # Safety check: ensure layout_columns is not None
-                        if not layout_columns:
-                            layout_columns = []
-
-                        for column in layout_columns:
-                            layout_items = column.get('layoutItems', [])
-                            
-                            # Safety check: ensure layout_items is not None
-                            if not layout_items:
-                                layout_items = []
-
-                            for item in layout_items:
-                                field_name = item.get('field')
-                                if field_name:
-                                    field_key = f"{object_name}.{field_name}"
-                                    if field_key not in field_usage:
-                                        field_usage[field_key] = set()
-                                    field_usage[field_key].add(layout_name)
-
-                except Exception as layout_error:
-                    self._log_status(f"    ⚠️  Could not query layout {layout_name}: {str(layout_error)}")
-                    continue
+                        # Not stored, so the artifact is fetched again next session
+                        raise Exception("no Metadata returned")
+                    fetched[artifact_id] = (names[artifact_id], sorted(parse_metadata(metadata)))
+                except Exception as e:
+                    self._log_status(f"    ⚠️  Could not query {sobject} {names[artifact_id]}: {str(e)}")
+            return fetched
 
-        except Exception as e:
-            self._log_status(f"    ⚠️  Could not query page layouts: {str(e)}")
+        if self.usage_store:
+            artifacts, _, _ = self.usage_store.refresh(category, listing, fetch)
+            entries = {artifact_id: entry[2] for artifact_id, entry in artifacts.items()}
+        else:
+            entries = {artifact_id: entry[1] for artifact_id, entry in fetch(list(listing)).items()}
 
-        return field_usage
+        # Display names come from the live listing
+        return [(names[artifact_id], field_names) for artifact_id, field_names in entries.items()]
 
     def _get_record_type_usage(self, object_name: str) -> Dict[str, Set[str]]:
         """Get record type usage for picklist values"""
@@ -278,25 +390,22 @@ class FieldUsageTracker:
         return field_usage
 
     def _get_flow_usage(self, object_name: str) -> Dict[str, Set[str]]:
-        """Get flow usage for object fields"""
-        field_usage = {}
-
-        try:
-            # Query active flows
-            soql = "SELECT Id, MasterLabel, ProcessType, Status FROM Flow WHERE Status = 'Active'"
-            result = self._tooling_query(soql)
+        """Get flow usage for object fields (from parsed active Flow versions)"""
+        return self._get_flow_index_usage(object_name, 'Flows')
 
-            # Note: Full flow parsing requires Metadata API
-            # This is a simplified version that checks flow metadata
-            for flow in result.get('records', []):
-                flow_name = flow.get('MasterLabel', '')
-                # Would need to parse flow metadata XML to find field references
-                # Placeholder for future enhancement
+    def _get_process_builder_usage(self, object_name: str) -> Dict[str, Set[str]]:
+        """Get Process Builder usage for object fields"""
+        return self._get_flow_index_usage(object_name, 'Process Builder')
 
+    def _get_flow_index_usage(self, object_name: str, category: str) -> Dict[str, Set[str]]:
+        """Answer a Flow category from the Flow usage index"""
+        try:
+            obj_describe = self._describe(object_name)
+            field_names = [field.get('name', '') for field in obj_describe['fields']]
+            return self.flow_index.get_field_usage(category, object_name, field_names)
         except Exception as e:
             self._log_status(f"    ⚠️  Could not query flows: {str(e)}")
-
-        return field_usage
+            return {}
 
     def _get_custom_button_usage(self, object_name: str) -> Dict[str, Set[str]]:
         """Get custom button/link usage for object fields"""
@@ -308,7 +417,7 @@ class FieldUsageTracker:
             # result = self._tooling_query(soql) # No need to use tooling API
             result = self.sf.query(soql)
 
-            obj_describe = getattr(self.sf, object_name).describe()
+            obj_describe = self._describe(object_name)
             field_names = [field.get('name', '') for field in obj_describe['fields']]
 
             for button in result.get('records', []):
@@ -318,14 +427,12 @@ class FieldUsageTracker:
                 if not url:
                     continue
 
-                # Check if URL contains field references
-                for field_name in field_names:
-                    # Look for merge field patterns: {!Field__c} or {!ObjectName.Field__c}
-                    if field_name in url or f"{{!{field_name}}}" in url:
-                        field_key = f"{object_name}.{field_name}"
-                        if field_key not in field_usage:
-                            field_usage[field_key] = set()
-                        field_usage[field_key].add(button_name)
+                # Check if URL contains field references (merge fields or plain identifiers)
+                for field_name in find_field_references(url, field_names, ANY_KIND):
+                    field_key = f"{object_name}.{field_name}"
+                    if field_key not in field_usage:
+                        field_usage[field_key] = set()
+                    field_usage[field_key].add(button_name)
 
         except Exception as e:
             self._log_status(f"    ⚠️  Could not query custom buttons: {str(e)}")
@@ -333,169 +440,61 @@ class FieldUsageTracker:
         return field_usage
 
     def _get_email_template_usage(self, object_name: str) -> Dict[str, Set[str]]:
-        """Get email template usage for object fields"""
-        field_usage = {}
-
-        try:
-            # Query email templates that might reference this object
-            soql = "SELECT Id, Name, Body, HtmlValue FROM EmailTemplate LIMIT 1000"
-            result = self.sf.query(soql)
-
-            obj_describe = getattr(self.sf, object_name).describe()
-            field_names = [field.get('name', '') for field in obj_describe['fields']]
-
-            for template in result.get('records', []):
-                template_name = template.get('Name', '')
-                body = template.get('Body', '') or ''
-                html_value = template.get('HtmlValue', '') or ''
-
-                combined_content = body + ' ' + html_value
-
-                # Look for merge field patterns
-                for field_name in field_names:
-                    # Patterns: {!ObjectName.Field__c} or {!Field__c}
-                    pattern = f"{{!.*{field_name}.*}}"
-                    if re.search(pattern, combined_content, re.IGNORECASE):
-                        field_key = f"{object_name}.{field_name}"
-                        if field_key not in field_usage:
-                            field_usage[field_key] = set()
-                        field_usage[field_key].add(template_name)
-
-        except Exception as e:
-            self._log_status(f"    ⚠️  Could not query email templates: {str(e)}")
-
-        return field_usage
+        """Get email template usage for object fields (served from the org-wide usage index)"""
+        return self._get_indexed_usage(object_name, 'Email Templates')
 
     def _get_aura_component_usage(self, object_name: str) -> Dict[str, Set[str]]:
-        """Get Lightning (Aura) component usage for object fields"""
-        field_usage = {}
-
-        try:
-            # AuraDefinition correct fields: AuraDefinitionBundleId, Format, Source
-            # We need to query differently - get bundle info first
-            soql = "SELECT AuraDefinitionBundleId, AuraDefinitionBundle.DeveloperName, Source FROM AuraDefinition WHERE DefType = 'COMPONENT' LIMIT 1000"
-            result = self._tooling_query(soql)
-
-            obj_describe = getattr(self.sf, object_name).describe()
-            field_names = [field.get('name', '') for field in obj_describe['fields']]
-
-            for component in result.get('records', []):
-                # Get component name from the bundle relationship
-                bundle = component.get('AuraDefinitionBundle', {})
-                comp_name = bundle.get('DeveloperName', 'Unknown') if bundle else 'Unknown'
-                source = component.get('Source', '')
-
-                if not source:
-                    continue
-
-                # Check if component references the object
-                if object_name not in source:
-                    continue
-
-                # Look for field references
-                for field_name in field_names:
-                    if field_name in source:
-                        field_key = f"{object_name}.{field_name}"
-                        if field_key not in field_usage:
-                            field_usage[field_key] = set()
-                        field_usage[field_key].add(comp_name)
-
-        except Exception as e:
-            self._log_status(f"    ⚠️  Could not query Lightning components: {str(e)}")
-
-        return field_usage
+        """Get Lightning (Aura) component usage for object fields (served from the org-wide usage index)"""
+        return self._get_indexed_usage(object_name, 'Lightning Components')
 
     def _get_validation_rule_usage(self, object_name: str) -> Dict[str, Set[str]]:
-        """Get validation rule usage for object fields (FIXED: Query one record at a time)"""
+        """Get validation rule usage for object fields (Metadata queried one record at a time, sent in composite batches)"""
         field_usage = {}
 
         try:
             # First, get list of ValidationRule IDs (without Metadata - avoids the "no more than one row" error)
-            soql = f"SELECT Id, ValidationName FROM ValidationRule WHERE EntityDefinition.QualifiedApiName = '{object_name}'"
-            result = self._tooling_query(soql)
-
-            # Now query each validation rule individually with Metadata
-            for rule in result.get('records', []):
-                rule_id = rule.get('Id', '')
-                rule_name = rule.get('ValidationName', '')
-
-                if not rule_id:
-                    continue
-
-                try:
-                    # Query individual validation rule with Metadata (only 1 row at a time)
-                    soql_single = f"SELECT Id, ValidationName, Metadata FROM ValidationRule WHERE Id = '{rule_id}'"
-                    single_result = self._tooling_query(soql_single)
-
-                    if not single_result.get('records'):
-                        continue
-
-                    metadata = single_result['records'][0].get('Metadata', {})
-
-                    if not metadata:
-                        continue
-
-                    # Parse the error display field if available
-                    error_field = metadata.get('errorDisplayField')
-                    if error_field:
-                        field_key = f"{object_name}.{error_field}"
-                        if field_key not in field_usage:
-                            field_usage[field_key] = set()
-                        field_usage[field_key].add(rule_name)
-
-                    # Extract fields from formula
-                    formula = metadata.get('errorConditionFormula', '')
-                    if formula:
-                        fields = self._extract_fields_from_formula(formula, object_name)
-                        for field in fields:
-                            field_key = f"{object_name}.{field}"
-                            if field_key not in field_usage:
-                                field_usage[field_key] = set()
-                            field_usage[field_key].add(rule_name)
-
-                except Exception as e:
-                    self._log_status(f"    ⚠️  Could not query validation rule {rule_name}: {str(e)}")
+            # A failed listing must raise: an empty one would delete every cached rule
+            soql = (f"SELECT Id, ValidationName, LastModifiedDate FROM ValidationRule "
+                    f"WHERE EntityDefinition.QualifiedApiName = '{object_name}'")
+            result = self._tooling_query(soql, raise_errors=True)
+
+            rules = self._refresh_metadata_artifacts(
+                f"Validation Rules:{object_name}", 'ValidationRule', 'ValidationName',
+                result.get('records', []),
+                lambda metadata: self._parse_validation_rule_fields(metadata, object_name)
+            )
+
+            for rule_name, field_names in rules:
+                for field_name in field_names:
+                    field_key = f"{object_name}.{field_name}"
+                    if field_key not in field_usage:
+                        field_usage[field_key] = set()
+                    field_usage[field_key].add(rule_name)
 
         except Exception as e:
             self._log_status(f"    ⚠️  Could not query validation rules: {str(e)}")
 
         return field_usage
 
-    def _get_apex_usage(self, object_name: str) -> Dict[str, Set[str]]:
-        """Get Apex class usage for object fields"""
-        field_usage = {}
-
-        try:
-            soql = "SELECT Name, Body FROM ApexClass LIMIT 500"
-            result = self._tooling_query(soql)
-
-            obj_describe = getattr(self.sf, object_name).describe()
-            field_names = [field.get('name', '') for field in obj_describe['fields']]
+    def _parse_validation_rule_fields(self, metadata: Dict, object_name: str) -> Set[str]:
+        """Collect the fields a validation rule displays its error on or references"""
+        field_names = set()
 
-            for apex_class in result.get('records', []):
-                class_name = apex_class.get('Name', '')
-                body = apex_class.get('Body', '')
+        # Parse the error display field if available
+        error_field = metadata.get('errorDisplayField')
+        if error_field:
+            field_names.add(error_field)
 
-                if not body:
-                    continue
+        # Extract fields from formula
+        formula = metadata.get('errorConditionFormula', '')
+        if formula:
+            field_names.update(self._extract_fields_from_formula(formula, object_name))
 
-                # Check if this class references the object
-                if object_name not in body:
-                    continue
+        return field_names
 
-                # Look for field references
-                for field_name in field_names:
-                    # Look for common patterns: obj.field, field__c, etc.
-                    if self._is_field_referenced_in_code(field_name, body):
-                        field_key = f"{object_name}.{field_name}"
-                        if field_key not in field_usage:
-                            field_usage[field_key] = set()
-                        field_usage[field_key].add(class_name)
-
-        except Exception as e:
-            self._log_status(f"    ⚠️  Could not query Apex classes: {str(e)}")
-
-        return field_usage
+    def _get_apex_usage(self, object_name: str) -> Dict[str, Set[str]]:
+        """Get Apex class usage for object fields (served from the org-wide usage index)"""
+        return self._get_indexed_usage(object_name, 'Apex Classes')
 
     def _get_trigger_usage(self, object_name: str) -> Dict[str, Set[str]]:
         """Get Apex trigger usage for object fields"""
@@ -505,7 +504,7 @@ class FieldUsageTracker:
             soql = f"SELECT Name, Body FROM ApexTrigger WHERE TableEnumOrId = '{object_name}'"
             result = self._tooling_query(soql)
 
-            obj_describe = getattr(self.sf, object_name).describe()
+            obj_describe = self._describe(object_name)
             field_names = [field.get('name', '') for field in obj_describe['fields']]
 
             for trigger in result.get('records', []):
@@ -515,12 +514,12 @@ class FieldUsageTracker:
                 if not body:
                     continue
 
-                for field_name in field_names:
-                    if self._is_field_referenced_in_code(field_name, body):
-                        field_key = f"{object_name}.{field_name}"
-                        if field_key not in field_usage:
-                            field_usage[field_key] = set()
-                        field_usage[field_key].add(trigger_name)
+                # Single pass over the body for all fields (dot access, string literal, map key)
+                for field_name in find_field_references(body, field_names, CODE_KINDS):
+                    field_key = f"{object_name}.{field_name}"
+                    if field_key not in field_usage:
+                        field_usage[field_key] = set()
+                    field_usage[field_key].add(trigger_name)
 
         except Exception as e:
             self._log_status(f"    ⚠️  Could not query triggers: {str(e)}")
@@ -528,71 +527,12 @@ class FieldUsageTracker:
         return field_usage
 
     def _get_visualforce_page_usage(self, object_name: str) -> Dict[str, Set[str]]:
-        """Get Visualforce page usage for object fields"""
-        field_usage = {}
-
-        try:
-            soql = "SELECT Name, Markup FROM ApexPage LIMIT 500"
-            result = self._tooling_query(soql)
-
-            obj_describe = getattr(self.sf, object_name).describe()
-            field_names = [field.get('name', '') for field in obj_describe['fields']]
-
-            for page in result.get('records', []):
-                page_name = page.get('Name', '')
-                markup = page.get('Markup', '')
-
-                if not markup:
-                    continue
-
-                if object_name not in markup:
-                    continue
-
-                for field_name in field_names:
-                    # Look for VF patterns: {!obj.field} or value="{!field}"
-                    if self._is_field_referenced_in_vf(field_name, markup):
-                        field_key = f"{object_name}.{field_name}"
-                        if field_key not in field_usage:
-                            field_usage[field_key] = set()
-                        field_usage[field_key].add(page_name)
-
-        except Exception as e:
-            self._log_status(f"    ⚠️  Could not query Visualforce pages: {str(e)}")
-
-        return field_usage
+        """Get Visualforce page usage for object fields (served from the org-wide usage index)"""
+        return self._get_indexed_usage(object_name, 'Visualforce Pages')
 
     def _get_visualforce_component_usage(self, object_name: str) -> Dict[str, Set[str]]:
-        """Get Visualforce component usage for object fields"""
-        field_usage = {}
-
-        try:
-            soql = "SELECT Name, Markup FROM ApexComponent LIMIT 500"
-            result = self._tooling_query(soql)
-
-            obj_describe = getattr(self.sf, object_name).describe()
-            field_names = [field.get('name', '') for field in obj_describe['fields']]
-
-            for component in result.get('records', []):
-                comp_name = component.get('Name', '')
-                markup = component.get('Markup', '')
-
-                if not markup:
-                    continue
-
-                if object_name not in markup:
-                    continue
-
-                for field_name in field_names:
-                    if self._is_field_referenced_in_vf(field_name, markup):
-                        field_key = f"{object_name}.{field_name}"
-                        if field_key not in field_usage:
-                            field_usage[field_key] = set()
-                        field_usage[field_key].add(comp_name)
-
-        except Exception as e:
-            self._log_status(f"    ⚠️  Could not query Visualforce components: {str(e)}")
-
-        return field_usage
+        """Get Visualforce component usage for object fields (served from the org-wide usage index)"""
+        return self._get_indexed_usage(object_name, 'Visualforce Components')
 
     def _extract_fields_from_formula(self, formula: str, object_name: str) -> List[str]:
         """Extract field names from formula (ENHANCED)"""
@@ -612,33 +552,15 @@ class FieldUsageTracker:
 
         return list(set(fields))  # Remove duplicates
 
-    def _is_field_referenced_in_code(self, field_name: str, code: str) -> bool:
-        """Check if field is referenced in Apex code (ENHANCED)"""
-        # Pattern 1: Direct field reference with dot notation: obj.Field__c
-        pattern1 = r'\.\s*' + re.escape(field_name) + r'\b'
-
-        # Pattern 2: String reference: 'Field__c' or "Field__c"
-        pattern2 = r'["\']' + re.escape(field_name) + r'["\']'
-
-        # Pattern 3: Map key reference: ['Field__c'] or ['Field__c']
-        pattern3 = r'\[\s*["\']' + re.escape(field_name) + r'["\']\s*\]'
-
-        return (re.search(pattern1, code) is not None or
-                re.search(pattern2, code) is not None or
-                re.search(pattern3, code) is not None)
-
-    def _is_field_referenced_in_vf(self, field_name: str, markup: str) -> bool:
-        """Check if field is referenced in Visualforce markup (ENHANCED)"""
-        # Pattern 1: Merge field: {!field} or {!obj.field}
-        pattern1 = r'\{!.*' + re.escape(field_name) + r'.*\}'
-
-        # Pattern 2: Value attribute: value="{!field}"
-        pattern2 = r'value\s*=\s*["\']?\{!.*' + re.escape(field_name) + r'.*\}["\']?'
+    def _log_status(self, message: str):
+        """Log status message (buffered while running on a category thread)"""
+        self.category_pool.log(message)
 
-        return (re.search(pattern1, markup, re.IGNORECASE) is not None or
-                re.search(pattern2, markup, re.IGNORECASE) is not None)
+    def _index_status(self, message: str, verbose: bool = True):
+        """Status callback handed to the usage index"""
+        self._log_status(message)
 
-    def _log_status(self, message: str):
-        """Log status message"""
+    def _emit_status(self, message: str):
+        """Send a status message to the owner's callback"""
         if self.status_callback:
             self.status_callback(message, verbose=True)
\ No newline at end of file
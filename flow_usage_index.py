@@ -0,0 +1,297 @@
+"""
+Flow field usage index
+
+Reads the Metadata of every active Flow version once, walks its record
+elements (lookups, creates, updates, deletes), decisions, assignments and
+formulas, and resolves each reference to an Object.Field pair. Flow versions
+are immutable, so a parsed version is cached by its Id (in the UsageStore
+when one is available) and never downloaded again - only newly activated
+versions are fetched in later sessions.
+"""
+import re
+import threading
+import urllib.parse
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from simple_salesforce import Salesforce
+
+from composite_batch import CompositeBatch
+from usage_store import UsageStore
+
+# Process Builder processes are Flows with this ProcessType
+PROCESS_BUILDER_TYPE = 'Workflow'
+
+# Element lists holding record operations (each has an 'object')
+RECORD_ELEMENTS = ['recordLookups', 'recordCreates', 'recordUpdates', 'recordDeletes']
+
+# Keys whose value is a reference such as "$Record.Field__c" or "myVar.Field__c"
+REFERENCE_KEYS = {'leftValueReference', 'assignToReference', 'elementReference', 'inputReference'}
+
+_MERGE_FIELD_PATTERN = re.compile(r'\{!([^}]+)\}')
+_PATH_PATTERN = re.compile(r'\$?[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)+')
+
+
+def parse_flow_field_references(metadata: Dict) -> Set[Tuple[str, str]]:
+    """
+    Extract the fields a Flow version references
+
+    Args:
+        metadata: Flow Metadata as returned by the Tooling API
+
+    Returns:
+        Set of (object API name, field API name)
+    """
+    references: Set[Tuple[str, str]] = set()
+    if not metadata:
+        return references
+
+    reference_objects = _reference_objects(metadata)
+
+    # Record elements name their object and fields directly; elements that
+    # work on a record variable ($Record, an sObject variable) name it in
+    # inputReference instead of object
+    for element_type in RECORD_ELEMENTS:
+        for element in metadata.get(element_type) or []:
+            object_name = element.get('object') \
+                or reference_objects.get((element.get('inputReference') or '').lower())
+            if not object_name:
+                continue
+            for field_name in _record_element_fields(element):
+                references.add((object_name, field_name))
+
+    # Start element of record-triggered flows (entry conditions)
+    start = metadata.get('start') or {}
+    start_object = start.get('object')
+    if start_object:
+        for condition in start.get('filters') or []:
+            if condition.get('field'):
+                references.add((start_object, condition['field']))
+
+    # References ("$Record.Field__c", "myVariable_current.Field__c") inside
+    # decisions, assignments, record element filters/values and formulas
+    for element_type in RECORD_ELEMENTS + ['decisions', 'assignments']:
+        for element in metadata.get(element_type) or []:
+            for path in _iter_reference_paths(element):
+                _add_path_reference(references, reference_objects, path)
+
+    for formula in metadata.get('formulas') or []:
+        for merge_field in _MERGE_FIELD_PATTERN.findall(formula.get('expression') or ''):
+            for path in _PATH_PATTERN.findall(merge_field):
+                _add_path_reference(references, reference_objects, path)
+
+    return references
+
+
+def _reference_objects(metadata: Dict) -> Dict[str, str]:
+    """Map each record-typed reference name (lowercased) to its object"""
+    reference_objects = {}
+
+    start_object = (metadata.get('start') or {}).get('object')
+    if start_object:
+        reference_objects['$record'] = start_object
+        reference_objects['$record__prior'] = start_object
+
+    # SObject variables (Process Builder uses myVariable_current / myVariable_old)
+    for variable in metadata.get('variables') or []:
+        if variable.get('objectType') and variable.get('name'):
+            reference_objects[variable['name'].lower()] = variable['objectType']
+
+    # Record lookups store into an output variable or into the element itself
+    for element in metadata.get('recordLookups') or []:
+        object_name = element.get('object')
+        if not object_name:
+            continue
+        if element.get('name'):
+            reference_objects.setdefault(element['name'].lower(), object_name)
+        if element.get('outputReference'):
+            reference_objects.setdefault(element['outputReference'].lower(), object_name)
+
+    return reference_objects
+
+
+def _record_element_fields(element: Dict) -> Set[str]:
+    """Fields named directly by a record element"""
+    fields = set(element.get('queriedFields') or [])
+    for key in ['filters', 'inputAssignments', 'outputAssignments']:
+        for item in element.get(key) or []:
+            if item.get('field'):
+                fields.add(item['field'])
+    if element.get('sortField'):
+        fields.add(element['sortField'])
+    return fields
+
+
+def _iter_reference_paths(value) -> Iterable[str]:
+    """Yield every reference path nested anywhere inside an element"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in REFERENCE_KEYS and isinstance(item, str):
+                yield item
+            elif key == 'stringValue' and isinstance(item, str):
+                # Text values may embed merge fields
+                for merge_field in _MERGE_FIELD_PATTERN.findall(item):
+                    yield from _PATH_PATTERN.findall(merge_field)
+            else:
+                yield from _iter_reference_paths(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_reference_paths(item)
+
+
+def _add_path_reference(references: Set[Tuple[str, str]], reference_objects: Dict[str, str], path: str):
+    """Resolve "reference.Field" against the flow's record-typed references"""
+    parts = path.split('.')
+    # Deeper paths ($Record.Account.Name) traverse a relationship name, not a field
+    if len(parts) != 2:
+        return
+    object_name = reference_objects.get(parts[0].lower())
+    if object_name:
+        references.add((object_name, parts[1]))
+
+
+class FlowUsageIndex:
+    """Field references of all active Flow versions, parsed once per version"""
+
+    # Bump when parse_flow_field_references changes: stored versions are kept
+    # under a versioned category, so a new parser re-parses every version
+    PARSER_VERSION = 2
+    STORE_CATEGORY = f'Flow Versions (parser v{PARSER_VERSION})'
+
+    def __init__(self, sf: Salesforce, status_callback: Optional[Callable] = None,
+                 store: Optional[UsageStore] = None):
+        """
+        Initialize the (lazily built) index
+
+        Args:
+            sf: simple_salesforce connection
+            status_callback: Optional callback for status updates
+            store: Persistent artifact store; parsed versions are kept there
+                   across sessions
+        """
+        self.sf = sf
+        self.status_callback = status_callback
+        self.store = store
+
+        # 'Flows' / 'Process Builder' -> lowercased "object.field" -> flow labels
+        self._usage: Optional[Dict[str, Dict[str, Set[str]]]] = None
+        self._lock = threading.Lock()
+
+    def get_field_usage(self, category: str, object_name: str,
+                        field_names: List[str]) -> Dict[str, Set[str]]:
+        """
+        Look up Flow usage for many fields of one object
+
+        Args:
+            category: 'Flows' or 'Process Builder'
+            object_name: Object API name
+            field_names: Field API names (as described)
+
+        Returns:
+            Dict of "Object.Field" -> flow labels (fields without usage omitted)
+        """
+        usage = self._ensure_built().get(category, {})
+        field_usage = {}
+        for field_name in field_names:
+            labels = usage.get(f"{object_name}.{field_name}".lower())
+            if labels:
+                field_usage[f"{object_name}.{field_name}"] = set(labels)
+        return field_usage
+
+    def build(self):
+        """Parse the active Flow versions now instead of on the first lookup"""
+        self._ensure_built()
+
+    def _ensure_built(self) -> Dict[str, Dict[str, Set[str]]]:
+        """Parse the active Flow versions the first time they are needed (thread-safe)"""
+        if self._usage is not None:
+            return self._usage
+
+        with self._lock:
+            if self._usage is None:
+                self._usage = self._build()
+            return self._usage
+
+    def _build(self) -> Dict[str, Dict[str, Set[str]]]:
+        """List active Flow versions and parse those not seen before"""
+        usage: Dict[str, Dict[str, Set[str]]] = {'Flows': {}, 'Process Builder': {}}
+
+        try:
+            versions = self._query_all(
+                "SELECT Id, MasterLabel, ProcessType FROM Flow WHERE Status = 'Active'"
+            )
+            # Versions never change, so the Id alone decides what to download
+            listing = {version['Id']: '' for version in versions}
+
+            if self.store:
+                parsed, downloaded, deleted = self.store.refresh(
+                    self.STORE_CATEGORY, listing, lambda ids: self._fetch_versions(versions, ids)
+                )
+            else:
+                fetched = self._fetch_versions(versions, list(listing))
+                parsed = {
+                    version_id: (name, '', payload)
+                    for version_id, (name, payload) in fetched.items()
+                }
+                downloaded, deleted = len(fetched), 0
+
+            for name, _, payload in parsed.values():
+                category = 'Process Builder' if payload.get('process_type') == PROCESS_BUILDER_TYPE else 'Flows'
+                for field_key in payload.get('fields', []):
+                    usage[category].setdefault(field_key.lower(), set()).add(name)
+
+            self._log_status(f"  📚 Indexed {len(parsed)} active Flow versions "
+                             f"({downloaded} parsed, {deleted} deactivated)")
+
+        except Exception as e:
+            self._log_status(f"    ⚠️  Could not index Flows: {str(e)}")
+
+        return usage
+
+    def _fetch_versions(self, versions: List[Dict], version_ids: List[str]) -> Dict[str, Tuple[str, Dict]]:
+        """
+        Download and parse the Metadata of specific Flow versions
+
+        The Tooling API returns Metadata for one row per query, so each
+        version is its own subrequest in a composite batch.
+
+        Returns:
+            Dict of version Id -> (label, {'process_type', 'fields'})
+        """
+        by_id = {version['Id']: version for version in versions}
+        queries = [f"SELECT Id, Metadata FROM Flow WHERE Id = '{version_id}'" for version_id in version_ids]
+        results = CompositeBatch.from_sf(self.sf, tooling=True).query_many(queries)
+
+        fetched = {}
+        for version_id, result in zip(version_ids, results):
+            if result.get('error'):
+                self._log_status(f"    ⚠️  Could not read Flow {by_id[version_id].get('MasterLabel', version_id)}: "
+                                 f"{result['error']}")
+                continue
+            records = result.get('records', [])
+            if not records:
+                continue
+
+            version = by_id[version_id]
+            references = parse_flow_field_references(records[0].get('Metadata') or {})
+            fetched[version_id] = (
+                version.get('MasterLabel', ''),
+                {
+                    'process_type': version.get('ProcessType', ''),
+                    'fields': sorted(f"{object_name}.{field_name}" for object_name, field_name in references)
+                }
+            )
+        return fetched
+
+    def _query_all(self, soql: str) -> List[Dict]:
+        """Run a Tooling query and follow nextRecordsUrl until every record is fetched"""
+        result = self.sf.restful(f"tooling/query/?q={urllib.parse.quote(soql)}", method='GET')
+        records = list(result.get('records', []))
+        while not result.get('done', True) and result.get('nextRecordsUrl'):
+            result = self.sf.query_more(result['nextRecordsUrl'], identifier_is_url=True)
+            records.extend(result.get('records', []))
+        return records
+
+    def _log_status(self, message: str):
+        """Log status message"""
+        if self.status_callback:
+            self.status_callback(message, verbose=True)
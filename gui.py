@@ -1955,6 +1955,7 @@ class SalesforceExporterGUI(ctk.CTk):
             "session_id": self.sf_client.session_id,
             "instance_url": self.sf_client.base_url,
             "api_version": self.sf_client.api_version,
+            "http_session": self.sf_client.http_session,  # ✅ Shared pooled transport
             "user_name": self.username_entry.get(),
             "appearance_mode": current_appearance  # ✅ NEW: Pass theme to child
         }
@@ -2423,6 +2424,16 @@ class SalesforceExporterGUI(ctk.CTk):
         # self.export_metadata_button.configure(state="disabled")
         # self.run_soql_button.configure(state="disabled")
 
+        # ✅ Offer a delta export when this folder already holds a complete export of the org
+        incremental = False
+        watermark = self.content_document_exporter.get_incremental_watermark(output_file_path)
+        if watermark:
+            incremental = messagebox.askyesno(
+                "Incremental Export",
+                f"This folder already contains an export of this org (up to {watermark}).\n\n"
+                f"Only download files changed since then and write a separate delta CSV?"
+            )
+
         self.update_status("Starting ContentDocument export and file downloads...")
         start_time = time.time()
 
@@ -2430,7 +2441,8 @@ class SalesforceExporterGUI(ctk.CTk):
         def do_export():
             try:
                 output_path, stats = self.content_document_exporter.export_content_documents(
-                    output_file_path
+                    output_file_path,
+                    incremental=incremental
                 )
 
                 end_time = time.time()
@@ -2463,6 +2475,7 @@ class SalesforceExporterGUI(ctk.CTk):
             f"Documents Found: {stats['total_documents']}\n"
             f"Total Versions: {stats['total_versions']}\n"
             f"Successfully Downloaded: {stats['successful_downloads']}\n"
+            f"Already Downloaded: {stats.get('skipped_downloads', 0)}\n"
             f"Failed: {stats['failed_downloads']}\n\n"
             f"CSV File: {output_path}\n"
             f"Files Folder: {documents_folder}\n\n"
@@ -2509,6 +2522,8 @@ class SalesforceExporterGUI(ctk.CTk):
         """Clears connection, resets state, and returns to the login screen"""
         confirm = messagebox.askyesno("Logout", "Are you sure you want to log out?")
         if confirm:
+            if self.sf_client:
+                self.sf_client.close()
             self.sf_client = None
             self.picklist_exporter = None
             self.metadata_exporter = None
@@ -0,0 +1,74 @@
+"""
+Pooled HTTP transport shared by SalesforceClient and every exporter
+"""
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_MAX_RETRIES
+from api_governor import ApiGovernor
+
+
+class GovernedSession(requests.Session):
+    """requests.Session that routes every call through an ApiGovernor"""
+
+    def __init__(self, governor: ApiGovernor):
+        super().__init__()
+        self.governor = governor
+
+    def request(self, method, url, *args, **kwargs):
+        self.governor.acquire()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        finally:
+            self.governor.release()
+        self.governor.observe_response(response)
+        return response
+
+
+def create_pooled_session(pool_connections: int = HTTP_POOL_CONNECTIONS,
+                          pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                          max_retries: int = HTTP_MAX_RETRIES,
+                          governor: Optional[ApiGovernor] = None) -> requests.Session:
+    """
+    Create a keep-alive requests.Session with per-host connection pooling
+
+    The underlying urllib3 pools are thread-safe, so a single session can be
+    shared by worker threads. Only connection errors are retried here;
+    HTTP-level retries (429, 5xx) stay with the callers.
+
+    Args:
+        pool_connections: Number of distinct hosts to keep pools for
+        pool_maxsize: Maximum keep-alive connections per host
+        max_retries: Retries for failed connection attempts
+        governor: Optional ApiGovernor applied to every request
+
+    Returns:
+        Configured requests.Session
+    """
+    session = GovernedSession(governor) if governor else requests.Session()
+
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=0,
+        status=0,
+        backoff_factor=0.5,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    session.headers.update({
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive'
+    })
+
+    return session
@@ -0,0 +1,190 @@
+"""
+Page layout field index
+
+Lists the layouts of many objects with one Tooling query per chunk of
+objects, downloads the Metadata of every layout in composite batches
+(25 single-row queries per call, filled across objects) and parses each
+layout once into a field -> layouts map. The map is shared by every object
+in the export, so the per-object usage scan is a dictionary lookup.
+"""
+import threading
+import urllib.parse
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from simple_salesforce import Salesforce
+
+from composite_batch import CompositeBatch
+from usage_store import UsageStore
+
+
+def parse_layout_fields(metadata: Dict) -> Set[str]:
+    """Collect the field names placed on a layout"""
+    field_names = set()
+
+    # Parse layoutItems to find fields on the layout
+    # Safety check: any level can come back as None
+    for section in metadata.get('layoutSections') or []:
+        for column in section.get('layoutColumns') or []:
+            for item in column.get('layoutItems') or []:
+                field_name = item.get('field')
+                if field_name:
+                    field_names.add(field_name)
+
+    return field_names
+
+
+class LayoutUsageIndex:
+    """Field -> layouts map for the objects of an export"""
+
+    LISTING_CHUNK_SIZE = 100  # Object names per layout listing query
+
+    def __init__(self, sf: Salesforce, status_callback: Optional[Callable] = None,
+                 store: Optional[UsageStore] = None):
+        """
+        Initialize the (lazily filled) index
+
+        Args:
+            sf: simple_salesforce connection
+            status_callback: Optional callback for status updates
+            store: Persistent artifact store; only layouts whose LastModifiedDate
+                   changed since the last session are downloaded
+        """
+        self.sf = sf
+        self.status_callback = status_callback
+        self.store = store
+
+        # object name -> "Object.Field" -> layout names
+        self._usage: Dict[str, Dict[str, Set[str]]] = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, object_names: List[str]):
+        """
+        Load the layouts of many objects in as few round trips as possible
+
+        Args:
+            object_names: Object API names (already indexed objects are skipped)
+        """
+        if all(object_name in self._usage for object_name in object_names):
+            return
+
+        with self._lock:
+            missing = [object_name for object_name in dict.fromkeys(object_names)
+                       if object_name not in self._usage]
+            if missing:
+                self._usage.update(self._load(missing))
+
+    def get_field_usage(self, object_name: str) -> Dict[str, Set[str]]:
+        """
+        Get layout usage for the fields of one object
+
+        Returns:
+            Dict of "Object.Field" -> layout names
+        """
+        self.prefetch([object_name])
+        return {
+            field_key: set(layout_names)
+            for field_key, layout_names in self._usage.get(object_name, {}).items()
+        }
+
+    def _load(self, object_names: List[str]) -> Dict[str, Dict[str, Set[str]]]:
+        """List, sync and parse the layouts of the given objects"""
+        usage: Dict[str, Dict[str, Set[str]]] = {object_name: {} for object_name in object_names}
+
+        try:
+            layouts = self._list_layouts(object_names)
+            names = {layout['Id']: layout.get('Name', '') for layout in layouts}
+
+            listings: Dict[str, Dict[str, str]] = {
+                self._category(object_name): {} for object_name in object_names
+            }
+            for layout in layouts:
+                object_name = (layout.get('EntityDefinition') or {}).get('QualifiedApiName')
+                if object_name in usage:
+                    listings[self._category(object_name)][layout['Id']] = layout.get('LastModifiedDate') or ''
+
+            if self.store:
+                refreshed = self.store.refresh_many(listings, lambda ids: self._fetch_layouts(ids, names))
+                downloaded = sum(result[1] for result in refreshed.values())
+                parsed = {
+                    category: {layout_id: entry[2] for layout_id, entry in result[0].items()}
+                    for category, result in refreshed.items()
+                }
+            else:
+                fetched = self._fetch_layouts([layout['Id'] for layout in layouts], names)
+                downloaded = len(fetched)
+                parsed = {
+                    category: {
+                        layout_id: fetched[layout_id][1] for layout_id in listing if layout_id in fetched
+                    }
+                    for category, listing in listings.items()
+                }
+
+            for object_name in object_names:
+                for layout_id, field_names in parsed.get(self._category(object_name), {}).items():
+                    for field_name in field_names:
+                        usage[object_name].setdefault(f"{object_name}.{field_name}", set()).add(names[layout_id])
+
+            self._log_status(f"  📚 Indexed {len(layouts)} page layouts for {len(object_names)} objects "
+                             f"({downloaded} downloaded)")
+
+        except Exception as e:
+            self._log_status(f"    ⚠️  Could not query page layouts: {str(e)}")
+
+        return usage
+
+    def _list_layouts(self, object_names: List[str]) -> List[Dict]:
+        """List layout Ids (without Metadata) for chunks of objects"""
+        layouts = []
+        for start in range(0, len(object_names), self.LISTING_CHUNK_SIZE):
+            chunk = object_names[start:start + self.LISTING_CHUNK_SIZE]
+            name_list = ', '.join(f"'{object_name}'" for object_name in chunk)
+            layouts.extend(self._query_all(
+                "SELECT Id, Name, LastModifiedDate, EntityDefinition.QualifiedApiName FROM Layout "
+                f"WHERE EntityDefinition.QualifiedApiName IN ({name_list})"
+            ))
+        return [layout for layout in layouts if layout.get('Id')]
+
+    def _fetch_layouts(self, layout_ids: List[str], names: Dict[str, str]) -> Dict[str, Tuple[str, List[str]]]:
+        """
+        Download and parse the Metadata of specific layouts
+
+        Metadata can only be queried one row at a time, so every layout is a
+        single-row subrequest; composite batches send 25 of them per call.
+
+        Returns:
+            Dict of layout Id -> (layout name, sorted field names)
+        """
+        queries = [f"SELECT Id, Metadata FROM Layout WHERE Id = '{layout_id}'" for layout_id in layout_ids]
+        results = CompositeBatch.from_sf(self.sf, tooling=True).query_many(queries)
+
+        fetched = {}
+        for layout_id, result in zip(layout_ids, results):
+            if result.get('error'):
+                self._log_status(f"    ⚠️  Could not query Layout {names.get(layout_id, layout_id)}: "
+                                 f"{result['error']}")
+                continue
+            records = result.get('records') or []
+            metadata = records[0].get('Metadata') if records else None
+            fetched[layout_id] = (
+                names.get(layout_id, ''),
+                sorted(parse_layout_fields(metadata)) if metadata else []
+            )
+        return fetched
+
+    def _category(self, object_name: str) -> str:
+        """Usage store category holding one object's layouts"""
+        return f"Page Layouts:{object_name}"
+
+    def _query_all(self, soql: str) -> List[Dict]:
+        """Run a Tooling query and follow nextRecordsUrl until every record is fetched"""
+        result = self.sf.restful(f"tooling/query/?q={urllib.parse.quote(soql)}", method='GET')
+        records = list(result.get('records', []))
+        while not result.get('done', True) and result.get('nextRecordsUrl'):
+            result = self.sf.query_more(result['nextRecordsUrl'], identifier_is_url=True)
+            records.extend(result.get('records', []))
+        return records
+
+    def _log_status(self, message: str):
+        """Log status message"""
+        if self.status_callback:
+            self.status_callback(message, verbose=True)
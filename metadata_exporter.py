@@ -2,7 +2,7 @@
 Object metadata export functionality
 """
 import csv
-from typing import List, Dict, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 from openpyxl import Workbook
 import zipfile
 import os
@@ -13,6 +13,8 @@ from salesforce_client import SalesforceClient
 from field_usage_tracker import FieldUsageTracker
 from excel_style_helper import ExcelStyleHelper
 from metadata_summary_helper import MetadataSummaryHelper, MetadataSummaryData
+from worker_pool import OrderedWorkerPool
+from config import METADATA_EXPORT_WORKERS
 
 
 class MetadataExporter:
@@ -37,11 +39,30 @@ class MetadataExporter:
         'Field Usage'
     ]
     
-    def __init__(self, sf_client: SalesforceClient):
-        """Initialize with Salesforce client"""
+    def __init__(self, sf_client: SalesforceClient, max_workers: int = METADATA_EXPORT_WORKERS):
+        """
+        Initialize with Salesforce client
+        
+        Args:
+            sf_client: Connected SalesforceClient
+            max_workers: Number of objects processed in parallel
+        """
         self.sf_client = sf_client
         self.sf = sf_client.sf
-        self.usage_tracker = FieldUsageTracker(self.sf, sf_client.status_callback)
+        
+        # ✅ Objects are processed in parallel; worker log lines are replayed in order
+        self.worker_pool = OrderedWorkerPool(
+            max_workers=max_workers,
+            emit=self._emit_status,
+            thread_name_prefix='metadata-export'
+        )
+        
+        self.usage_tracker = FieldUsageTracker(
+            self.sf,
+            self._tracker_status,
+            describe_func=sf_client.describe,
+            usage_store=sf_client.usage_store
+        )
 
     
     def export_metadata(self, object_names: List[str], output_path: str) -> Tuple[str, Dict]:
@@ -71,10 +92,11 @@ class MetadataExporter:
         
         all_metadata_fields: List[MetadataField] = []
         
-        for i, obj_name in enumerate(object_names, 1):
-            self._log_status(f"[{i}/{len(object_names)}] Processing object: {obj_name}")
+        for i, obj_name, fields, error in self._iter_processed_objects(object_names):
             try:
-                fields = self._get_object_metadata(obj_name)
+                if error:
+                    raise error
+                
                 all_metadata_fields.extend(fields)
                 stats['successful_objects'] += 1
                 stats['total_fields'] += len(fields)
@@ -121,13 +143,16 @@ class MetadataExporter:
         
         # Dispatch to appropriate export method based on mode
         if export_mode == "single_tab":
-            return self._export_single_tab_with_summary(object_names, output_path, stats)
+            result = self._export_single_tab_with_summary(object_names, output_path, stats)
         elif export_mode == "multi_tab":
-            return self._export_multi_tab_with_summary(object_names, output_path, stats)
+            result = self._export_multi_tab_with_summary(object_names, output_path, stats)
         elif export_mode == "individual_files":
-            return self._export_individual_files_with_summary(object_names, output_path, stats)
+            result = self._export_individual_files_with_summary(object_names, output_path, stats)
         else:
             raise ValueError(f"Invalid export mode: {export_mode}")
+        
+        self.sf_client.log_describe_cache_stats()
+        return result
 
 
     def _export_single_tab_with_summary(self, object_names: List[str], 
@@ -141,11 +166,11 @@ class MetadataExporter:
         all_metadata_fields = []
         summary_data_list = []
         
-        for i, obj_name in enumerate(sorted(object_names), 1):
-            self._log_status(f"[{i}/{len(object_names)}] Processing object: {obj_name}")
-            
+        for i, obj_name, fields, error in self._iter_processed_objects(sorted(object_names)):
             try:
-                fields = self._get_object_metadata(obj_name)
+                if error:
+                    raise error
+                
                 all_metadata_fields.extend(fields)
                 stats['successful_objects'] += 1
                 stats['total_fields'] += len(fields)
@@ -287,11 +312,11 @@ class MetadataExporter:
         summary_data_list = []
         
         # Process each object and create a sheet
-        for i, obj_name in enumerate(sorted_objects, 1):
-            self._log_status(f"[{i}/{len(sorted_objects)}] Processing object: {obj_name}")
-            
+        for i, obj_name, fields, error in self._iter_processed_objects(sorted_objects):
             try:
-                fields = self._get_object_metadata(obj_name)
+                if error:
+                    raise error
+                
                 stats['successful_objects'] += 1
                 stats['total_fields'] += len(fields)
                 
@@ -367,11 +392,11 @@ class MetadataExporter:
         summary_data_list = []
         
         # Process each object
-        for i, obj_name in enumerate(sorted_objects, 1):
-            self._log_status(f"[{i}/{len(sorted_objects)}] Processing object: {obj_name}")
-            
+        for i, obj_name, fields, error in self._iter_processed_objects(sorted_objects):
             try:
-                fields = self._get_object_metadata(obj_name)
+                if error:
+                    raise error
+                
                 stats['successful_objects'] += 1
                 stats['total_fields'] += len(fields)
                 
@@ -509,10 +534,11 @@ class MetadataExporter:
         # Collect all metadata fields
         all_metadata_fields: List[MetadataField] = []
         
-        for i, obj_name in enumerate(sorted(object_names), 1):  # ✅ Sort alphabetically
-            self._log_status(f"[{i}/{len(object_names)}] Processing object: {obj_name}")
+        for i, obj_name, fields, error in self._iter_processed_objects(sorted(object_names)):  # ✅ Sort alphabetically
             try:
-                fields = self._get_object_metadata(obj_name)
+                if error:
+                    raise error
+                
                 all_metadata_fields.extend(fields)
                 stats['successful_objects'] += 1
                 stats['total_fields'] += len(fields)
@@ -627,11 +653,11 @@ class MetadataExporter:
         sorted_objects = sorted(object_names)
         
         # Process each object and create a sheet
-        for i, obj_name in enumerate(sorted_objects, 1):
-            self._log_status(f"[{i}/{len(sorted_objects)}] Processing object: {obj_name}")
-            
+        for i, obj_name, fields, error in self._iter_processed_objects(sorted_objects):
             try:
-                fields = self._get_object_metadata(obj_name)
+                if error:
+                    raise error
+                
                 stats['successful_objects'] += 1
                 stats['total_fields'] += len(fields)
                 
@@ -758,11 +784,11 @@ class MetadataExporter:
         created_files = []
         
         # Process each object
-        for i, obj_name in enumerate(sorted_objects, 1):
-            self._log_status(f"[{i}/{len(sorted_objects)}] Processing object: {obj_name}")
-            
+        for i, obj_name, fields, error in self._iter_processed_objects(sorted_objects):
             try:
-                fields = self._get_object_metadata(obj_name)
+                if error:
+                    raise error
+                
                 stats['successful_objects'] += 1
                 stats['total_fields'] += len(fields)
                 
@@ -915,6 +941,36 @@ class MetadataExporter:
             raise   
         
     
+    def _iter_processed_objects(
+        self, 
+        object_names: List[str]
+    ) -> Iterator[Tuple[int, str, Optional[List[MetadataField]], Optional[Exception]]]:
+        """
+        ✅ PARALLEL: Run _get_object_metadata on the worker pool, yielding in input order
+        
+        Stats, summaries and workbook writes stay on the calling thread. A
+        failing object yields its exception instead of its fields.
+        
+        Args:
+            object_names: Object API names in output order
+            
+        Yields:
+            Tuple of (position, object name, fields or None, error or None)
+        """
+        # ✅ Layout Metadata for all objects in one go (shared field -> layouts map)
+        self.usage_tracker.prefetch_layouts(object_names)
+        
+        # ✅ Describes are fetched concurrently one window ahead of the loop, so
+        # they are still in the in-memory cache when their object is processed
+        total = len(object_names)
+        for offset, window, prefetched in self.sf_client.iter_prefetched_windows(object_names):
+            self._log_status(f"📦 Prefetched {prefetched}/{len(window)} object describes")
+            for i, obj_name, result, error in self.worker_pool.imap(
+                    self._get_object_metadata,
+                    window,
+                    header=lambda i, _, obj_name, offset=offset: f"[{offset + i}/{total}] Processing object: {obj_name}"):
+                yield offset + i, obj_name, result, error
+    
     def _get_object_metadata(self, object_name: str) -> List[MetadataField]:
         """
         Get metadata for all fields of an object
@@ -924,7 +980,7 @@ class MetadataExporter:
         metadata_fields = []
         
         try:
-            obj_describe = getattr(self.sf, object_name).describe()
+            obj_describe = self.sf_client.describe(object_name)
             
             for field in obj_describe['fields']:
                 try:
@@ -1241,6 +1297,14 @@ class MetadataExporter:
         return output_path
     
     def _log_status(self, message: str):
-        """Log status message"""
+        """Log status message (buffered while running on a worker thread)"""
+        self.worker_pool.log(message)
+    
+    def _tracker_status(self, message: str, verbose: bool = True):
+        """Status callback handed to FieldUsageTracker"""
+        self.worker_pool.log(message)
+    
+    def _emit_status(self, message: str):
+        """Send a status message to the GUI"""
         if self.sf_client.status_callback:
             self.sf_client.status_callback(message, verbose=True)
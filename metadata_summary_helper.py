@@ -211,7 +211,7 @@ class MetadataSummaryHelper:
             Comma-separated list of master object names, or empty string
         """
         try:
-            obj_describe = getattr(sf_client.sf, object_api).describe()
+            obj_describe = sf_client.describe(object_api)
             
             master_objects = []
             
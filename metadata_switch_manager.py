@@ -10,6 +10,7 @@ from datetime import datetime
 import requests
 from simple_salesforce import Salesforce
 from trigger_deployer import TriggerDeployer
+from composite_batch import CompositeBatch
 
 
 class MetadataComponent:
@@ -56,6 +57,9 @@ class MetadataSwitchManager:
         self.base_url = f"https://{sf.sf_instance}"
         self.session_id = sf.session_id
         self.api_version = sf.sf_version
+        # Reuse the pooled session the Salesforce connection was created with.
+        # Its ApiGovernor paces every call, so no fixed sleeps are needed here.
+        self.http = getattr(sf, 'session', None) or requests.Session()
         self.headers = {
             'Authorization': f'Bearer {self.session_id}',
             'Content-Type': 'application/json'
@@ -206,23 +210,26 @@ class MetadataSwitchManager:
                 self._log("No flow definitions found")
                 return components
             
-            # For each flow definition, fetch its active or latest version
-            for definition in definitions_result['records']:
-                # Prefer ActiveVersionId, fallback to LatestVersionId
-                flow_version_id = definition.get('ActiveVersionId') or definition.get('LatestVersionId')
-                
-                if not flow_version_id:
+            # Prefer ActiveVersionId, fallback to LatestVersionId
+            definitions = [
+                definition for definition in definitions_result['records']
+                if definition.get('ActiveVersionId') or definition.get('LatestVersionId')
+            ]
+            
+            # Queue one Flow query per definition and send them in composite batches
+            flow_results = self._tooling_query_many([
+                f"SELECT Id, MasterLabel, ProcessType, Status, VersionNumber "
+                f"FROM Flow "
+                f"WHERE Id = '{definition.get('ActiveVersionId') or definition.get('LatestVersionId')}'"
+                for definition in definitions
+            ])
+            
+            for definition, flow_result in zip(definitions, flow_results):
+                if flow_result.get('error'):
+                    self._log(f"Tooling API error for flow {definition.get('DeveloperName')}: "
+                              f"{flow_result['error']}")
                     continue
                 
-                # Now query the actual Flow record for this specific version
-                flow_query = f"""
-                    SELECT Id, MasterLabel, ProcessType, Status, VersionNumber
-                    FROM Flow
-                    WHERE Id = '{flow_version_id}'
-                """
-                
-                flow_result = self._tooling_query(flow_query)
-                
                 if not flow_result.get('records'):
                     continue
                 
@@ -391,10 +398,7 @@ class MetadataSwitchManager:
                     total_failed += 1
                     failed_components.append(component.name)
                     self._log(f"  ❌ {component.name}: {str(e)}")
-            
-            # Small delay between batches to avoid rate limits
-            if batch_num < len(batches):
-                time.sleep(0.5)
+
         
         if total_failed == 0:
             message = f"✅ Successfully deployed {total_success} component(s)"
@@ -441,10 +445,7 @@ class MetadataSwitchManager:
                 failed_count += 1
                 failed_triggers.append(trigger.name)
                 self._log(f"  ❌ Error deploying {trigger.name}: {str(e)}")
-            
-            # Delay between triggers to avoid overwhelming the org
-            if idx < len(triggers):
-                time.sleep(2)
+
         
         if failed_count == 0:
             message = f"✅ Successfully deployed {success_count} trigger(s)"
@@ -482,7 +483,7 @@ class MetadataSwitchManager:
             
             url = f"{self.base_url}/services/data/v{self.api_version}/tooling/sobjects/ValidationRule/{component.record_id}"
 
-            response = requests.get(url, headers=self.headers)
+            response = self.http.get(url, headers=self.headers)
             existing_metadata = response.json()['Metadata']
 
             existing_metadata['active'] = component.is_active
@@ -490,7 +491,7 @@ class MetadataSwitchManager:
                 "Metadata": existing_metadata
             }
             
-            response = requests.patch(url, headers=self.headers, json=payload, timeout=60)
+            response = self.http.patch(url, headers=self.headers, json=payload, timeout=60)
             
             if response.status_code == 204:
                 return True
@@ -511,7 +512,7 @@ class MetadataSwitchManager:
 
             # Step 1: Get the existing workflow rule metadata
             url = f"{self.base_url}/services/data/v{self.api_version}/tooling/sobjects/WorkflowRule/{component.record_id}"
-            response = requests.get(url, headers=self.headers)
+            response = self.http.get(url, headers=self.headers)
             existing_metadata = response.json()['Metadata']
 
             # Step 2: Modify only the active field
@@ -522,7 +523,7 @@ class MetadataSwitchManager:
                 "Metadata": existing_metadata
             }
             
-            response = requests.patch(url, headers=self.headers, json=payload, timeout=60)
+            response = self.http.patch(url, headers=self.headers, json=payload, timeout=60)
             
             if response.status_code == 204:
                 return True
@@ -550,7 +551,7 @@ class MetadataSwitchManager:
 
             # Step 2: Get the existing FlowDefinition metadata
             definition_url = f"{self.base_url}/services/data/v{self.api_version}/tooling/sobjects/FlowDefinition/{definition_id}"
-            definition_response = requests.get(definition_url, headers=self.headers, timeout=60)
+            definition_response = self.http.get(definition_url, headers=self.headers, timeout=60)
             existing_metadata = definition_response.json().get('Metadata', {})
 
             # Step 3: Update the metadata with ActiveVersion
@@ -564,7 +565,7 @@ class MetadataSwitchManager:
                 "Metadata": existing_metadata
             }
 
-            response = requests.patch(definition_url, headers=self.headers, json=payload, timeout=60)
+            response = self.http.patch(definition_url, headers=self.headers, json=payload, timeout=60)
             
             if response.status_code == 204:
                 return True
@@ -601,7 +602,8 @@ class MetadataSwitchManager:
                 base_url=self.base_url,
                 api_version=self.api_version,
                 headers=self.headers,
-                logger=self._log
+                logger=self._log,
+                session=self.http
             )
 
             # Retry logic for transient failures
@@ -643,7 +645,7 @@ class MetadataSwitchManager:
             import urllib.parse
             encoded_query = urllib.parse.quote(soql)
             url = f"{self.base_url}/services/data/v{self.api_version}/tooling/query/?q={encoded_query}"
-            response = requests.get(url, headers=self.headers, timeout=60)
+            response = self.http.get(url, headers=self.headers, timeout=60)
             
             if response.status_code == 200:
                 return response.json()
@@ -655,6 +657,18 @@ class MetadataSwitchManager:
             self._log(f"Tooling API exception: {str(e)}")
             return {'records': []}
     
+    def _tooling_query_many(self, queries: List[str]) -> List[dict]:
+        """Execute several Tooling API queries through composite batches (25 per call)"""
+        if not queries:
+            return []
+        try:
+            batch = CompositeBatch(self.http, self.base_url, self.api_version,
+                                   self.headers, tooling=True)
+            return batch.query_many(queries)
+        except Exception as e:
+            self._log(f"Tooling batch exception: {str(e)}")
+            return [{'records': []} for _ in queries]
+    
     def get_modified_count(self, component_type: str) -> int:
         """Get count of modified components"""
         components = self.get_components(component_type)
@@ -3,9 +3,8 @@
 Picklist export functionality
 UPDATED: Added IsGlobal? column detection and updated headers
 """
-import requests
 import urllib.parse
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
@@ -14,23 +13,38 @@ import os
 from datetime import datetime
 import tempfile
 
-from config import API_VERSION
+from config import API_VERSION, PICKLIST_EXPORT_WORKERS
 from models import FieldInfo, PicklistValueDetail, ProcessingResult
 from salesforce_client import SalesforceClient
 from excel_style_helper import ExcelStyleHelper
 from picklist_summary_helper import PicklistSummaryHelper, PicklistSummaryData
+from worker_pool import OrderedWorkerPool
 
 
 class PicklistExporter:
     """Handles picklist data export from Salesforce"""
     
-    def __init__(self, sf_client: SalesforceClient):
-        """Initialize with Salesforce client"""
+    def __init__(self, sf_client: SalesforceClient, max_workers: int = PICKLIST_EXPORT_WORKERS):
+        """
+        Initialize with Salesforce client
+        
+        Args:
+            sf_client: Connected SalesforceClient
+            max_workers: Number of objects processed in parallel
+        """
         self.sf_client = sf_client
         self.sf = sf_client.sf
         self.base_url = sf_client.base_url
         self.headers = sf_client.headers
         self.api_version = sf_client.api_version
+        self.http = sf_client.http_session
+        
+        # ✅ Objects are processed in parallel; worker log lines are replayed in order
+        self.worker_pool = OrderedWorkerPool(
+            max_workers=max_workers,
+            emit=self._emit_status,
+            thread_name_prefix='picklist-export'
+        )
     
     # ✅ UPDATED: New headers with "IsGlobal?" column
     PICKLIST_HEADERS = [
@@ -80,10 +94,10 @@ class PicklistExporter:
         
         all_rows = []
         
-        for i, obj_name in enumerate(object_names, 1):
-            self._log_status(f"[{i}/{len(object_names)}] Processing object: {obj_name}")
+        for i, obj_name, result, error in self._iter_processed_objects(object_names):
             try:
-                result = self._process_object(obj_name)
+                if error:
+                    raise error
                 
                 if not result.object_exists:
                     stats['objects_not_found'] += 1
@@ -169,13 +183,16 @@ class PicklistExporter:
         
         # Dispatch to appropriate export method based on mode
         if export_mode == "single_tab":
-            return self._export_single_tab_with_summary(object_names, output_path, stats)
+            result = self._export_single_tab_with_summary(object_names, output_path, stats)
         elif export_mode == "multi_tab":
-            return self._export_multi_tab_with_summary(object_names, output_path, stats)
+            result = self._export_multi_tab_with_summary(object_names, output_path, stats)
         elif export_mode == "individual_files":
-            return self._export_individual_files_with_summary(object_names, output_path, stats)
+            result = self._export_individual_files_with_summary(object_names, output_path, stats)
         else:
             raise ValueError(f"Invalid export mode: {export_mode}")
+        
+        self.sf_client.log_describe_cache_stats()
+        return result
     
 
     def _export_single_tab_with_summary(self, object_names: List[str], 
@@ -189,11 +206,10 @@ class PicklistExporter:
         all_rows = []
         summary_data_list = []
         
-        for i, obj_name in enumerate(sorted(object_names), 1):
-            self._log_status(f"[{i}/{len(object_names)}] Processing object: {obj_name}")
-            
+        for i, obj_name, result, error in self._iter_processed_objects(sorted(object_names)):
             try:
-                result = self._process_object(obj_name)
+                if error:
+                    raise error
                 
                 if not result.object_exists:
                     stats['objects_not_found'] += 1
@@ -363,11 +379,10 @@ class PicklistExporter:
         summary_data_list = []
         
         # Process each object and create a sheet
-        for i, obj_name in enumerate(sorted_objects, 1):
-            self._log_status(f"[{i}/{len(sorted_objects)}] Processing object: {obj_name}")
-            
+        for i, obj_name, result, error in self._iter_processed_objects(sorted_objects):
             try:
-                result = self._process_object(obj_name)
+                if error:
+                    raise error
                 
                 if not result.object_exists:
                     stats['objects_not_found'] += 1
@@ -474,11 +489,10 @@ class PicklistExporter:
         summary_data_list = []
         
         # Process each object
-        for i, obj_name in enumerate(sorted_objects, 1):
-            self._log_status(f"[{i}/{len(sorted_objects)}] Processing object: {obj_name}")
-            
+        for i, obj_name, result, error in self._iter_processed_objects(sorted_objects):
             try:
-                result = self._process_object(obj_name)
+                if error:
+                    raise error
                 
                 if not result.object_exists:
                     stats['objects_not_found'] += 1
@@ -611,11 +625,10 @@ class PicklistExporter:
         # Collect all data first
         all_rows = []
         
-        for i, obj_name in enumerate(sorted(object_names), 1):  # ✅ Sort alphabetically
-            self._log_status(f"[{i}/{len(object_names)}] Processing object: {obj_name}")
-            
+        for i, obj_name, result, error in self._iter_processed_objects(sorted(object_names)):  # ✅ Sort alphabetically
             try:
-                result = self._process_object(obj_name)
+                if error:
+                    raise error
                 
                 if not result.object_exists:
                     stats['objects_not_found'] += 1
@@ -766,11 +779,10 @@ class PicklistExporter:
         sorted_objects = sorted(object_names)
         
         # Process each object and create a sheet
-        for i, obj_name in enumerate(sorted_objects, 1):
-            self._log_status(f"[{i}/{len(sorted_objects)}] Processing object: {obj_name}")
-            
+        for i, obj_name, result, error in self._iter_processed_objects(sorted_objects):
             try:
-                result = self._process_object(obj_name)
+                if error:
+                    raise error
                 
                 if not result.object_exists:
                     stats['objects_not_found'] += 1
@@ -1001,11 +1013,10 @@ class PicklistExporter:
         created_files = []
         
         # Process each object
-        for i, obj_name in enumerate(sorted_objects, 1):
-            self._log_status(f"[{i}/{len(sorted_objects)}] Processing object: {obj_name}")
-            
+        for i, obj_name, result, error in self._iter_processed_objects(sorted_objects):
             try:
-                result = self._process_object(obj_name)
+                if error:
+                    raise error
                 
                 if not result.object_exists:
                     stats['objects_not_found'] += 1
@@ -1203,45 +1214,68 @@ class PicklistExporter:
 
     
     
+    def _iter_processed_objects(
+        self, 
+        object_names: List[str]
+    ) -> Iterator[Tuple[int, str, Optional[ProcessingResult], Optional[Exception]]]:
+        """
+        ✅ PARALLEL: Process objects on the worker pool, yielding in input order
+        
+        Stats, summaries and workbook writes stay on the calling thread. A
+        failing object yields its exception instead of a result.
+        
+        Args:
+            object_names: Object API names in output order
+            
+        Yields:
+            Tuple of (position, object name, result or None, error or None)
+        """
+        # ✅ Describes are fetched concurrently one window ahead of the loop, so
+        # they are still in the in-memory cache when their object is processed
+        total = len(object_names)
+        for offset, window, prefetched in self.sf_client.iter_prefetched_windows(object_names):
+            self._log_status(f"📦 Prefetched {prefetched}/{len(window)} object describes")
+            for i, obj_name, result, error in self.worker_pool.imap(
+                    self._process_object,
+                    window,
+                    header=lambda i, _, obj_name, offset=offset: f"[{offset + i}/{total}] Processing object: {obj_name}"):
+                yield offset + i, obj_name, result, error
+    
     def _process_object(self, obj_name: str) -> ProcessingResult:
         """
         Process a single object for picklist fields
         
         ✅ UPDATED: Tracks global picklists and adds IsGlobal column
+        ✅ BULK: All picklist fields of the object are loaded in a handful of calls
         """
         result = ProcessingResult()
         
         try:
-            getattr(self.sf, obj_name).describe()
+            obj_describe = self.sf_client.describe(obj_name)
         except Exception as e:
             if 'NOT_FOUND' in str(e) or 'INVALID_TYPE' in str(e):
                 result.object_exists = False
                 return result
             raise
         
-        picklist_fields = self._get_picklist_fields(obj_name)
-        result.picklist_fields_count = len(picklist_fields)
+        picklist_describes = [
+            field for field in obj_describe.get('fields', [])
+            if field['type'] in ['picklist', 'multipicklist']
+        ]
+        result.picklist_fields_count = len(picklist_describes)
         
-        if not picklist_fields:
+        if not picklist_describes:
             return result
         
-        self._log_status(f"  Found {len(picklist_fields)} picklist fields")
-        
-        entity_def_id = self._resolve_entity_definition_id(obj_name)
-        if entity_def_id:
-            self._log_status(f"  EntityDefinition.Id: {entity_def_id}")
+        self._log_status(f"  Found {len(picklist_describes)} picklist fields")
         
-        for field_api, field_info in picklist_fields.items():
+        for field_info, values in self._load_picklists_bulk(obj_name, picklist_describes):
+            field_api = field_info.api_name
+            
             # ✅ Track global picklists
             if field_info.is_global:
                 result.global_picklist_count += 1
             
-            values = self._query_picklist_values_with_fallback(
-                obj_name, 
-                entity_def_id, 
-                field_api
-            )
-            
             if not values:
                 continue
             
@@ -1274,195 +1308,103 @@ class PicklistExporter:
         return result    
     
     
-
-    
-    
-    def _get_picklist_fields(self, object_name: str) -> Dict[str, FieldInfo]:
+    def _load_picklists_bulk(
+        self, 
+        object_name: str, 
+        picklist_describes: List[Dict]
+    ) -> List[Tuple[FieldInfo, List[PicklistValueDetail]]]:
         """
-        Get all picklist fields for an object
+        ✅ BULK: Load values, active flags and global value set info for every
+        picklist field of an object
         
-        ✅ FIXED: Uses Tooling API to accurately detect global picklists
-        """
-        fields_dict = {}
-        try:
-            obj_describe = getattr(self.sf, object_name).describe()
-            
-            for field in obj_describe['fields']:
-                if field['type'] in ['picklist', 'multipicklist']:
-                    # ✅ NEW: Use Tooling API to check if global
-                    is_global = self._is_global_picklist_tooling(object_name, field['name'])
-                    
-                    fields_dict[field['name']] = FieldInfo(
-                        api_name=field['name'], 
-                        label=field['label'],
-                        is_global=is_global
-                    )
-                    
-        except Exception as e:
-            self._log_status(f"  ERROR in _get_picklist_fields: {str(e)}")
-            
-        return fields_dict
-    
-
-    def _is_global_picklist_tooling(self, object_name: str, field_name: str) -> bool:
-        """
-        ✅ FIXED: Accurately detect if a picklist uses a Global Value Set
+        Values and active flags come from the describe picklistValues (already
+        cached). Only global value set detection needs the Tooling API, and
+        Metadata can only be queried one row at a time, so each field gets a
+        single-row query and all of them go out in chunks of 25 through
+        /tooling/composite/batch:
+        
+        - Custom fields: CustomField Metadata (the reliable source for them)
+        - Standard fields: FieldDefinition Metadata
         
         The ONLY reliable way to detect a global value set is to check if
         valueSetName exists in the metadata.
         
-        Args:
-            object_name: Object API name (e.g., 'Opportunity')
-            field_name: Field API name (e.g., 'Industry')
-            
-        Returns:
-            True if field uses global value set, False otherwise
-        """
-        try:
-            # ✅ For custom fields, use CustomField API (more reliable)
-            if field_name.endswith('__c'):
-                return self._check_custom_field_global(object_name, field_name)
-            
-            # ✅ For standard fields, use FieldDefinition API
-            qualified_field_name = f"{object_name}.{field_name}"
-            
-            query = (
-                f"SELECT QualifiedApiName, Metadata "
-                f"FROM FieldDefinition "
-                f"WHERE QualifiedApiName = '{qualified_field_name}'"
-            )
-            
-            import urllib.parse
-            encoded_query = urllib.parse.quote(query)
-            url = f"{self.base_url}/services/data/v{self.api_version}/tooling/query/?q={encoded_query}"
-            
-            response = requests.get(url, headers=self.headers, timeout=30)
-            
-            if response.status_code != 200:
-                return False
-            
-            data = response.json()
-            records = data.get('records', [])
-            
-            if not records:
-                return False
-            
-            metadata = records[0].get('Metadata', {})
-            if not metadata:
-                return False
-            
-            value_set = metadata.get('valueSet', {})
-            if not value_set:
-                return False
-            
-            # ✅ THE ONLY RELIABLE CHECK: Does valueSetName exist?
-            # valueSetName points to the Global Value Set name
-            value_set_name = value_set.get('valueSetName')
-            
-            if value_set_name:
-                self._log_status(f"    ✅ {field_name}: Global picklist (valueSetName: {value_set_name})")
-                return True
-            else:
-                self._log_status(f"    ℹ️ {field_name}: Local picklist")
-                return False
-            
-        except Exception as e:
-            self._log_status(f"    ⚠️ Error checking {field_name}: {str(e)}")
-            return False
-
-
-    def _check_custom_field_global(self, object_name: str, field_name: str) -> bool:
-        """
-        ✅ Check if a CUSTOM field uses a Global Value Set
-        Uses CustomField Tooling API which is more reliable for custom fields
-        
         Args:
             object_name: Object API name
-            field_name: Custom field API name (must end with __c)
+            picklist_describes: Picklist field entries from the object describe
             
         Returns:
-            True if field uses global value set, False otherwise
+            List of (FieldInfo, values) in describe order
         """
-        try:
-            # Remove __c suffix to get DeveloperName
-            dev_name = field_name[:-3]
-            
-            query = (
-                f"SELECT Id, DeveloperName, Metadata "
-                f"FROM CustomField "
-                f"WHERE TableEnumOrId = '{object_name}' "
-                f"AND DeveloperName = '{dev_name}'"
-            )
-            
-            import urllib.parse
-            encoded_query = urllib.parse.quote(query)
-            url = f"{self.base_url}/services/data/v{self.api_version}/tooling/query/?q={encoded_query}"
-            
-            response = requests.get(url, headers=self.headers, timeout=30)
-            
-            if response.status_code != 200:
-                return False
-            
-            data = response.json()
-            records = data.get('records', [])
-            
-            if not records:
-                return False
-            
-            metadata = records[0].get('Metadata', {})
-            value_set = metadata.get('valueSet', {})
+        standard_fields = [field['name'] for field in picklist_describes if not field['name'].endswith('__c')]
+        custom_fields = [field['name'] for field in picklist_describes if field['name'].endswith('__c')]
+        
+        queries = [
+            f"SELECT QualifiedApiName, Metadata FROM FieldDefinition "
+            f"WHERE EntityDefinition.QualifiedApiName = '{object_name}' "
+            f"AND QualifiedApiName = '{field_name}'"
+            for field_name in standard_fields
+        ]
+        if custom_fields:
+            # Custom objects are matched by EntityDefinition Id, standard ones by name
+            table_enum = object_name
+            if '__' in object_name:
+                table_enum = self._resolve_entity_definition_id(object_name) or object_name
+            queries += [
+                f"SELECT Metadata FROM CustomField "
+                f"WHERE TableEnumOrId = '{table_enum}' AND DeveloperName = '{field_name[:-3]}'"
+                for field_name in custom_fields
+            ]
+        metadata_by_field = self._query_field_metadata_batch(standard_fields + custom_fields, queries)
+        
+        loaded = []
+        for field in picklist_describes:
+            value_set = (metadata_by_field.get(field['name']) or {}).get('valueSet') or {}
             
             # ✅ THE DEFINITIVE CHECK: valueSetName exists = Global Value Set
-            value_set_name = value_set.get('valueSetName')
-            
-            if value_set_name:
-                self._log_status(f"    ✅ {field_name}: Global picklist (valueSetName: {value_set_name})")
-                return True
-            else:
-                self._log_status(f"    ℹ️ {field_name}: Local picklist")
-                return False
-            
+            is_global = bool(value_set.get('valueSetName'))
+            
+            values = [
+                PicklistValueDetail(
+                    label=pv.get('label', ''), 
+                    value=pv.get('value', ''), 
+                    is_active=pv.get('active', True)
+                ) for pv in field.get('picklistValues', [])
+            ]
+            
+            loaded.append((
+                FieldInfo(api_name=field['name'], label=field['label'], is_global=is_global),
+                values
+            ))
+        
+        return loaded
+    
+    def _query_field_metadata_batch(self, field_names: List[str], queries: List[str]) -> Dict[str, dict]:
+        """Run one single-row Metadata query per field through composite batches"""
+        metadata_by_field = {}
+        try:
+            results = self.sf_client.composite_batch(tooling=True).query_many(queries)
         except Exception as e:
-            self._log_status(f"    ⚠️ Error checking {field_name}: {str(e)}")
-            return False
-
-
-    def _is_global_picklist_describe(self, object_name: str, field_name: str) -> bool:
-        """
-        ⚠️ FALLBACK METHOD: Use standard describe() API
-        This is a last-resort fallback if Tooling API fails
+            self._log_status(f"      ERROR queryFieldMetadataBatch: {str(e)}")
+            return metadata_by_field
         
-        Note: describe() doesn't reliably indicate global value sets,
-        so this method returns False by default for safety.
+        for field_name, data in zip(field_names, results):
+            if data.get('error'):
+                self._log_status(f"      ⚠️ {field_name}: {data['error']}")
+                continue
+            records = data.get('records', [])
+            if records and records[0].get('Metadata'):
+                metadata_by_field[field_name] = records[0]['Metadata']
         
-        Args:
-            object_name: Object API name
-            field_name: Field API name
-            
-        Returns:
-            False (describe API doesn't provide global value set info)
-        """
-        try:
-            # The standard describe() API doesn't include information about
-            # whether a picklist uses a Global Value Set or not.
-            # It only shows the picklist values themselves.
-            
-            self._log_status(f"    ℹ️ {field_name}: Using fallback describe (cannot detect global)")
-            return False
-            
-        except Exception as e:
-            self._log_status(f"    ⚠️ Error in describe fallback for {field_name}: {str(e)}")
-            return False
-
-
-
+        return metadata_by_field
+    
     
     def _resolve_entity_definition_id(self, object_name: str) -> Optional[str]:
         """Resolve EntityDefinition ID for an object"""
         try:
             query = f"SELECT Id FROM EntityDefinition WHERE QualifiedApiName = '{object_name}'"
             url = f"{self.base_url}/services/data/v{self.api_version}/tooling/query/"
-            response = requests.get(url, headers=self.headers, params={'q': query}, timeout=60)
+            response = self.http.get(url, headers=self.headers, params={'q': query}, timeout=60)
             
             if response.status_code == 200:
                 records = response.json().get('records', [])
@@ -1476,121 +1418,6 @@ class PicklistExporter:
     
     
     
-    def _query_picklist_values_with_fallback(
-        self, 
-        object_name: str, 
-        entity_def_id: Optional[str], 
-        field_name: str
-    ) -> List[PicklistValueDetail]:
-        """Query picklist values using multiple fallback methods"""
-        
-        values = self._query_field_definition_tooling(object_name, field_name)
-        if values:
-            return values
-        
-        if entity_def_id:
-            values = self._query_custom_field_tooling(entity_def_id, field_name)
-            if values:
-                return values
-        
-        values = self._query_custom_field_tooling_table_enum(object_name, field_name)
-        if values:
-            return values
-        
-        values = self._query_rest_describe_for_picklist(object_name, field_name)
-        if values:
-            return values
-        
-        return []
-    
-    def _query_field_definition_tooling(self, object_name: str, field_name: str) -> List[PicklistValueDetail]:
-        """Query using FieldDefinition"""
-        try:
-            query = f"SELECT Metadata FROM FieldDefinition WHERE EntityDefinition.QualifiedApiName = '{object_name}' AND QualifiedApiName = '{field_name}'"
-            url = f"{self.base_url}/services/data/v{self.api_version}/tooling/query/"
-            response = requests.get(url, headers=self.headers, params={'q': query}, timeout=60)
-            if response.status_code == 200:
-                records = response.json().get('records', [])
-                if records:
-                    return self._parse_value_set(records[0].get('Metadata', {}))
-        except Exception as e:
-            self._log_status(f"      ERROR queryFieldDefinitionTooling: {str(e)}")
-        return []
-    
-    def _query_custom_field_tooling(self, entity_def_id: str, field_name: str) -> List[PicklistValueDetail]:
-        """Query using CustomField with entity ID"""
-        try:
-            dev_name = field_name[:-3] if field_name.endswith('__c') else field_name
-            query = f"SELECT Metadata FROM CustomField WHERE TableEnumOrId = '{entity_def_id}' AND DeveloperName = '{dev_name}'"
-            url = f"{self.base_url}/services/data/v{self.api_version}/tooling/query/"
-            response = requests.get(url, headers=self.headers, params={'q': query}, timeout=60)
-            if response.status_code == 200:
-                records = response.json().get('records', [])
-                if records:
-                    return self._parse_value_set(records[0].get('Metadata', {}))
-        except Exception as e:
-            self._log_status(f"      ERROR queryCustomFieldTooling: {str(e)}")
-        return []
-    
-    def _query_custom_field_tooling_table_enum(self, object_name: str, field_name: str) -> List[PicklistValueDetail]:
-        """Query using CustomField with object name"""
-        try:
-            dev_name = field_name[:-3] if field_name.endswith('__c') else field_name
-            query = f"SELECT Metadata FROM CustomField WHERE TableEnumOrId = '{object_name}' AND DeveloperName = '{dev_name}'"
-            url = f"{self.base_url}/services/data/v{self.api_version}/tooling/query/"
-            response = requests.get(url, headers=self.headers, params={'q': query}, timeout=60)
-            if response.status_code == 200:
-                records = response.json().get('records', [])
-                if records:
-                    return self._parse_value_set(records[0].get('Metadata', {}))
-        except Exception as e:
-            self._log_status(f"      ERROR queryCustomFieldToolingTableEnum: {str(e)}")
-        return []
-    
-    def _query_rest_describe_for_picklist(self, object_name: str, field_name: str) -> List[PicklistValueDetail]:
-        """Query using REST describe endpoint"""
-        try:
-            url = f"{self.base_url}/services/data/v{self.api_version}/sobjects/{object_name}/describe"
-            response = requests.get(url, headers=self.headers, timeout=60)
-            if response.status_code == 200:
-                for field in response.json().get('fields', []):
-                    if field['name'].lower() == field_name.lower():
-                        return [
-                            PicklistValueDetail(
-                                label=pv.get('label', ''), 
-                                value=pv.get('value', ''), 
-                                is_active=pv.get('active', True)
-                            ) for pv in field.get('picklistValues', [])
-                        ]
-        except Exception as e:
-            self._log_status(f"      ERROR queryRestDescribeForPicklist: {str(e)}")
-        return []
-    
-    def _parse_value_set(self, metadata: dict) -> List[PicklistValueDetail]:
-        """Parse picklist values from metadata"""
-        results = []
-        try:
-            value_set = metadata.get('valueSet', {})
-            if not value_set:
-                return results
-            
-            values = value_set.get('valueSetDefinition', {}).get('value', []) or value_set.get('value', [])
-            for v in values:
-                # is_active = bool(v.get('isActive', True))
-                is_active_raw = v.get('isActive')
-                if is_active_raw is None:
-                    is_active = True  # Default for missing key
-                else:
-                    is_active = bool(is_active_raw)  # Convert any truthy/falsy value
-                results.append(PicklistValueDetail(
-                    label=v.get('label', ''), 
-                    value=v.get('valueName') or v.get('value', ''), 
-                    is_active=is_active
-                ))
-        except Exception as e:
-            self._log_status(f"      ERROR parseValueSet: {str(e)}")
-        return results
-    
     def _create_excel_file(self, rows: List[List[str]], output_path: str) -> str:
         """
         ⚠️ LEGACY: Create Excel file with formatted data (old method)
@@ -1633,6 +1460,10 @@ class PicklistExporter:
         return output_path
     
     def _log_status(self, message: str):
-        """Log status message"""
+        """Log status message (buffered while running on a worker thread)"""
+        self.worker_pool.log(message)
+    
+    def _emit_status(self, message: str):
+        """Send a status message to the GUI"""
         if self.sf_client.status_callback:
             self.sf_client.status_callback(message, verbose=True)
@@ -270,7 +270,7 @@ class PicklistSummaryHelper:
             Count of dependent picklist fields
         """
         try:
-            obj_describe = getattr(sf_client.sf, object_api).describe()
+            obj_describe = sf_client.describe(object_api)
             
             dependent_count = 0
             
@@ -0,0 +1,219 @@
+"""
+PK-chunked parallel extraction for very large objects
+
+Splits a query into Id ranges (like Salesforce's PK chunking), exports the
+ranges concurrently through SOQLRunner - REST streaming or Bulk API 2.0 -
+and merges the part files into one CSV, or keeps them with a JSON manifest.
+
+Range boundaries are real Ids: one Id-ordered query is opened and its query
+locator is read at every chunk offset ("<locator>-<offset>"), so each
+boundary costs one small page instead of a scan of every Id, and ranges hold
+about chunk_size rows each however the Ids are distributed.
+"""
+import json
+import os
+import re
+import shutil
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import (
+    PK_CHUNK_SIZE,
+    PK_CHUNK_WORKERS,
+    API_MAX_CONCURRENT_REQUESTS,
+    BULK_QUERY_THRESHOLD,
+    CONTENT_DOWNLOAD_CHUNK_SIZE
+)
+from soql_runner import SOQLRunner
+from worker_pool import OrderedWorkerPool
+
+
+class PKChunkExtractor:
+    """Parallel Id-range extractor built on SOQLRunner"""
+
+    MANIFEST_FILENAME = 'manifest.json'
+
+    def __init__(self, soql_runner: SOQLRunner, max_workers: int = PK_CHUNK_WORKERS,
+                 chunk_size: int = PK_CHUNK_SIZE, status_callback: Optional[Callable] = None):
+        """
+        Initialize the extractor
+
+        Args:
+            soql_runner: Runner bound to a connected client
+            max_workers: Chunks exported in parallel (capped by the API governor's concurrency)
+            chunk_size: Target rows per Id range
+            status_callback: Optional callback for status updates
+        """
+        self.soql_runner = soql_runner
+        self.sf = soql_runner.sf
+        self.chunk_size = max(1, chunk_size)
+        self.status_callback = status_callback
+
+        # More workers than the governor lets through would only queue
+        self.worker_pool = OrderedWorkerPool(
+            min(max_workers, API_MAX_CONCURRENT_REQUESTS),
+            emit=self._emit_status,
+            thread_name_prefix='pk-chunk'
+        )
+
+    def extract(self, soql: str, output_path: str, merge: bool = True, mode: str = 'auto') -> Dict:
+        """
+        Extract a query in parallel Id-range chunks
+
+        Args:
+            soql: SOQL query (no ORDER BY, LIMIT, OFFSET or GROUP BY)
+            output_path: CSV to write; part files go to "<output_path>.parts"
+            merge: Merge parts into output_path (parts are removed afterwards);
+                   when False the parts stay next to a manifest.json
+            mode: 'auto', 'rest' or 'bulk' - used for every chunk so all parts
+                  share one column layout ('auto' picks Bulk API when a chunk
+                  reaches BULK_QUERY_THRESHOLD rows)
+
+        Returns:
+            Statistics dict with 'rows', 'chunks', 'failed_chunks', 'output'
+        """
+        select_list, object_name, where = self._split_query(soql)
+
+        row_count, boundaries = self._id_boundaries(object_name, where)
+        if mode == 'auto':
+            mode = 'bulk' if self.chunk_size >= BULK_QUERY_THRESHOLD else 'rest'
+
+        # First and last ranges are open-ended so nothing at the edges is missed
+        ranges = list(zip([None] + boundaries, boundaries + [None]))
+        self._log_status(f"📦 {row_count} rows of {object_name} in {len(ranges)} Id range(s) "
+                         f"({self.worker_pool.max_workers} workers, {mode.upper()})")
+
+        parts_folder = f"{output_path}.parts"
+        os.makedirs(parts_folder, exist_ok=True)
+
+        chunks = []
+        for index, (id_from, id_to) in enumerate(ranges, 1):
+            chunks.append({
+                'part': f"part_{index:04d}.csv",
+                'id_from': id_from,
+                'id_to': id_to,
+                'soql': self._chunk_query(select_list, object_name, where, id_from, id_to)
+            })
+
+        def export_chunk(chunk: Dict) -> int:
+            rows, _ = self.soql_runner.export_query(
+                chunk['soql'], os.path.join(parts_folder, chunk['part']), mode=mode
+            )
+            return rows
+
+        stats = {'rows': 0, 'chunks': len(chunks), 'failed_chunks': [], 'output': output_path}
+        for i, chunk, rows, error in self.worker_pool.imap(
+                export_chunk, chunks,
+                header=lambda i, total, chunk: f"  [{i}/{total}] {chunk['id_from'] or 'start'} → {chunk['id_to'] or 'end'}"):
+            if error:
+                chunk['error'] = str(error)
+                stats['failed_chunks'].append({'part': chunk['part'], 'reason': str(error)})
+                self._log_status(f"    ❌ ERROR: {str(error)}")
+                continue
+            chunk['rows'] = rows
+            stats['rows'] += rows
+            self._log_status(f"    ✅ {rows} rows")
+
+        if merge and not stats['failed_chunks']:
+            self._merge_parts(parts_folder, [chunk['part'] for chunk in chunks], output_path)
+            shutil.rmtree(parts_folder, ignore_errors=True)
+            self._log_status(f"✅ Merged {stats['rows']} rows into {output_path}")
+        else:
+            # Parts plus manifest - failed ranges can be re-run from their SOQL
+            manifest_path = os.path.join(parts_folder, self.MANIFEST_FILENAME)
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump({'query': soql, 'object': object_name, 'mode': mode, 'chunks': chunks}, f, indent=2)
+            stats['output'] = manifest_path
+            if stats['failed_chunks']:
+                self._log_status(f"⚠️ {len(stats['failed_chunks'])} chunk(s) failed - parts kept in {parts_folder}")
+            else:
+                self._log_status(f"✅ Wrote {len(chunks)} part files and {manifest_path}")
+
+        return stats
+
+    def can_chunk(self, soql: str) -> bool:
+        """Check whether a query can be split into Id ranges"""
+        try:
+            self._split_query(soql)
+            return True
+        except ValueError:
+            return False
+
+    def _split_query(self, soql: str) -> Tuple[str, str, str]:
+        """
+        Take a query apart into SELECT list, object and WHERE condition
+
+        Raises:
+            ValueError: When the query cannot be split into Id ranges
+        """
+        select_items, rest = self.soql_runner._parse_select(soql.strip())
+        if re.search(r'\b(ORDER\s+BY|LIMIT|OFFSET|GROUP\s+BY)\b', rest, re.IGNORECASE):
+            raise ValueError("PK chunking does not support ORDER BY, LIMIT, OFFSET or GROUP BY")
+
+        match = re.match(r'FROM\s+([A-Za-z0-9_]+)\s*(?:WHERE\s+(.*))?$', rest, re.IGNORECASE | re.DOTALL)
+        if not select_items or not match:
+            raise ValueError("Query must be SELECT ... FROM Object [WHERE ...]")
+
+        object_name, where = match.group(1), (match.group(2) or '').strip()
+        return ', '.join(select_items), object_name, where
+
+    def _id_boundaries(self, object_name: str, where: str) -> Tuple[int, List[str]]:
+        """
+        Sample the Id of every chunk_size-th matching record
+
+        Raises when the Id query fails, so an unsplittable query is never
+        exported as one silent chunk.
+
+        Returns:
+            Tuple of (matching row count, ascending boundary Ids)
+        """
+        where_clause = f" WHERE {where}" if where else ''
+        result = self.sf.query(f"SELECT Id FROM {object_name}{where_clause} ORDER BY Id")
+        row_count = result.get('totalSize', 0)
+        first_page = result.get('records', [])
+        locator = result.get('nextRecordsUrl')
+
+        boundaries = []
+        for offset in range(self.chunk_size, row_count, self.chunk_size):
+            if offset < len(first_page):
+                boundaries.append(first_page[offset]['Id'])
+                continue
+            if not locator:
+                break
+            # Jump straight to the offset instead of paging through every Id
+            page = self.sf.query_more(f"{locator.rsplit('-', 1)[0]}-{offset}", identifier_is_url=True)
+            records = page.get('records', [])
+            if records:
+                boundaries.append(records[0]['Id'])
+        return row_count, boundaries
+
+    def _chunk_query(self, select_list: str, object_name: str, where: str,
+                     id_from: Optional[str], id_to: Optional[str]) -> str:
+        """Build the query for one Id range"""
+        conditions = [f"({where})"] if where else []
+        if id_from:
+            conditions.append(f"Id >= '{id_from}'")
+        if id_to:
+            conditions.append(f"Id < '{id_to}'")
+        where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        return f"SELECT {select_list} FROM {object_name}{where_clause}"
+
+    def _merge_parts(self, parts_folder: str, part_names: List[str], output_path: str):
+        """Concatenate part CSVs in order, keeping only the first header row"""
+        header_written = False
+        with open(output_path, 'wb') as output:
+            for part_name in part_names:
+                with open(os.path.join(parts_folder, part_name), 'rb') as part:
+                    header = part.readline()
+                    if not header_written:
+                        output.write(header)
+                        header_written = True
+                    shutil.copyfileobj(part, output, CONTENT_DOWNLOAD_CHUNK_SIZE)
+
+    def _log_status(self, message: str):
+        """Log status message (buffered while running on a worker thread)"""
+        self.worker_pool.log(message)
+
+    def _emit_status(self, message: str):
+        """Send a status message to the owner's callback"""
+        if self.status_callback:
+            self.status_callback(message, verbose=True)
@@ -11,7 +11,8 @@ from typing import Callable, Optional, List, Dict, Any
 import threading
 
 
-def get_org_api_version(instance_url: str, session_id: str = None) -> str:
+def get_org_api_version(instance_url: str, session_id: str = None,
+                        session: Optional[requests.Session] = None) -> str:
     """
     Fetch the latest API version supported by the Salesforce org.
     This endpoint doesn't require authentication.
@@ -19,13 +20,15 @@ def get_org_api_version(instance_url: str, session_id: str = None) -> str:
     Args:
         instance_url: The Salesforce instance URL
         session_id: Optional session ID (not required for this call)
+        session: Optional shared requests.Session (pooled connections)
         
     Returns:
         Latest API version string (e.g., "v61.0")
     """
     try:
         url = f"{instance_url.rstrip('/')}/services/data/"
-        response = requests.get(url, timeout=15)
+        http = session or requests
+        response = http.get(url, timeout=15)
         
         if response.status_code == 200:
             versions = response.json()
@@ -48,21 +51,24 @@ def retry_request(
     max_retries: int = 3,
     timeout: int = 60,
     allow_redirects: bool = True,
-    backoff_factor: float = 2.0  # ✅ NEW: Configurable backoff
+    backoff_factor: float = 2.0,  # ✅ NEW: Configurable backoff
+    session: Optional[requests.Session] = None
 ) -> requests.Response:
     """
     Make HTTP GET request with exponential backoff retry logic.
     
     ✅ OPTIMIZED: Better rate limit handling for large exports.
+    Pass a shared session to reuse pooled keep-alive connections.
     """
     backoff = 1
     last_error = None
     headers = headers or {}
     cookies = cookies or {}
+    http = session or requests
 
     for attempt in range(max_retries):
         try:
-            response = requests.get(
+            response = http.get(
                 url,
                 headers=headers,
                 cookies=cookies,
@@ -212,7 +218,8 @@ class SalesforceReportExporter:
         session_id: str,
         instance_url: str,
         api_version: str = None,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        session: Optional[requests.Session] = None
     ):
         """
         Initialize the Salesforce Report Exporter.
@@ -223,17 +230,23 @@ class SalesforceReportExporter:
             api_version: Optional API version (e.g., "61.0" or "v61.0"). 
                         If None, will auto-detect latest version.
             progress_callback: Optional callback for progress updates
+            session: Optional shared requests.Session from SalesforceClient.
+                    If None, a private pooled session is created.
         """
         self.session_id = session_id
         self.instance_url = instance_url.rstrip('/')
         self.progress_callback = progress_callback
         
+        # ===== HTTP TRANSPORT =====
+        # One keep-alive session for every call made by this exporter
+        self.http = session if session is not None else requests.Session()
+        
         # ===== API VERSION DETECTION =====
         # Get API version dynamically if not provided
         if api_version:
             self.api_version = api_version if api_version.startswith('v') else f"v{api_version}"
         else:
-            self.api_version = get_org_api_version(self.instance_url)
+            self.api_version = get_org_api_version(self.instance_url, session=self.http)
         
         print(f"📡 Salesforce API Version: {self.api_version}")
         
@@ -319,7 +332,7 @@ class SalesforceReportExporter:
                 # ✅ IMPROVED: Longer timeout for large queries
                 timeout = 90 if len(all_records) > 5000 else 60
                 
-                response = requests.get(
+                response = self.http.get(
                     query_url,
                     headers=self.api_headers,
                     params=params,
@@ -354,11 +367,8 @@ class SalesforceReportExporter:
                 # If we got fewer records than batch_size, we're done
                 if len(records) < batch_size:
                     has_more = False
-                
-                # ✅ NEW: Small delay to avoid rate limiting on large queries
-                if has_more and len(all_records) > 0 and len(all_records) % 10000 == 0:
-                    print(f"📊 Fetched {len(all_records)} records, brief pause to avoid rate limits...")
-                    time.sleep(1)
+
+                # Rate limiting is handled by the shared session's ApiGovernor
                 
             except requests.Timeout as e:
                 consecutive_errors += 1
@@ -466,7 +476,7 @@ class SalesforceReportExporter:
             query_url = f"{self.instance_url}/services/data/{self.api_version}/query"
             params = {"q": query}
             
-            response = requests.get(
+            response = self.http.get(
                 query_url, 
                 headers=self.api_headers, 
                 params=params, 
@@ -509,7 +519,7 @@ class SalesforceReportExporter:
         
         # Otherwise use the standard REST API endpoint
         url = f"{self.instance_url}{self.reports_list_endpoint}"
-        response = retry_request(url, headers=self.api_headers, timeout=60)
+        response = retry_request(url, headers=self.api_headers, timeout=60, session=self.http)
         
         data = response.json()
         
@@ -861,7 +871,7 @@ class SalesforceReportExporter:
             query_url = f"{self.instance_url}/services/data/{self.api_version}/query"
             params = {"q": query.strip()}
             
-            response = requests.get(
+            response = self.http.get(
                 query_url,
                 headers=self.api_headers,
                 params=params,
@@ -904,7 +914,8 @@ class SalesforceReportExporter:
             cookies=self.export_cookies,
             timeout=timeout,
             allow_redirects=True,
-            max_retries=3  # ✅ NEW: Explicitly set retries
+            max_retries=3,  # ✅ NEW: Explicitly set retries
+            session=self.http
         )
         
         content = response.text
@@ -983,7 +994,8 @@ class SalesforceReportExporter:
                 headers=excel_headers,
                 timeout=timeout,
                 max_retries=3,
-                backoff_factor=2.0
+                backoff_factor=2.0,
+                session=self.http
             )
             
             # Validate response
@@ -2425,7 +2437,7 @@ class SalesforceReportExporter:
         """Get the name of a folder by its ID"""
         try:
             url = f"{self.instance_url}/services/data/{self.api_version}/sobjects/Folder/{folder_id}"
-            response = retry_request(url, headers=self.api_headers, timeout=30)
+            response = retry_request(url, headers=self.api_headers, timeout=30, session=self.http)
             data = response.json()
             return data.get("Name", folder_id)
         except:
@@ -1374,7 +1374,11 @@ class SalesforceExporterApp(ctk.CTkToplevel):
             
             # Create exporter instance
             try:
-                exporter = SalesforceReportExporter(session_id, instance_url)
+                exporter = SalesforceReportExporter(
+                    session_id,
+                    instance_url,
+                    session=self.session_info.get("http_session")
+                )
             except Exception as e:
                 self.update_queue.put(("log", f"❌ Failed to create exporter: {str(e)}"))
                 self.update_queue.put(("search_error", f"Connection error: {str(e)}"))
@@ -3111,7 +3115,8 @@ class SalesforceExporterApp(ctk.CTkToplevel):
             exporter = SalesforceReportExporter(
                 session_id,
                 instance_url,
-                progress_callback=progress_callback
+                progress_callback=progress_callback,
+                session=self.session_info.get("http_session")
             )
             
             # Log export start
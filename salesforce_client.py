@@ -2,17 +2,32 @@
 Salesforce connection and authentication handler
 ✅ FIXED: Detects expired passwords and shows clear error messages
 """
-from typing import List, Optional, Callable
+from typing import Dict, Iterator, List, Optional, Callable, Tuple
 from simple_salesforce import Salesforce
 from simple_salesforce.exceptions import SalesforceExpiredSession
-from config import API_VERSION
+from config import (
+    API_VERSION,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    API_MAX_CONCURRENT_REQUESTS,
+    DESCRIBE_CACHE_MEMORY_SIZE,
+    DESCRIBE_PREFETCH_WINDOW
+)
+from http_session import create_pooled_session
+from api_governor import ApiGovernor
+from describe_cache import DescribeCache
+from composite_batch import CompositeBatch
+from usage_store import UsageStore
+from worker_pool import OrderedWorkerPool
 
 
 class SalesforceClient:
     """Handles Salesforce authentication and connection"""
     
     def __init__(self, username: str, password: str, security_token: str, 
-                domain: str = 'login', status_callback: Optional[Callable] = None):
+                domain: str = 'login', status_callback: Optional[Callable] = None,
+                pool_connections: int = HTTP_POOL_CONNECTIONS,
+                pool_maxsize: int = HTTP_POOL_MAXSIZE):
         """
         Initialize Salesforce connection
         
@@ -23,6 +38,8 @@ class SalesforceClient:
             domain: Either 'login', 'test', or custom domain WITHOUT .salesforce.com suffix
                     Example: 'mycompany.my' (NOT 'mycompany.my.salesforce.com')
             status_callback: Optional callback for status updates
+            pool_connections: Number of hosts kept in the shared HTTP pool
+            pool_maxsize: Keep-alive connections kept per host
         """
         self.status_callback = status_callback
         self.all_org_objects: List[str] = []
@@ -33,6 +50,26 @@ class SalesforceClient:
         self.session_id = None
         self.api_version = API_VERSION
         self.headers = None
+        self.org_id = None
+        self.describe_cache: Optional[DescribeCache] = None
+        self.usage_store: Optional[UsageStore] = None
+        
+        # ✅ Org-wide governor: concurrency + rate limit for every outgoing call
+        self.api_governor = ApiGovernor(status_callback=self._log_status)
+        
+        # ✅ Shared pooled transport - every exporter reuses these connections
+        self.http_session = create_pooled_session(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            governor=self.api_governor
+        )
+        
+        # ✅ Describe prefetches run as wide as the governor lets requests through
+        self.prefetch_pool = OrderedWorkerPool(
+            API_MAX_CONCURRENT_REQUESTS,
+            emit=self._log_status,
+            thread_name_prefix='describe-prefetch'
+        )
         
         self._log_status("Initializing Salesforce Connection...")
         
@@ -47,7 +84,8 @@ class SalesforceClient:
                     username=username,
                     password=password,
                     security_token=security_token if security_token else None,
-                    domain=domain
+                    domain=domain,
+                    session=self.http_session
                 )
             else:
                 org_type = "Production" if domain == 'login' else "Sandbox"
@@ -57,7 +95,8 @@ class SalesforceClient:
                     username=username,
                     password=password,
                     security_token=security_token if security_token else None,
-                    domain=domain
+                    domain=domain,
+                    session=self.http_session
                 )
             
             # ✅ Verify connection was successful
@@ -95,6 +134,22 @@ class SalesforceClient:
             self._log_status(f"📡 API Version: v{self.api_version}")
             self._log_status(f"🔑 Session established successfully")
             
+            # ✅ Seed the governor with the org's daily API budget
+            self._fetch_api_limits()
+            
+            # ✅ Describe cache (memory LRU + on-disk store keyed by org)
+            self.org_id = self._fetch_org_id()
+            self.describe_cache = DescribeCache(
+                http_session=self.http_session,
+                base_url=self.base_url,
+                api_version=self.api_version,
+                headers=self.headers,
+                org_id=self.org_id
+            )
+            
+            # ✅ Parsed usage artifacts persist per org for incremental refresh
+            self.usage_store = UsageStore(org_id=self.org_id)
+            
             # ✅ Fetch objects AFTER connection is fully initialized
             self._fetch_all_org_objects()
             
@@ -210,10 +265,131 @@ class SalesforceClient:
                 # Other errors - log but don't crash
                 self._log_status(f"🔍 Technical details logged to console")
     
+    def _fetch_api_limits(self):
+        """Read /limits so the governor knows the remaining DailyApiRequests"""
+        try:
+            url = f"{self.base_url}/services/data/v{self.api_version}/limits"
+            response = self.http_session.get(url, headers=self.headers, timeout=30)
+            if response.status_code == 200:
+                self.api_governor.update_from_limits(response.json())
+                daily = response.json().get('DailyApiRequests', {})
+                if daily:
+                    self._log_status(
+                        f"📊 Daily API requests remaining: "
+                        f"{daily.get('Remaining')}/{daily.get('Max')}"
+                    )
+        except Exception as e:
+            self._log_status(f"⚠️ Could not read API limits: {str(e)}")
+    
+    def _fetch_org_id(self) -> str:
+        """Get the Organization Id (falls back to the instance URL)"""
+        try:
+            result = self.sf.query("SELECT Id FROM Organization LIMIT 1")
+            records = result.get('records', [])
+            if records:
+                return records[0]['Id']
+        except Exception as e:
+            self._log_status(f"⚠️ Could not read Organization Id: {str(e)}")
+        return self.base_url
+    
+    def describe(self, object_name: str) -> Dict:
+        """
+        Describe an sObject through the shared describe cache
+        
+        Args:
+            object_name: Object API name
+            
+        Returns:
+            Describe dictionary
+        """
+        if self.describe_cache:
+            return self.describe_cache.describe(object_name)
+        return getattr(self.sf, object_name).describe()
+    
+    def prefetch_describes(self, object_names: List[str]) -> int:
+        """
+        Warm the describe cache for many objects concurrently
+        
+        Failures are ignored here - the per-object export loop reports them.
+        
+        Args:
+            object_names: Object API names
+            
+        Returns:
+            Number of objects described successfully
+        """
+        if not object_names or not self.describe_cache:
+            return 0
+        return sum(1 for _, _, _, error in self.prefetch_pool.imap(self.describe, object_names) if not error)
+    
+    def iter_prefetched_windows(self, object_names: List[str],
+                                window_size: int = DESCRIBE_PREFETCH_WINDOW
+                                ) -> Iterator[Tuple[int, List[str], int]]:
+        """
+        Prefetch describes one window at a time, just ahead of an export loop
+        
+        A single up-front prefetch of more objects than the in-memory LRU holds
+        would evict the first describes before the loop reaches them. Windows
+        never exceed DESCRIBE_CACHE_MEMORY_SIZE, and the next window is only
+        fetched once the caller has consumed the current one.
+        
+        Args:
+            object_names: Object API names in loop order
+            window_size: Objects per window
+            
+        Yields:
+            Tuple of (offset of the window in object_names, window, describes prefetched)
+        """
+        window_size = max(1, min(window_size, DESCRIBE_CACHE_MEMORY_SIZE))
+        for offset in range(0, len(object_names), window_size):
+            window = object_names[offset:offset + window_size]
+            yield offset, window, self.prefetch_describes(window)
+    
+    def composite_batch(self, tooling: bool = False, halt_on_error: bool = False) -> CompositeBatch:
+        """
+        Create a composite batch bound to this connection
+        
+        Args:
+            tooling: Target /tooling/composite/batch instead of /composite/batch
+            halt_on_error: Stop a batch after the first failing subrequest
+            
+        Returns:
+            CompositeBatch sharing the pooled (governed) HTTP session
+        """
+        return CompositeBatch(
+            http_session=self.http_session,
+            base_url=self.base_url,
+            api_version=self.api_version,
+            headers=self.headers,
+            tooling=tooling,
+            halt_on_error=halt_on_error
+        )
+    
+    def log_describe_cache_stats(self):
+        """Log describe cache hit/miss counters"""
+        if self.describe_cache:
+            cache_stats = self.describe_cache.get_stats()
+            self._log_status(
+                f"📦 Describe cache: {cache_stats['hits']} memory hits, "
+                f"{cache_stats['disk_hits']} revalidated (304), "
+                f"{cache_stats['misses']} downloaded"
+            )
+    
     def get_all_objects(self) -> List[str]:
         """Accessor for the fetched object list"""
         return self.all_org_objects
     
+    def close(self):
+        """Release pooled HTTP connections, the describe cache and the usage store"""
+        if self.describe_cache:
+            self.describe_cache.close()
+        if self.usage_store:
+            self.usage_store.close()
+        try:
+            self.http_session.close()
+        except Exception:
+            pass
+    
     def _log_status(self, message: str):
         """Internal helper to send log messages back to the GUI"""
         if self.status_callback:
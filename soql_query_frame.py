@@ -6,11 +6,15 @@ import re
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
-from typing import Optional, List, Dict
+from typing import Optional
 import customtkinter as ctk
 
+from config import BULK_QUERY_THRESHOLD, PK_CHUNK_SIZE
 from soql_runner import SOQLRunner
+from pk_chunk_extractor import PKChunkExtractor
+from columnar_export import PYARROW_AVAILABLE, columnar_format_for
 from threading_helper import ThreadHelper
+from virtual_results_grid import ColumnarResultBuffer, VirtualResultsGrid
 
 
 class SOQLQueryFrame(ctk.CTkFrame):
@@ -21,9 +25,10 @@ class SOQLQueryFrame(ctk.CTkFrame):
 
         self.soql_runner = soql_runner
         self.status_callback = status_callback
-        self.current_results: List[Dict] = []
+        self.current_results = ColumnarResultBuffer()
         self.current_record_count = 0
         self.current_object_name = None
+        self.current_query: Optional[str] = None
 
         self._setup_ui()
 
@@ -533,14 +538,17 @@ class SOQLQueryFrame(ctk.CTkFrame):
 
         # Execute in background
         def do_execute():
-            records, count, error = self.soql_runner.execute_query(query)
+            # ✅ Pages go straight into a columnar buffer (no dict per record)
+            results = ColumnarResultBuffer()
+            count, error = self.soql_runner.execute_query_into(query, results.append_records)
+            self.current_query = query if not error else None
 
             # Update UI on main thread
-            self.after(0, lambda: self._on_query_complete(records, count, error))
+            self.after(0, lambda: self._on_query_complete(results, count, error))
 
         ThreadHelper.run_in_thread(do_execute)
 
-    def _on_query_complete(self, records: List[Dict], count: int, error: Optional[str]):
+    def _on_query_complete(self, results: ColumnarResultBuffer, count: int, error: Optional[str]):
         """Called when query execution completes"""
         # Re-enable execute button
         self.execute_button.configure(state="normal", text="▶ Execute Query (Ctrl+Enter)")
@@ -551,71 +559,60 @@ class SOQLQueryFrame(ctk.CTkFrame):
             return
 
         # Store results
-        self.current_results = records
+        self.current_results = results
         self.current_record_count = count
 
         # Display results
-        self._display_results(records, count)
+        self._display_results(results, count)
 
         # Enable export button if we have results
-        if records:
+        if len(results):
             self.export_button.configure(state="normal")
         else:
             self.export_button.configure(state="disabled")
 
         self._update_status(f"Query executed successfully. {count} record(s) returned.")
 
-    def _display_results(self, records: List[Dict], count: int):
-        """Display query results in the treeview"""
-        # Clear existing data
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
-
+    def _display_results(self, results: ColumnarResultBuffer, count: int):
+        """Display query results in the virtual grid (only visible rows are rendered)"""
         # Update label
         self.results_label.configure(text=f"Query Results ({count} records)")
 
-        if not records:
-            self._update_status("Query returned 0 records.")
-            return
-
-        # Get all column names
-        columns = list(records[0].keys())
-
-        # Configure columns
-        self.results_tree["columns"] = columns
-        self.results_tree["show"] = "headings"
+        self.results_grid.set_buffer(results)
 
-        # Setup column headings
-        for col in columns:
-            self.results_tree.heading(col, text=col, anchor="w")
-            # Set column width based on content
-            max_width = len(col) * 10
-            self.results_tree.column(col, width=max_width, minwidth=100, anchor="w")
-
-        # Insert data
-        for record in records:
-            values = [record.get(col, "") for col in columns]
-            self.results_tree.insert("", "end", values=values)
+        if not len(results):
+            self._update_status("Query returned 0 records.")
 
     def _export_to_csv(self):
         """Export results to CSV"""
-        if not self.current_results:
+        if not len(self.current_results):
             messagebox.showwarning("No Data", "No query results to export.")
             return
 
         # Ask for save location
         default_filename = f"SOQL_Export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        filetypes = [("CSV files", "*.csv")]
+        if PYARROW_AVAILABLE:
+            filetypes += [("Parquet files", "*.parquet"), ("Arrow IPC files", "*.arrow")]
         output_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
             initialfile=default_filename,
-            filetypes=[("CSV files", "*.csv")]
+            filetypes=filetypes
         )
 
         if not output_path:
             return
 
+        # ✅ Large results are re-run as a streaming export (Bulk API 2.0 above
+        # the threshold) instead of being written from memory; typed columnar
+        # files are always streamed from the query
+        if self.current_query and (self.current_record_count >= BULK_QUERY_THRESHOLD
+                                   or columnar_format_for(output_path)):
+            self._export_query_in_background(self.current_query, output_path)
+            return
+
         try:
-            self.soql_runner.export_to_csv(self.current_results, output_path)
+            self.soql_runner.export_to_csv(list(self.current_results.iter_records()), output_path)
             messagebox.showinfo(
                 "Export Successful",
                 f"Query results exported to:\n{output_path}"
@@ -624,6 +621,68 @@ class SOQLQueryFrame(ctk.CTkFrame):
         except Exception as e:
             messagebox.showerror("Export Error", f"Failed to export:\n{str(e)}")
 
+    def _export_query_in_background(self, query: str, output_path: str):
+        """Stream a query to CSV / Parquet / Arrow on a worker thread (REST paging, Bulk API 2.0 or PK chunks)"""
+        self.export_button.configure(state="disabled", text="⏳ Exporting...")
+        self._update_status("Exporting query results...")
+
+        # ✅ CSV exports spanning several PK chunks run as parallel Id ranges
+        extractor = PKChunkExtractor(
+            self.soql_runner,
+            status_callback=lambda message, verbose=False: self.after(0, lambda: self._update_status(message.strip()))
+        )
+        use_pk_chunks = (not columnar_format_for(output_path)
+                         and self.current_record_count > PK_CHUNK_SIZE
+                         and extractor.can_chunk(query))
+
+        def do_export():
+            try:
+                unconverted = 0
+                if columnar_format_for(output_path):
+                    rows, unconverted = self.soql_runner.export_query_to_columnar(
+                        query,
+                        output_path,
+                        progress_callback=lambda count: self.after(
+                            0, lambda: self._update_status(f"Exported {count} records"))
+                    )
+                    mode = 'rest'
+                elif use_pk_chunks:
+                    stats = extractor.extract(query, output_path)
+                    if stats['failed_chunks']:
+                        raise Exception(f"{len(stats['failed_chunks'])} of {stats['chunks']} Id range(s) failed - "
+                                        f"finished parts and their queries are in {stats['output']}")
+                    rows, mode = stats['rows'], 'pk-chunk'
+                else:
+                    rows, mode = self.soql_runner.export_query(
+                        query,
+                        output_path,
+                        progress_callback=lambda message: self.after(0, lambda: self._update_status(message))
+                    )
+                self.after(0, lambda: self._on_export_complete(output_path, rows, mode, None, unconverted))
+            except Exception as e:
+                error_message = str(e)
+                self.after(0, lambda: self._on_export_complete(output_path, 0, None, error_message))
+
+        ThreadHelper.run_in_thread(do_export)
+
+    def _on_export_complete(self, output_path: str, rows: int, mode: Optional[str], error: Optional[str],
+                            unconverted: int = 0):
+        """Called when a background export finishes (unconverted: typed values written as null)"""
+        self.export_button.configure(state="normal", text="📥 Export to CSV")
+
+        if error:
+            messagebox.showerror("Export Error", f"Failed to export:\n{error}")
+            self._update_status(f"Export failed: {error}")
+            return
+
+        via = {'bulk': "Bulk API 2.0", 'pk-chunk': "parallel Id ranges"}.get(mode, "REST")
+        message = f"Query results exported to:\n{output_path}\n\n{rows} records ({via})"
+        if unconverted:
+            message += f"\n\n⚠️ {unconverted} value(s) did not match their column type and were written as null."
+        messagebox.showinfo("Export Successful", message)
+        file_type = {'parquet': 'Parquet', 'arrow': 'Arrow IPC'}.get(columnar_format_for(output_path), 'CSV')
+        self._update_status(f"Exported {rows} records to {file_type} via {via}.")
+
     def _setup_results_section(self):
         """Setup results table section"""
         results_frame = ctk.CTkFrame(self)
@@ -662,19 +721,8 @@ class SOQLQueryFrame(ctk.CTkFrame):
         tree_container.grid_columnconfigure(0, weight=1)
         tree_container.grid_rowconfigure(0, weight=1)
 
-        # Create Treeview
-        self.results_tree = ttk.Treeview(tree_container, show="tree headings")
-        self.results_tree.grid(row=0, column=0, sticky="nsew")
-
-        # Vertical scrollbar
-        vsb = ttk.Scrollbar(tree_container, orient="vertical", command=self.results_tree.yview)
-        vsb.grid(row=0, column=1, sticky="ns")
-        self.results_tree.configure(yscrollcommand=vsb.set)
-
-        # Horizontal scrollbar
-        hsb = ttk.Scrollbar(tree_container, orient="horizontal", command=self.results_tree.xview)
-        hsb.grid(row=1, column=0, sticky="ew")
-        self.results_tree.configure(xscrollcommand=hsb.set)
+        # ✅ Virtual grid: Treeview + scrollbars, only the visible rows exist as items
+        self.results_grid = VirtualResultsGrid(tree_container)
 
         # Style for treeview
         style = ttk.Style()
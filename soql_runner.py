@@ -3,14 +3,23 @@ SOQL Query Runner - Execute SOQL queries and export results
 """
 import csv
 import re
-from typing import List, Dict, Tuple, Optional, Set
+from typing import Callable, Iterable, Iterator, List, Dict, Tuple, Optional, Set
 from datetime import datetime
+from config import BULK_QUERY_THRESHOLD
 from salesforce_client import SalesforceClient
+from bulk_query import BulkQueryJob
+from columnar_export import ColumnarWriter, columnar_format_for
 
 
 class SOQLRunner:
     """Handles SOQL query execution and result processing"""
     
+    # SELECT functions whose result column keeps the field's name
+    FIELD_PRESERVING_FUNCTIONS = {'tolabel', 'format', 'convertcurrency'}
+    
+    # ...of which these return display text, not the field's typed value
+    TEXT_RESULT_FUNCTIONS = {'tolabel', 'format'}
+    
     def __init__(self, sf_client: SalesforceClient):
         """Initialize with Salesforce client"""
         self.sf_client = sf_client
@@ -31,27 +40,278 @@ class SOQLRunner:
             If successful: (records, count, None)
             If failed: ([], 0, error_message)
         """
+        cleaned_records = []
+        total_count, error = self.execute_query_into(soql, cleaned_records.extend)
+        if error:
+            return [], 0, error
+        return cleaned_records, total_count, None
+    
+    def execute_query_into(self, soql: str, sink: Callable[[List[Dict]], None]) -> Tuple[int, Optional[str]]:
+        """
+        Execute a SOQL query, handing each cleaned page to a sink as it arrives
+        
+        Lets callers keep results in their own structure (e.g. a columnar
+        buffer) instead of a list of record dicts.
+        
+        Args:
+            soql: SOQL query string
+            sink: Called with every page of cleaned records
+            
+        Returns:
+            Tuple of (total_count, error_message)
+            If successful: (count, None)
+            If failed: (0, error_message)
+        """
         try:
             # Clean the query
             soql = soql.strip()
             
             if not soql:
-                return [], 0, "Query cannot be empty"
-            
-            # Execute query
-            result = self.sf.query_all(soql)
+                return 0, "Query cannot be empty"
             
-            records = result.get('records', [])
-            total_count = result.get('totalSize', len(records))
+            # Execute query page by page; each raw page is cleaned and
+            # dropped before the next one is fetched
+            total_count = 0
+            for page, total_size in self._iter_raw_pages(soql):
+                total_count = total_size
+                sink(self._clean_records(page))
             
-            # Clean records (remove attributes metadata)
-            cleaned_records = self._clean_records(records)
-            
-            return cleaned_records, total_count, None
+            return total_count, None
             
         except Exception as e:
             error_msg = str(e)
-            return [], 0, error_msg
+            return 0, error_msg
+    
+    def iter_query_pages(self, soql: str) -> Iterator[List[Dict]]:
+        """
+        Stream a query one page at a time
+        
+        nextRecordsUrl is followed lazily, so only the current page is held
+        in memory. Each page is flattened like execute_query() results.
+        
+        Args:
+            soql: SOQL query string
+            
+        Yields:
+            Lists of cleaned records (one API page each)
+        """
+        for page, _ in self._iter_raw_pages(soql.strip()):
+            yield self._clean_records(page)
+    
+    def export_query_to_csv(self, soql: str, output_path: str,
+                            progress_callback: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Run a query and write its results to CSV without holding them in memory
+        
+        Columns come from the SELECT list (in query order), matched against
+        the first page for the exact field-name casing; when the SELECT list
+        cannot be parsed the first page's fields are used.
+        
+        Args:
+            soql: SOQL query string
+            output_path: Path to save CSV file
+            progress_callback: Optional callback receiving the rows written so far
+            
+        Returns:
+            Number of rows written
+        """
+        return self._write_csv_pages(
+            self.iter_query_pages(soql),
+            output_path,
+            select_columns=self.get_columns_from_query(soql),
+            progress_callback=progress_callback
+        )
+    
+    def export_query_to_columnar(self, soql: str, output_path: str, file_format: Optional[str] = None,
+                                 progress_callback: Optional[Callable[[int], None]] = None) -> Tuple[int, int]:
+        """
+        Run a query and write typed Parquet / Arrow IPC output without holding it in memory
+        
+        Column types come from the cached describe metadata of the queried
+        object (and of related objects for relationship paths); columns that
+        cannot be resolved - aggregates, polymorphic lookups - are strings.
+        
+        Args:
+            soql: SOQL query string
+            output_path: Path to save the file
+            file_format: 'parquet' or 'arrow' (default: from the file extension)
+            progress_callback: Optional callback receiving the rows written so far
+            
+        Returns:
+            Tuple of (rows written, values written as null because they did
+            not match their column type)
+        """
+        soql = soql.strip()
+        file_format = file_format or columnar_format_for(output_path) or 'parquet'
+        select_columns = self.get_columns_from_query(soql)
+        
+        writer = None
+        rows_written = 0
+        try:
+            for page in self.iter_query_pages(soql):
+                if writer is None:
+                    columns = self._resolve_columns(select_columns, page)
+                    writer = ColumnarWriter(output_path, columns, self._column_field_types(soql, columns),
+                                            file_format=file_format)
+                writer.write_rows(page)
+                rows_written += len(page)
+                if progress_callback:
+                    progress_callback(rows_written)
+            
+            if writer is None:
+                # No pages at all - still leave a valid (empty) file
+                columns = select_columns or []
+                writer = ColumnarWriter(output_path, columns, self._column_field_types(soql, columns),
+                                        file_format=file_format)
+        finally:
+            if writer is not None:
+                writer.close()
+        
+        return rows_written, writer.unconverted_values
+    
+    def export_query(self, soql: str, output_path: str, mode: str = 'auto',
+                     progress_callback: Optional[Callable[[str], None]] = None) -> Tuple[int, str]:
+        """
+        Export a query straight to CSV, picking REST streaming or Bulk API 2.0
+        
+        In 'auto' mode a SELECT COUNT() probe decides: queries returning at
+        least BULK_QUERY_THRESHOLD rows (and that Bulk API supports) run as a
+        Bulk API 2.0 job, everything else streams through REST paging.
+        Paths ending in .parquet / .arrow are written as typed columnar
+        files (always through REST paging - Bulk API results are CSV only).
+        
+        Args:
+            soql: SOQL query string
+            output_path: Path to save CSV file
+            mode: 'auto', 'rest' or 'bulk'
+            progress_callback: Optional callback for status lines
+            
+        Returns:
+            Tuple of (rows written, mode used)
+        """
+        soql = soql.strip()
+        
+        if columnar_format_for(output_path):
+            rows, unconverted = self.export_query_to_columnar(
+                soql,
+                output_path,
+                progress_callback=(lambda count: progress_callback(f"Exported {count} records"))
+                if progress_callback else None
+            )
+            if unconverted and progress_callback:
+                progress_callback(f"⚠️ {unconverted} value(s) did not match their column type and were written as null")
+            return rows, 'rest'
+        
+        if mode == 'auto':
+            mode = 'rest'
+            if self.is_bulk_compatible(soql):
+                row_count = self.count_query_rows(soql)
+                if row_count is not None and row_count >= BULK_QUERY_THRESHOLD:
+                    mode = 'bulk'
+                    if progress_callback:
+                        progress_callback(f"{row_count} rows - using Bulk API 2.0")
+        
+        if mode == 'bulk':
+            job = BulkQueryJob.from_client(self.sf_client)
+            try:
+                return job.run_to_csv(soql, output_path, progress_callback=progress_callback), 'bulk'
+            except BaseException:
+                job.abort()
+                raise
+        
+        rows = self.export_query_to_csv(
+            soql,
+            output_path,
+            progress_callback=(lambda count: progress_callback(f"Exported {count} records"))
+            if progress_callback else None
+        )
+        return rows, 'rest'
+    
+    def count_query_rows(self, soql: str) -> Optional[int]:
+        """
+        Count the rows a query returns with a SELECT COUNT() probe
+        
+        Returns:
+            Row count, or None when the query cannot be rewritten or the probe fails
+        """
+        items, rest = self._parse_select(soql)
+        if not items or not rest:
+            return None
+        
+        # COUNT() does not allow ORDER BY; WHERE and LIMIT are kept
+        rest = re.sub(r'\bORDER\s+BY\b.*?(?=\bLIMIT\b|\bOFFSET\b|$)', ' ', rest,
+                      flags=re.IGNORECASE | re.DOTALL)
+        try:
+            return self.sf.query(f"SELECT COUNT() {rest.strip()}").get('totalSize')
+        except Exception:
+            return None
+    
+    def is_bulk_compatible(self, soql: str) -> bool:
+        """
+        Check whether Bulk API 2.0 can run a query
+        
+        Bulk API 2.0 rejects aggregates, GROUP BY, OFFSET, TYPEOF and child
+        relationship subqueries.
+        """
+        items, rest = self._parse_select(soql)
+        if not items:
+            return False
+        if re.search(r'\b(GROUP\s+BY|OFFSET)\b', rest, re.IGNORECASE):
+            return False
+        for item in items:
+            if item.startswith('(') or re.match(r'TYPEOF\b', item, re.IGNORECASE):
+                return False
+            function_match = re.match(r'([A-Za-z_]+)\s*\(', item)
+            if function_match and function_match.group(1).lower() not in self.FIELD_PRESERVING_FUNCTIONS:
+                return False
+        return True
+    
+    def get_columns_from_query(self, soql: str) -> Optional[List[str]]:
+        """
+        Work out the result columns from a query's SELECT list
+        
+        Args:
+            soql: SOQL query string
+            
+        Returns:
+            Column names as they appear in cleaned records (casing as typed),
+            or None when the SELECT list cannot be mapped (e.g. TYPEOF, FIELDS(ALL))
+        """
+        select_items = self._split_select_list(soql)
+        if not select_items:
+            return None
+        
+        columns = []
+        expression_index = 0
+        for item in select_items:
+            if item.startswith('('):
+                # Child relationship subquery -> one column named after the relationship
+                match = re.search(r'\bFROM\s+([A-Za-z0-9_]+)', item, re.IGNORECASE)
+                if not match:
+                    return None
+                columns.append(match.group(1))
+                continue
+            
+            # TYPEOF and FIELDS(ALL|STANDARD|CUSTOM) expand to columns only the results know
+            if re.match(r'(TYPEOF\b|FIELDS\s*\()', item, re.IGNORECASE):
+                return None
+            
+            function_match = re.match(r'([A-Za-z_]+)\s*\((.*)\)\s*([A-Za-z0-9_]*)$', item, re.DOTALL)
+            if function_match:
+                function_name, argument, alias = function_match.groups()
+                if alias:
+                    columns.append(alias)
+                elif function_name.lower() in self.FIELD_PRESERVING_FUNCTIONS:
+                    columns.append(argument.strip())
+                else:
+                    # Unaliased aggregates come back as expr0, expr1, ...
+                    columns.append(f"expr{expression_index}")
+                    expression_index += 1
+                continue
+            
+            columns.append(item)
+        
+        return columns
     
     def export_to_csv(self, records: List[Dict], output_path: str) -> str:
         """
@@ -76,10 +336,7 @@ class SOQLRunner:
         headers = sorted(list(all_fields))
         
         # Write CSV
-        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(records)
+        self._write_csv_pages([records], output_path, headers=headers)
         
         return output_path
     
@@ -170,6 +427,128 @@ class SOQLRunner:
         
         return True, None
     
+    def _iter_raw_pages(self, soql: str) -> Iterator[Tuple[List[Dict], int]]:
+        """
+        Fetch a query page by page, following nextRecordsUrl lazily
+        
+        Yields:
+            Tuple of (raw records of one page, totalSize)
+        """
+        result = self.sf.query(soql)
+        while True:
+            yield result.get('records', []), result.get('totalSize', 0)
+            
+            if result.get('done', True) or not result.get('nextRecordsUrl'):
+                break
+            result = self.sf.query_more(result['nextRecordsUrl'], identifier_is_url=True)
+    
+    def _write_csv_pages(self, pages: Iterable[List[Dict]], output_path: str,
+                         headers: Optional[List[str]] = None,
+                         select_columns: Optional[List[str]] = None,
+                         progress_callback: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Write pages of cleaned records to CSV as they arrive
+        
+        The header is fixed when the first page arrives: explicit headers,
+        else the SELECT columns (re-cased to match the first page), else the
+        first page's fields. Every page is matched to the header ignoring
+        field-name case, so a column absent from the first page (e.g. a null
+        lookup) still lines up later. Fields outside the header are ignored
+        and missing ones are left blank.
+        
+        Returns:
+            Number of rows written
+        """
+        rows_written = 0
+        writer = None
+        
+        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            for page in pages:
+                if writer is None:
+                    if headers is None:
+                        headers = self._resolve_columns(select_columns, page)
+                    writer = csv.DictWriter(csvfile, fieldnames=headers, restval='', extrasaction='ignore')
+                    writer.writeheader()
+                
+                writer.writerows(self._align_records(page, headers))
+                rows_written += len(page)
+                if progress_callback:
+                    progress_callback(rows_written)
+            
+            if writer is None:
+                # No pages at all - still leave a valid (header-only) file
+                csv.writer(csvfile).writerow(headers or select_columns or [])
+        
+        return rows_written
+    
+    def _resolve_columns(self, select_columns: Optional[List[str]], first_page: List[Dict]) -> List[str]:
+        """Pick the CSV columns, using the first page for the API's field-name casing"""
+        page_fields: Dict[str, str] = {}
+        for record in first_page:
+            for key in record:
+                page_fields.setdefault(key.lower(), key)
+        
+        if not select_columns:
+            return list(dict.fromkeys(key for record in first_page for key in record))
+        
+        return [page_fields.get(column.lower(), column) for column in select_columns]
+    
+    def _align_records(self, records: List[Dict], columns: List[str]) -> List[Dict]:
+        """Re-key records to the given column names, matching field names case-insensitively"""
+        column_names = {column.lower(): column for column in columns}
+        aligned = []
+        for record in records:
+            row = {}
+            for key, value in record.items():
+                column = column_names.get(key.lower())
+                if column is not None:
+                    row[column] = value
+            aligned.append(row)
+        return aligned
+    
+    def _split_select_list(self, soql: str) -> List[str]:
+        """
+        Split the top-level SELECT list of a query into items
+        
+        Commas and FROM inside parentheses (functions, subqueries) are skipped.
+        
+        Returns:
+            SELECT items, or [] when the query has no recognizable SELECT ... FROM
+        """
+        return self._parse_select(soql)[0]
+    
+    def _parse_select(self, soql: str) -> Tuple[List[str], str]:
+        """
+        Split a query into its top-level SELECT items and the rest (from FROM on)
+        
+        Returns:
+            Tuple of (SELECT items, "FROM ..." remainder), or ([], '') when unparseable
+        """
+        match = re.match(r'\s*SELECT\s+', soql, re.IGNORECASE)
+        if not match:
+            return [], ''
+        
+        items = []
+        depth = 0
+        start = match.end()
+        position = start
+        while position < len(soql):
+            char = soql[position]
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif depth == 0 and char == ',':
+                items.append(soql[start:position].strip())
+                start = position + 1
+            elif depth == 0 and re.match(r'\bFROM\b', soql[position:position + 5], re.IGNORECASE) \
+                    and (position == 0 or not (soql[position - 1].isalnum() or soql[position - 1] == '_')):
+                items.append(soql[start:position].strip())
+                return [item for item in items if item], soql[position:].strip()
+            position += 1
+        
+        return [], ''
+    
     def _clean_records(self, records: List[Dict]) -> List[Dict]:
         """
         Clean records by removing Salesforce metadata attributes
@@ -189,24 +568,76 @@ class SOQLRunner:
                 if key == 'attributes':
                     continue
                 
-                # Handle relationship fields (nested objects)
-                if isinstance(value, dict):
-                    # If it's a related record, flatten it
-                    if 'attributes' in value:
-                        # This is a relationship query result
-                        for sub_key, sub_value in value.items():
-                            if sub_key != 'attributes':
-                                clean_record[f"{key}.{sub_key}"] = sub_value
-                    else:
-                        # Keep as-is if no attributes
-                        clean_record[key] = str(value)
-                else:
-                    clean_record[key] = value
+                self._flatten_value(clean_record, key, value)
             
             cleaned.append(clean_record)
         
         return cleaned
     
+    def _flatten_value(self, clean_record: Dict, key: str, value):
+        """Flatten one field into a clean record (relationship paths become dotted columns)"""
+        # Handle relationship fields (nested objects)
+        if isinstance(value, dict):
+            # If it's a related record, flatten it (Account.Owner.Name)
+            if 'attributes' in value:
+                # This is a relationship query result
+                for sub_key, sub_value in value.items():
+                    if sub_key != 'attributes':
+                        self._flatten_value(clean_record, f"{key}.{sub_key}", sub_value)
+            else:
+                # Keep as-is if no attributes
+                clean_record[key] = str(value)
+        else:
+            clean_record[key] = value
+    
+    def _column_field_types(self, soql: str, columns: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Look up the describe field type of every output column
+        
+        "Owner.Name" style paths are followed through the relationship's
+        referenceTo object; polymorphic relationships, FORMAT() / toLabel()
+        display text and anything that is not a plain field resolve to None.
+        
+        Returns:
+            Dict of column -> describe field type (or None)
+        """
+        object_name = self.get_object_from_query(soql)
+        field_types: Dict[str, Optional[str]] = {}
+        
+        # Unaliased FORMAT(Amount) keeps the column name Amount but holds localized text
+        text_columns = set()
+        for item in self._split_select_list(soql):
+            function_match = re.match(r'([A-Za-z_]+)\s*\((.*)\)\s*$', item, re.DOTALL)
+            if function_match and function_match.group(1).lower() in self.TEXT_RESULT_FUNCTIONS:
+                text_columns.add(function_match.group(2).strip().lower())
+        
+        for column in columns:
+            if column.lower() in text_columns:
+                field_types[column] = None
+                continue
+            current_object = object_name
+            field_type = None
+            parts = column.split('.')
+            for position, part in enumerate(parts):
+                fields = self._object_fields(current_object) if current_object else []
+                if position == len(parts) - 1:
+                    field_type = next((field['type'] for field in fields
+                                       if field['name'].lower() == part.lower()), None)
+                    break
+                reference = next((field for field in fields
+                                  if (field.get('relationshipName') or '').lower() == part.lower()), None)
+                targets = reference.get('referenceTo', []) if reference else []
+                current_object = targets[0] if len(targets) == 1 else None
+            field_types[column] = field_type
+        
+        return field_types
+    
+    def _object_fields(self, object_name: str) -> List[Dict]:
+        """Get an object's cached describe fields (describing it on first use)"""
+        if object_name not in self.object_cache:
+            self._cache_object_metadata(object_name)
+        return self.object_cache.get(object_name, {}).get('fields', [])
+    
     def _cache_object_metadata(self, object_name: str):
         """
         Cache object metadata for field suggestions
@@ -215,7 +646,7 @@ class SOQLRunner:
             object_name: Salesforce object API name
         """
         try:
-            describe = getattr(self.sf, object_name).describe()
+            describe = self.sf_client.describe(object_name)
             
             fields = []
             for field in describe.get('fields', []):
@@ -223,7 +654,8 @@ class SOQLRunner:
                     'name': field.get('name', ''),
                     'label': field.get('label', ''),
                     'type': field.get('type', ''),
-                    'referenceTo': field.get('referenceTo', [])
+                    'referenceTo': field.get('referenceTo', []),
+                    'relationshipName': field.get('relationshipName')
                 })
             
             self.object_cache[object_name] = {
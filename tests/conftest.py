@@ -0,0 +1,28 @@
+"""
+Shared test setup
+
+The modules live at the repository root, which is put on sys.path here.
+No test talks to Salesforce: when simple_salesforce is not installed, a
+stand-in exposing the names the modules import is registered instead.
+"""
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import simple_salesforce  # noqa: F401
+except ImportError:
+    class Salesforce:
+        """Placeholder - tests pass their own fake connections"""
+
+    class SalesforceExpiredSession(Exception):
+        """Placeholder for simple_salesforce.exceptions.SalesforceExpiredSession"""
+
+    simple_salesforce = types.ModuleType('simple_salesforce')
+    simple_salesforce.Salesforce = Salesforce
+    simple_salesforce.exceptions = types.ModuleType('simple_salesforce.exceptions')
+    simple_salesforce.exceptions.SalesforceExpiredSession = SalesforceExpiredSession
+    sys.modules['simple_salesforce'] = simple_salesforce
+    sys.modules['simple_salesforce.exceptions'] = simple_salesforce.exceptions
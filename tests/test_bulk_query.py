@@ -0,0 +1,131 @@
+"""Tests for Bulk API 2.0 query jobs against a stub HTTP server"""
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import bulk_query
+from bulk_query import BulkQueryError, BulkQueryJob
+
+JOB_ID = '750000000000001'
+
+# Result chunks by locator; every chunk repeats the header row
+RESULT_CHUNKS = {
+    None: ('"Id","Name"\n"001A","Acme"\n"001B","Globex"\n', 2, 'LOC2'),
+    'LOC2': ('"Id","Name"\n"001C","Initech"\n', 1, 'LOC3'),
+    'LOC3': ('"Id","Name"\n"001D","Hooli, Inc."\n', 1, 'null'),
+}
+
+
+class StubBulkApi(BaseHTTPRequestHandler):
+    """Minimal /jobs/query endpoints: create, poll, results by locator"""
+
+    states = []
+    requests_seen = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.requests_seen.append(('POST', self.path, body))
+        self._send_json(200, {'id': JOB_ID, 'state': 'UploadComplete'})
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        self.requests_seen.append(('GET', url.path, params))
+
+        if url.path.endswith(f'/jobs/query/{JOB_ID}'):
+            state = self.states.pop(0) if len(self.states) > 1 else self.states[0]
+            self._send_json(200, {'id': JOB_ID, 'state': state, 'numberRecordsProcessed': 4,
+                                  'errorMessage': 'boom' if state == 'Failed' else None})
+        elif url.path.endswith(f'/jobs/query/{JOB_ID}/results'):
+            content, count, next_locator = RESULT_CHUNKS[params.get('locator')]
+            body = content.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Sforce-NumberOfRecords', str(count))
+            self.send_header('Sforce-Locator', next_locator)
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, [{'message': 'not found'}])
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def bulk_api(monkeypatch):
+    monkeypatch.setattr(bulk_query, 'BULK_QUERY_POLL_INTERVAL', 0)
+    StubBulkApi.states = ['JobComplete']
+    StubBulkApi.requests_seen = []
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubBulkApi)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    session = requests.Session()
+    yield BulkQueryJob(session, f"http://127.0.0.1:{server.server_port}", '65.0',
+                       {'Authorization': 'Bearer token'})
+    session.close()
+    server.shutdown()
+    server.server_close()
+
+
+def read(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def test_results_follow_locators_and_keep_one_header(bulk_api, tmp_path):
+    StubBulkApi.states = ['InProgress', 'InProgress', 'JobComplete']
+    output_path = str(tmp_path / 'accounts.csv')
+
+    rows = bulk_api.run_to_csv("SELECT Id, Name FROM Account", output_path)
+
+    assert rows == 4
+    assert read(output_path) == (
+        '"Id","Name"\n"001A","Acme"\n"001B","Globex"\n"001C","Initech"\n"001D","Hooli, Inc."\n'
+    )
+    result_calls = [params for method, path, params in StubBulkApi.requests_seen if path.endswith('/results')]
+    assert [params.get('locator') for params in result_calls] == [None, 'LOC2', 'LOC3']
+    assert result_calls[0]['maxRecords'] == str(bulk_query.BULK_QUERY_MAX_RECORDS_PER_CHUNK)
+
+
+def test_header_split_across_stream_blocks_is_skipped(bulk_api, tmp_path, monkeypatch):
+    # Tiny blocks: the header of each later chunk spans several reads
+    monkeypatch.setattr(bulk_query, 'CONTENT_DOWNLOAD_CHUNK_SIZE', 4)
+    output_path = str(tmp_path / 'accounts.csv')
+
+    rows = bulk_api.run_to_csv("SELECT Id, Name FROM Account", output_path)
+
+    assert rows == 4
+    assert read(output_path).count('"Id","Name"') == 1
+    assert read(output_path).endswith('"001C","Initech"\n"001D","Hooli, Inc."\n')
+
+
+def test_create_sends_query_job(bulk_api, tmp_path):
+    bulk_api.run_to_csv("SELECT Id FROM Account", str(tmp_path / 'out.csv'), include_deleted=True)
+
+    method, path, body = StubBulkApi.requests_seen[0]
+    assert (method, path) == ('POST', '/services/data/v65.0/jobs/query')
+    assert body['operation'] == 'queryAll'
+    assert body['query'] == "SELECT Id FROM Account"
+    assert bulk_api.job_id == JOB_ID
+
+
+def test_failed_job_raises(bulk_api, tmp_path):
+    StubBulkApi.states = ['Failed']
+
+    with pytest.raises(BulkQueryError, match='boom'):
+        bulk_api.run_to_csv("SELECT Id FROM Account", str(tmp_path / 'out.csv'))
@@ -0,0 +1,101 @@
+"""Tests for composite batch query packing"""
+import urllib.parse
+
+from composite_batch import CompositeBatch
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, text=''):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = text
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Answers each batch with one result per subrequest, via a handler"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.posts = []
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        self.posts.append((url, json))
+        return self.handler(json['batchRequests'])
+
+
+def query_result(subrequest):
+    soql = urllib.parse.unquote(subrequest['url'].split('?q=', 1)[1])
+    return {'statusCode': 200, 'result': {'totalSize': 1, 'done': True, 'records': [{'soql': soql}]}}
+
+
+def make_batch(handler, tooling=False):
+    session = FakeSession(handler)
+    batch = CompositeBatch(session, 'https://example.my.salesforce.com', '65.0',
+                           {'Authorization': 'Bearer token'}, tooling=tooling)
+    return batch, session
+
+
+def test_queries_are_sent_25_per_call_in_order():
+    batch, session = make_batch(lambda requests_: FakeResponse(200, {
+        'results': [query_result(subrequest) for subrequest in requests_]
+    }))
+    queries = [f"SELECT Id FROM Account WHERE Name = 'n{index}'" for index in range(30)]
+
+    results = batch.query_many(queries)
+
+    assert [len(payload['batchRequests']) for _, payload in session.posts] == [25, 5]
+    assert [result['records'][0]['soql'] for result in results] == queries
+
+
+def test_tooling_batches_use_the_tooling_endpoint():
+    batch, session = make_batch(lambda requests_: FakeResponse(200, {
+        'results': [query_result(subrequest) for subrequest in requests_]
+    }), tooling=True)
+
+    batch.query_many(["SELECT Id FROM ApexClass"])
+
+    url, payload = session.posts[0]
+    assert url == 'https://example.my.salesforce.com/services/data/v65.0/tooling/composite/batch'
+    assert payload['batchRequests'][0]['url'].startswith('v65.0/tooling/query/?q=')
+
+
+def test_failed_subrequest_returns_error():
+    def handler(requests_):
+        results = [query_result(subrequest) for subrequest in requests_]
+        results[1] = {'statusCode': 400, 'result': [{'errorCode': 'MALFORMED_QUERY', 'message': 'bad query'}]}
+        return FakeResponse(200, {'results': results})
+
+    batch, _ = make_batch(handler)
+    results = batch.query_many(["SELECT Id FROM Account", "SELEC Id", "SELECT Id FROM Case"])
+
+    assert 'error' not in results[0]
+    assert results[1] == {'records': [], 'error': 'bad query'}
+    assert results[2]['records']
+
+
+def test_failed_batch_call_fails_every_query_of_that_call():
+    calls = []
+
+    def handler(requests_):
+        calls.append(len(requests_))
+        if len(calls) == 1:
+            return FakeResponse(500, text='Server Error')
+        return FakeResponse(200, {'results': [query_result(subrequest) for subrequest in requests_]})
+
+    batch, _ = make_batch(handler)
+    results = batch.query_many([f"SELECT Id FROM Account LIMIT {index + 1}" for index in range(27)])
+
+    assert all(result['error'] == 'Server Error' for result in results[:25])
+    assert all('error' not in result for result in results[25:])
+
+
+def test_missing_results_are_padded():
+    batch, _ = make_batch(lambda requests_: FakeResponse(200, {'results': [query_result(requests_[0])]}))
+
+    results = batch.query_many(["SELECT Id FROM Account", "SELECT Id FROM Case"])
+
+    assert len(results) == 2
+    assert results[1]['error'] == 'No result returned'
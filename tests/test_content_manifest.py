@@ -0,0 +1,66 @@
+"""Tests for the ContentVersion download journal"""
+import pytest
+
+from content_manifest import DownloadManifest
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    download_manifest = DownloadManifest(str(tmp_path))
+    yield download_manifest
+    download_manifest.close()
+
+
+def write_file(tmp_path, name, content=b'hello'):
+    path = tmp_path / 'Documents' / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_unknown_version_is_not_complete(manifest, tmp_path):
+    assert not manifest.is_complete('068A', str(tmp_path / 'missing.pdf'), 5, 'abc')
+
+
+def test_recorded_download_is_complete(manifest, tmp_path):
+    path = write_file(tmp_path, 'a.pdf')
+    manifest.record('068A', '069A', path, 5, 'ABC123')
+
+    assert manifest.is_complete('068A', path, 5, 'abc123')
+    assert manifest.is_complete('068A', path, None, None)
+
+
+def test_changed_version_in_org_is_not_complete(manifest, tmp_path):
+    path = write_file(tmp_path, 'a.pdf')
+    manifest.record('068A', '069A', path, 5, 'abc123')
+
+    assert not manifest.is_complete('068A', path, 6, 'abc123')
+    assert not manifest.is_complete('068A', path, 5, 'def456')
+    assert not manifest.is_complete('068A', write_file(tmp_path, 'b.pdf'), 5, 'abc123')
+
+
+def test_missing_or_truncated_file_is_not_complete(manifest, tmp_path):
+    path = write_file(tmp_path, 'a.pdf')
+    manifest.record('068A', '069A', path, 5, 'abc123')
+
+    write_file(tmp_path, 'a.pdf', b'hel')
+    assert not manifest.is_complete('068A', path, 5, 'abc123')
+
+    (tmp_path / 'Documents' / 'a.pdf').unlink()
+    assert not manifest.is_complete('068A', path, 5, 'abc123')
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = write_file(tmp_path, 'a.pdf')
+    first = DownloadManifest(str(tmp_path))
+    first.record('068A', '069A', path, 5, 'abc123')
+    first.set_watermark('00D1', '2024-05-01T10:00:00.000+0000')
+    first.close()
+
+    reopened = DownloadManifest(str(tmp_path))
+    try:
+        assert reopened.is_complete('068A', path, 5, 'abc123')
+        assert reopened.get_watermark('00D1') == '2024-05-01T10:00:00.000+0000'
+        assert reopened.get_watermark('00D2') is None
+    finally:
+        reopened.close()
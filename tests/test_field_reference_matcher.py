@@ -0,0 +1,42 @@
+"""Tests for the single-pass field reference scanner"""
+from field_reference_matcher import (
+    DOT_ACCESS,
+    IDENTIFIER,
+    MAP_KEY,
+    MERGE_FIELD,
+    STRING_LITERAL,
+    scan_references
+)
+
+
+def test_empty_body():
+    assert scan_references('') == {}
+    assert scan_references(None) == {}
+
+
+def test_match_kinds():
+    found = scan_references(
+        "Account acc = [SELECT Id FROM Account]; acc.Status__c = 'Region__c'; "
+        "Object value = acc.get('Tier__c'); Object other = fields['Score__c'];"
+    )
+
+    assert DOT_ACCESS in found['status__c']
+    assert STRING_LITERAL in found['region__c']
+    assert STRING_LITERAL in found['tier__c']
+    assert MAP_KEY in found['score__c']
+    assert IDENTIFIER in found['account']
+
+
+def test_merge_fields_report_every_identifier():
+    found = scan_references("<apex:outputText value=\"{!IF(Account.Active__c, Account.Name, '')}\"/>")
+
+    assert found['active__c'] == frozenset({MERGE_FIELD})
+    assert MERGE_FIELD in found['account']
+    assert MERGE_FIELD in found['name']
+
+
+def test_identifiers_are_lowercased():
+    found = scan_references("record.MyField__C")
+
+    assert 'myfield__c' in found
+    assert 'MyField__C' not in found
@@ -0,0 +1,85 @@
+"""Tests for Flow Metadata parsing"""
+from flow_usage_index import parse_flow_field_references
+
+
+def test_empty_metadata():
+    assert parse_flow_field_references({}) == set()
+    assert parse_flow_field_references(None) == set()
+
+
+def test_record_elements_name_their_fields():
+    metadata = {
+        'recordLookups': [{
+            'name': 'Get_Contact',
+            'object': 'Contact',
+            'queriedFields': ['Email'],
+            'filters': [{'field': 'AccountId', 'value': {'elementReference': '$Record.Id'}}],
+            'sortField': 'CreatedDate'
+        }],
+        'recordCreates': [{
+            'object': 'Task',
+            'inputAssignments': [{'field': 'Subject', 'value': {'stringValue': 'Call'}}]
+        }]
+    }
+
+    assert parse_flow_field_references(metadata) == {
+        ('Contact', 'Email'),
+        ('Contact', 'AccountId'),
+        ('Contact', 'CreatedDate'),
+        ('Task', 'Subject')
+    }
+
+
+def test_record_triggered_start_and_references():
+    metadata = {
+        'start': {'object': 'Account', 'filters': [{'field': 'Rating'}]},
+        'decisions': [{
+            'rules': [{'conditions': [{'leftValueReference': '$Record.Industry'}]}]
+        }],
+        'assignments': [{
+            'assignmentItems': [{'assignToReference': '$Record__Prior.Type'}]
+        }],
+        'formulas': [{'expression': 'TEXT({!$Record.Ownership}) & {!$Record.Owner.Name}'}]
+    }
+
+    # $Record.Owner.Name walks a relationship and is not a field of Account
+    assert parse_flow_field_references(metadata) == {
+        ('Account', 'Rating'),
+        ('Account', 'Industry'),
+        ('Account', 'Type'),
+        ('Account', 'Ownership')
+    }
+
+
+def test_record_element_on_input_reference():
+    metadata = {
+        'start': {'object': 'Opportunity'},
+        'variables': [{'name': 'relatedCase', 'objectType': 'Case'}],
+        'recordUpdates': [
+            {'inputReference': '$Record', 'inputAssignments': [{'field': 'StageName'}]},
+            {'inputReference': 'relatedCase', 'inputAssignments': [{'field': 'Status'}]}
+        ]
+    }
+
+    assert parse_flow_field_references(metadata) == {
+        ('Opportunity', 'StageName'),
+        ('Case', 'Status')
+    }
+
+
+def test_process_builder_variables_and_merge_fields():
+    metadata = {
+        'variables': [{'name': 'myVariable_current', 'objectType': 'Lead'}],
+        'recordUpdates': [{
+            'object': 'Lead',
+            'inputAssignments': [{
+                'field': 'Description',
+                'value': {'stringValue': 'Score {!myVariable_current.Score__c}'}
+            }]
+        }]
+    }
+
+    assert parse_flow_field_references(metadata) == {
+        ('Lead', 'Description'),
+        ('Lead', 'Score__c')
+    }
@@ -0,0 +1,119 @@
+"""Tests for Id-range splitting and part merging of PK-chunked extracts"""
+import os
+
+import pytest
+
+from pk_chunk_extractor import PKChunkExtractor
+from soql_runner import SOQLRunner
+
+IDS = [f"001{number:012d}" for number in range(5000)]
+
+
+class FakeSalesforce:
+    """Id-ordered query over IDS whose locator can be opened at any offset"""
+
+    PAGE_SIZE = 2000
+
+    def __init__(self):
+        self.calls = []
+
+    def query(self, soql):
+        self.calls.append(soql)
+        return {
+            'totalSize': len(IDS),
+            'done': False,
+            'records': [{'Id': record_id} for record_id in IDS[:self.PAGE_SIZE]],
+            'nextRecordsUrl': f"/services/data/v65.0/query/01gXX0000000001-{self.PAGE_SIZE}"
+        }
+
+    def query_more(self, url, identifier_is_url=False):
+        self.calls.append(url)
+        offset = int(url.rsplit('-', 1)[1])
+        return {'records': [{'Id': record_id} for record_id in IDS[offset:offset + self.PAGE_SIZE]]}
+
+
+class FakeRunner(SOQLRunner):
+    """Writes each chunk query's Id range as a one-column CSV part"""
+
+    def __init__(self, failing_parts=()):
+        self.sf = FakeSalesforce()
+        self.failing_parts = set(failing_parts)
+        self.exported = []
+
+    def export_query(self, soql, output_path, mode='auto', progress_callback=None):
+        self.exported.append(soql)
+        if os.path.basename(output_path) in self.failing_parts:
+            raise Exception('QUERY_TIMEOUT')
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(f'"Id"\n"{os.path.basename(output_path)}"\n')
+        return 1, mode
+
+
+def test_boundaries_are_sampled_ids():
+    runner = FakeRunner()
+    extractor = PKChunkExtractor(runner, chunk_size=1500)
+
+    row_count, boundaries = extractor._id_boundaries('Account', "Industry = 'Energy'")
+
+    assert row_count == 5000
+    assert boundaries == [IDS[1500], IDS[3000], IDS[4500]]
+    # One query plus one locator jump per boundary past the first page
+    assert runner.sf.calls == [
+        "SELECT Id FROM Account WHERE Industry = 'Energy' ORDER BY Id",
+        "/services/data/v65.0/query/01gXX0000000001-3000",
+        "/services/data/v65.0/query/01gXX0000000001-4500",
+    ]
+
+
+def test_small_query_is_one_range():
+    extractor = PKChunkExtractor(FakeRunner(), chunk_size=10000)
+
+    assert extractor._id_boundaries('Account', '') == (5000, [])
+
+
+@pytest.mark.parametrize('soql, chunkable', [
+    ("SELECT Id, Name FROM Account WHERE Industry = 'Energy'", True),
+    ("SELECT Id FROM Account ORDER BY Name", False),
+    ("SELECT Id FROM Account LIMIT 10", False),
+    ("SELECT Industry, COUNT(Id) FROM Account GROUP BY Industry", False),
+    ("not a query", False),
+])
+def test_can_chunk(soql, chunkable):
+    assert PKChunkExtractor(FakeRunner()).can_chunk(soql) is chunkable
+
+
+def test_chunk_query_bounds():
+    extractor = PKChunkExtractor(FakeRunner())
+
+    assert extractor._chunk_query('Id', 'Account', "Industry = 'Energy' OR Rating = 'Hot'", IDS[10], IDS[20]) == (
+        f"SELECT Id FROM Account WHERE (Industry = 'Energy' OR Rating = 'Hot') "
+        f"AND Id >= '{IDS[10]}' AND Id < '{IDS[20]}'"
+    )
+    assert extractor._chunk_query('Id', 'Account', '', None, None) == "SELECT Id FROM Account"
+
+
+def test_extract_merges_parts_in_order(tmp_path):
+    runner = FakeRunner()
+    output_path = str(tmp_path / 'accounts.csv')
+
+    stats = PKChunkExtractor(runner, chunk_size=2000).extract("SELECT Id FROM Account", output_path, mode='rest')
+
+    assert stats == {'rows': 3, 'chunks': 3, 'failed_chunks': [], 'output': output_path}
+    with open(output_path, encoding='utf-8') as f:
+        assert f.read() == '"Id"\n"part_0001.csv"\n"part_0002.csv"\n"part_0003.csv"\n'
+    assert not os.path.exists(output_path + '.parts')
+    assert runner.exported[0] == f"SELECT Id FROM Account WHERE Id < '{IDS[2000]}'"
+    assert runner.exported[-1] == f"SELECT Id FROM Account WHERE Id >= '{IDS[4000]}'"
+
+
+def test_failed_chunk_keeps_parts_and_manifest(tmp_path):
+    output_path = str(tmp_path / 'accounts.csv')
+
+    stats = PKChunkExtractor(FakeRunner(failing_parts={'part_0002.csv'}), chunk_size=2000).extract(
+        "SELECT Id FROM Account", output_path, mode='rest'
+    )
+
+    assert stats['failed_chunks'] == [{'part': 'part_0002.csv', 'reason': 'QUERY_TIMEOUT'}]
+    assert stats['output'] == os.path.join(output_path + '.parts', PKChunkExtractor.MANIFEST_FILENAME)
+    assert os.path.exists(stats['output'])
+    assert not os.path.exists(output_path)
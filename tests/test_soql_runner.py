@@ -0,0 +1,85 @@
+"""Tests for SOQL column mapping, COUNT() probes and CSV streaming"""
+import csv
+
+import pytest
+
+from soql_runner import SOQLRunner
+
+
+class FakeSalesforce:
+    """Records queries; answers COUNT() probes with a fixed size"""
+
+    def __init__(self, total_size=42, error=None):
+        self.total_size = total_size
+        self.error = error
+        self.queries = []
+
+    def query(self, soql):
+        self.queries.append(soql)
+        if self.error:
+            raise self.error
+        return {'totalSize': self.total_size, 'done': True, 'records': []}
+
+
+class FakeClient:
+    def __init__(self, sf):
+        self.sf = sf
+
+
+@pytest.fixture
+def runner():
+    return SOQLRunner(FakeClient(FakeSalesforce()))
+
+
+@pytest.mark.parametrize('soql, columns', [
+    ("SELECT Id, Name FROM Account", ['Id', 'Name']),
+    ("select id, Owner.Name from Account where Name != null", ['id', 'Owner.Name']),
+    ("SELECT Id, (SELECT Id FROM Contacts) FROM Account", ['Id', 'Contacts']),
+    ("SELECT COUNT(Id), MAX(Amount) total FROM Opportunity", ['expr0', 'total']),
+    ("SELECT Id, toLabel(StageName), FORMAT(Amount) FROM Opportunity", ['Id', 'StageName', 'Amount']),
+    ("SELECT Industry, COUNT(Id) FROM Account GROUP BY Industry", ['Industry', 'expr0']),
+])
+def test_columns_from_query(runner, soql, columns):
+    assert runner.get_columns_from_query(soql) == columns
+
+
+@pytest.mark.parametrize('soql', [
+    "SELECT FIELDS(ALL) FROM Account LIMIT 200",
+    "SELECT TYPEOF What WHEN Account THEN Name END FROM Task",
+    "DELETE Account",
+])
+def test_columns_unknown_from_query(runner, soql):
+    assert runner.get_columns_from_query(soql) is None
+
+
+def test_count_probe_rewrites_the_query(runner):
+    count = runner.count_query_rows("SELECT Id, (SELECT Id FROM Contacts) FROM Account "
+                                    "WHERE Name LIKE 'A%' ORDER BY Name LIMIT 500")
+
+    assert count == 42
+    assert [' '.join(soql.split()) for soql in runner.sf.queries] == [
+        "SELECT COUNT() FROM Account WHERE Name LIKE 'A%' LIMIT 500"
+    ]
+
+
+def test_count_probe_failure_returns_none():
+    runner = SOQLRunner(FakeClient(FakeSalesforce(error=Exception('INVALID_FIELD'))))
+
+    assert runner.count_query_rows("SELECT Id FROM Account") is None
+    assert runner.count_query_rows("not a query") is None
+
+
+def test_csv_pages_match_columns_case_insensitively(runner, tmp_path):
+    output_path = tmp_path / 'out.csv'
+    pages = [
+        [{'Id': '1', 'Name': 'a'}],  # null lookup: no Account.Name on the first page
+        [{'Id': '2', 'Name': 'b', 'Account.Name': 'Acme'}],
+    ]
+
+    rows = runner._write_csv_pages(iter(pages), str(output_path),
+                                   select_columns=['Id', 'name', 'account.name'])
+
+    with open(output_path, newline='', encoding='utf-8') as f:
+        written = list(csv.reader(f))
+    assert rows == 2
+    assert written == [['Id', 'Name', 'account.name'], ['1', 'a', ''], ['2', 'b', 'Acme']]
@@ -0,0 +1,93 @@
+"""Tests for the persistent usage artifact store"""
+import pytest
+
+from usage_store import UsageStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    usage_store = UsageStore('00D000000000001', cache_dir=str(tmp_path))
+    yield usage_store
+    usage_store.close()
+
+
+class Fetcher:
+    """fetch_changed stand-in that records the Ids it was asked for"""
+
+    def __init__(self, skip=()):
+        self.calls = []
+        self.skip = set(skip)
+
+    def __call__(self, artifact_ids):
+        self.calls.append(sorted(artifact_ids))
+        return {
+            artifact_id: (f"Name {artifact_id}", {'fields': [artifact_id]})
+            for artifact_id in artifact_ids if artifact_id not in self.skip
+        }
+
+
+def test_first_refresh_downloads_everything(store):
+    fetch = Fetcher()
+
+    current, downloaded, deleted = store.refresh('Layouts', {'a': 't1', 'b': 't1'}, fetch)
+
+    assert fetch.calls == [['a', 'b']]
+    assert (downloaded, deleted) == (2, 0)
+    assert current['a'] == ('Name a', 't1', {'fields': ['a']})
+
+
+def test_only_changed_artifacts_are_downloaded(store):
+    store.refresh('Layouts', {'a': 't1', 'b': 't1', 'c': 't1'}, Fetcher())
+    fetch = Fetcher()
+
+    current, downloaded, deleted = store.refresh('Layouts', {'a': 't1', 'b': 't2', 'd': 't1'}, fetch)
+
+    assert fetch.calls == [['b', 'd']]
+    assert (downloaded, deleted) == (2, 1)
+    assert sorted(current) == ['a', 'b', 'd']
+    assert current['b'][1] == 't2'
+    assert 'c' not in store.load('Layouts')
+
+
+def test_unchanged_listing_fetches_nothing(store):
+    store.refresh('Layouts', {'a': 't1'}, Fetcher())
+    fetch = Fetcher()
+
+    current, downloaded, _ = store.refresh('Layouts', {'a': 't1'}, fetch)
+
+    assert fetch.calls == []
+    assert downloaded == 0
+    assert current['a'][2] == {'fields': ['a']}
+
+
+def test_artifacts_left_out_by_fetch_are_retried(store):
+    current, downloaded, _ = store.refresh('Layouts', {'a': 't1', 'b': 't1'}, Fetcher(skip={'b'}))
+    assert sorted(current) == ['a']
+    assert downloaded == 1
+
+    fetch = Fetcher()
+    current, _, _ = store.refresh('Layouts', {'a': 't1', 'b': 't1'}, fetch)
+
+    assert fetch.calls == [['b']]
+    assert sorted(current) == ['a', 'b']
+
+
+def test_categories_and_orgs_are_separate(store, tmp_path):
+    store.refresh('Layouts', {'a': 't1'}, Fetcher())
+
+    assert store.load('Flows') == {}
+    other_org = UsageStore('00D000000000002', cache_dir=str(tmp_path))
+    try:
+        assert other_org.load('Layouts') == {}
+    finally:
+        other_org.close()
+
+
+def test_refresh_many_shares_one_fetch(store):
+    fetch = Fetcher()
+
+    results = store.refresh_many({'Layouts:Account': {'a': 't1'}, 'Layouts:Case': {'b': 't1'}}, fetch)
+
+    assert fetch.calls == [['a', 'b']]
+    assert sorted(results['Layouts:Account'][0]) == ['a']
+    assert sorted(results['Layouts:Case'][0]) == ['b']
@@ -6,7 +6,8 @@ from typing import Optional, Tuple
 class TriggerDeployer:
     """Handles Salesforce Apex Trigger deployment via Tooling API MetadataContainer"""
 
-    def __init__(self, base_url: str, api_version: str, headers: dict, logger=None):
+    def __init__(self, base_url: str, api_version: str, headers: dict, logger=None,
+                 session: Optional[requests.Session] = None):
         """
         Initialize the TriggerDeployer
 
@@ -15,11 +16,13 @@ class TriggerDeployer:
             api_version: API version (e.g., "62.0")
             headers: Request headers with authorization
             logger: Optional logger function for logging messages
+            session: Optional shared requests.Session (pooled connections)
         """
         self.base_url = base_url
         self.api_version = api_version
         self.headers = headers
         self._log = logger if logger else print
+        self.http = session if session else requests.Session()
 
     def deploy_trigger(self, trigger_id: str, trigger_body: str,
                        api_version: str, is_active: bool,
@@ -81,7 +84,7 @@ class TriggerDeployer:
                 "Name": f"TriggerContainer_{int(time.time())}"
             }
 
-            response = requests.post(url, headers=self.headers, json=payload, timeout=timeout)
+            response = self.http.post(url, headers=self.headers, json=payload, timeout=timeout)
 
             if response.status_code == 201:
                 return response.json()['id']
@@ -111,7 +114,7 @@ class TriggerDeployer:
                 }
             }
 
-            response = requests.post(url, headers=self.headers, json=payload, timeout=timeout)
+            response = self.http.post(url, headers=self.headers, json=payload, timeout=timeout)
 
             if response.status_code == 201:
                 return True
@@ -132,7 +135,7 @@ class TriggerDeployer:
                 "IsCheckOnly": False
             }
 
-            response = requests.post(url, headers=self.headers, json=payload, timeout=timeout)
+            response = self.http.post(url, headers=self.headers, json=payload, timeout=timeout)
 
             if response.status_code == 201:
                 return response.json()['id']
@@ -154,7 +157,7 @@ class TriggerDeployer:
             poll_interval = 2
 
             while elapsed < max_wait:
-                response = requests.get(url, headers=self.headers, timeout=30)
+                response = self.http.get(url, headers=self.headers, timeout=30)
 
                 if response.status_code != 200:
                     return False, f"Failed to check status: {response.text}"
@@ -188,6 +191,6 @@ class TriggerDeployer:
         """Delete the MetadataContainer"""
         try:
             url = f"{self.base_url}/services/data/v{self.api_version}/tooling/sobjects/MetadataContainer/{container_id}"
-            requests.delete(url, headers=self.headers, timeout=30)
+            self.http.delete(url, headers=self.headers, timeout=30)
         except Exception as e:
             self._log(f"⚠️ Failed to cleanup container: {str(e)}")
\ No newline at end of file
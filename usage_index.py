@@ -0,0 +1,281 @@
+"""
+Org-wide field usage index
+
+Downloads each source corpus (Apex classes, Visualforce pages/components,
+Aura definitions, email templates) once per session, tokenizes every body
+once and keeps an inverted index of identifier -> artifacts (with the kind
+of each reference, see field_reference_matcher). Field usage for
+any object is then answered with dictionary lookups instead of re-downloading
+and re-scanning all source per object.
+
+With a UsageStore, scanned artifacts persist across sessions and only those
+whose LastModifiedDate changed are downloaded again.
+"""
+import threading
+import urllib.parse
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from simple_salesforce import Salesforce
+
+from usage_store import UsageStore
+from field_reference_matcher import (
+    scan_references,
+    ANY_KIND,
+    CODE_KINDS,
+    MARKUP_KINDS
+)
+
+
+class CorpusSpec:
+    """Describes one source corpus and how to index it"""
+
+    def __init__(self, category: str, sobject: str, fields: List[str], text_fields: List[str],
+                 name_func: Callable[[Dict], str], where: str = '',
+                 reference_kinds: FrozenSet[str] = ANY_KIND,
+                 tooling: bool = True, requires_object_reference: bool = True):
+        """
+        Args:
+            category: Usage section the corpus feeds (e.g. 'Apex Classes')
+            sobject: Object holding the artifacts (e.g. 'ApexClass')
+            fields: Fields to download besides Id (name and source fields)
+            text_fields: Record fields holding source text
+            name_func: Extracts the display name from a record
+            where: Optional SOQL filter (without WHERE)
+            reference_kinds: Match kinds that count as a field reference
+            tooling: Query through the Tooling API
+            requires_object_reference: Only count a field when the artifact
+                                       also mentions the object
+        """
+        self.category = category
+        self.sobject = sobject
+        self.fields = fields
+        self.text_fields = text_fields
+        self.name_func = name_func
+        self.where = where
+        self.reference_kinds = reference_kinds
+        self.tooling = tooling
+        self.requires_object_reference = requires_object_reference
+
+    def listing_soql(self) -> str:
+        """Cheap query used to detect new, changed and deleted artifacts"""
+        soql = f"SELECT Id, LastModifiedDate FROM {self.sobject}"
+        return f"{soql} WHERE {self.where}" if self.where else soql
+
+    def fetch_soql(self, artifact_ids: List[str]) -> str:
+        """Query downloading the source of specific artifacts"""
+        id_list = ', '.join(f"'{artifact_id}'" for artifact_id in artifact_ids)
+        conditions = [f"Id IN ({id_list})"]
+        if self.where:
+            conditions.insert(0, self.where)
+        return (f"SELECT Id, {', '.join(self.fields)} FROM {self.sobject} "
+                f"WHERE {' AND '.join(conditions)}")
+
+
+class UsageIndex:
+    """Inverted identifier index over the org's source artifacts"""
+
+    CORPORA = [
+        CorpusSpec(
+            category='Apex Classes',
+            sobject='ApexClass',
+            fields=['Name', 'Body'],
+            text_fields=['Body'],
+            name_func=lambda record: record.get('Name', ''),
+            reference_kinds=CODE_KINDS
+        ),
+        CorpusSpec(
+            category='Visualforce Pages',
+            sobject='ApexPage',
+            fields=['Name', 'Markup'],
+            text_fields=['Markup'],
+            name_func=lambda record: record.get('Name', ''),
+            reference_kinds=MARKUP_KINDS
+        ),
+        CorpusSpec(
+            category='Visualforce Components',
+            sobject='ApexComponent',
+            fields=['Name', 'Markup'],
+            text_fields=['Markup'],
+            name_func=lambda record: record.get('Name', ''),
+            reference_kinds=MARKUP_KINDS
+        ),
+        CorpusSpec(
+            category='Lightning Components',
+            sobject='AuraDefinition',
+            fields=['AuraDefinitionBundle.DeveloperName', 'Source'],
+            where="DefType = 'COMPONENT'",
+            text_fields=['Source'],
+            name_func=lambda record: (record.get('AuraDefinitionBundle') or {}).get('DeveloperName', 'Unknown')
+        ),
+        CorpusSpec(
+            category='Email Templates',
+            sobject='EmailTemplate',
+            fields=['Name', 'Body', 'HtmlValue'],
+            text_fields=['Body', 'HtmlValue'],
+            name_func=lambda record: record.get('Name', ''),
+            reference_kinds=MARKUP_KINDS,
+            tooling=False,
+            requires_object_reference=False
+        ),
+    ]
+
+    FETCH_CHUNK_SIZE = 100  # Artifact Ids per source download query
+
+    def __init__(self, sf: Salesforce, status_callback: Optional[Callable] = None,
+                 store: Optional[UsageStore] = None):
+        """
+        Initialize the (lazily built) index
+
+        Args:
+            sf: simple_salesforce connection
+            status_callback: Optional callback for status updates
+            store: Persistent artifact store; when given, only artifacts whose
+                   LastModifiedDate changed since the last session are downloaded
+        """
+        self.sf = sf
+        self.status_callback = status_callback
+        self.store = store
+        self.specs: Dict[str, CorpusSpec] = {spec.category: spec for spec in self.CORPORA}
+
+        # category -> lowercased identifier -> artifact Id -> match kinds
+        self._postings: Dict[str, Dict[str, Dict[str, FrozenSet[str]]]] = {}
+        # category -> artifact Id -> display name
+        self._names: Dict[str, Dict[str, str]] = {}
+
+        self._locks = {category: threading.Lock() for category in self.specs}
+
+    def find(self, category: str, object_name: str, field_name: str) -> Set[str]:
+        """
+        Get the names of artifacts in a category that reference a field
+
+        Args:
+            category: Usage section (e.g. 'Apex Classes')
+            object_name: Object API name
+            field_name: Field API name
+
+        Returns:
+            Set of artifact display names
+        """
+        spec = self.specs[category]
+        postings = self._ensure_corpus(category)
+
+        artifact_ids = {
+            artifact_id
+            for artifact_id, kinds in postings.get(field_name.lower(), {}).items()
+            if kinds & spec.reference_kinds
+        }
+
+        if artifact_ids and spec.requires_object_reference:
+            artifact_ids &= postings.get(object_name.lower(), {}).keys()
+
+        names = self._names[category]
+        return {names[artifact_id] for artifact_id in artifact_ids}
+
+    def get_field_usage(self, category: str, object_name: str,
+                        field_names: List[str]) -> Dict[str, Set[str]]:
+        """
+        Look up usage for many fields of one object
+
+        Returns:
+            Dict of "Object.Field" -> artifact names (fields without usage omitted)
+        """
+        field_usage = {}
+        for field_name in field_names:
+            names = self.find(category, object_name, field_name)
+            if names:
+                field_usage[f"{object_name}.{field_name}"] = names
+        return field_usage
+
+    def build(self, category: str):
+        """Download and index a corpus now instead of on its first lookup"""
+        self._ensure_corpus(category)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return the number of indexed artifacts per category"""
+        return {category: len(names) for category, names in self._names.items()}
+
+    def _ensure_corpus(self, category: str) -> Dict[str, Dict[str, FrozenSet[str]]]:
+        """Download and index a corpus the first time it is needed (thread-safe)"""
+        if category in self._postings:
+            return self._postings[category]
+
+        with self._locks[category]:
+            if category not in self._postings:
+                self._build_corpus(self.specs[category])
+            return self._postings[category]
+
+    def _build_corpus(self, spec: CorpusSpec):
+        """Sync a corpus (delta against the store) and index its identifiers"""
+        postings: Dict[str, Dict[str, FrozenSet[str]]] = {}
+        names: Dict[str, str] = {}
+
+        try:
+            listing = {
+                record['Id']: record.get('LastModifiedDate') or ''
+                for record in self._query_all(spec.listing_soql(), spec.tooling)
+            }
+
+            if self.store:
+                artifacts, downloaded, deleted = self.store.refresh(
+                    spec.category, listing, lambda ids: self._fetch_artifacts(spec, ids)
+                )
+            else:
+                fetched = self._fetch_artifacts(spec, list(listing))
+                artifacts = {
+                    artifact_id: (name, listing[artifact_id], payload)
+                    for artifact_id, (name, payload) in fetched.items()
+                }
+                downloaded, deleted = len(fetched), 0
+
+            for artifact_id, (name, _, references) in artifacts.items():
+                if not references:
+                    continue
+                names[artifact_id] = name
+                for identifier, kinds in references.items():
+                    postings.setdefault(identifier, {})[artifact_id] = frozenset(kinds)
+
+            self._log_status(f"  📚 Indexed {len(names)} {spec.category} "
+                             f"({downloaded} downloaded, {deleted} removed, "
+                             f"{len(postings)} distinct identifiers)")
+
+        except Exception as e:
+            self._log_status(f"    ⚠️  Could not index {spec.category}: {str(e)}")
+
+        self._names[spec.category] = names
+        self._postings[spec.category] = postings
+
+    def _fetch_artifacts(self, spec: CorpusSpec, artifact_ids: List[str]) -> Dict[str, Tuple[str, Dict]]:
+        """
+        Download and scan the source of specific artifacts
+
+        Returns:
+            Dict of artifact Id -> (name, {identifier: [match kinds]})
+        """
+        fetched = {}
+        for start in range(0, len(artifact_ids), self.FETCH_CHUNK_SIZE):
+            chunk = artifact_ids[start:start + self.FETCH_CHUNK_SIZE]
+            for record in self._query_all(spec.fetch_soql(chunk), spec.tooling):
+                text = ' '.join(record.get(field) or '' for field in spec.text_fields)
+                references = {
+                    identifier: sorted(kinds)
+                    for identifier, kinds in scan_references(text).items()
+                }
+                fetched[record['Id']] = (spec.name_func(record), references)
+        return fetched
+
+    def _query_all(self, soql: str, tooling: bool) -> List[Dict]:
+        """Run a query and follow nextRecordsUrl until every record is fetched"""
+        if not tooling:
+            return self.sf.query_all(soql).get('records', [])
+
+        result = self.sf.restful(f"tooling/query/?q={urllib.parse.quote(soql)}", method='GET')
+        records = list(result.get('records', []))
+        while not result.get('done', True) and result.get('nextRecordsUrl'):
+            result = self.sf.query_more(result['nextRecordsUrl'], identifier_is_url=True)
+            records.extend(result.get('records', []))
+        return records
+
+    def _log_status(self, message: str):
+        """Log status message"""
+        if self.status_callback:
+            self.status_callback(message, verbose=True)
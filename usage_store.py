@@ -0,0 +1,206 @@
+"""
+Persistent store of parsed usage artifacts (Apex, Visualforce, Aura, email
+templates, layouts, validation rules)
+
+Rows are keyed by org ID, category and artifact ID and carry the artifact's
+LastModifiedDate, so a later session only re-downloads what changed.
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import CACHE_DIR
+
+
+class UsageStore:
+    """SQLite-backed artifact store shared by the usage index and tracker"""
+
+    DB_FILENAME = 'usage_index.sqlite'
+
+    def __init__(self, org_id: str, cache_dir: str = CACHE_DIR):
+        """
+        Initialize the store
+
+        Args:
+            org_id: Organization Id (partition key)
+            cache_dir: Folder holding the SQLite database
+        """
+        self.org_id = org_id
+        self._lock = threading.RLock()
+
+        self._db: Optional[sqlite3.Connection] = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(
+                os.path.join(cache_dir, self.DB_FILENAME),
+                check_same_thread=False
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS usage_artifacts ("
+                " org_id TEXT NOT NULL,"
+                " category TEXT NOT NULL,"
+                " artifact_id TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " last_modified TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " PRIMARY KEY (org_id, category, artifact_id))"
+            )
+            self._db.commit()
+        except Exception as e:
+            # Persistence is an optimization - callers fall back to full downloads
+            print(f"⚠️ Usage store unavailable: {str(e)}")
+            self._db = None
+
+    def refresh(self, category: str, listing: Dict[str, str],
+                fetch_changed: Callable[[List[str]], Dict[str, Tuple[str, Any]]]
+                ) -> Tuple[Dict[str, Tuple[str, str, Any]], int, int]:
+        """
+        Bring a category up to date from a cheap Id/LastModifiedDate listing
+
+        Only artifacts that are new or whose LastModifiedDate changed are
+        downloaded; artifacts missing from the listing are deleted.
+
+        Args:
+            category: Artifact category
+            listing: Current org state as artifact Id -> LastModifiedDate
+            fetch_changed: Downloads and parses the given Ids, returning
+                           artifact Id -> (name, payload); Ids it cannot
+                           fetch are simply left out and retried next time
+
+        Returns:
+            Tuple of (artifact Id -> (name, last_modified, payload),
+                      number downloaded, number deleted)
+        """
+        return self.refresh_many({category: listing}, fetch_changed)[category]
+
+    def refresh_many(self, listings: Dict[str, Dict[str, str]],
+                     fetch_changed: Callable[[List[str]], Dict[str, Tuple[str, Any]]]
+                     ) -> Dict[str, Tuple[Dict[str, Tuple[str, str, Any]], int, int]]:
+        """
+        Refresh several categories with a single fetch of everything that changed
+
+        Lets callers batch downloads across categories (e.g. the layouts of
+        many objects). Artifact Ids must be unique across the categories.
+
+        Args:
+            listings: Category -> (artifact Id -> LastModifiedDate)
+            fetch_changed: Same contract as in refresh()
+
+        Returns:
+            Category -> same tuple as refresh()
+        """
+        stored = {category: self.load(category) for category in listings}
+
+        changed = [
+            artifact_id
+            for category, listing in listings.items()
+            for artifact_id, last_modified in listing.items()
+            if artifact_id not in stored[category] or stored[category][artifact_id][1] != last_modified
+        ]
+        fetched = fetch_changed(changed) if changed else {}
+
+        results = {}
+        for category, listing in listings.items():
+            category_fetched = {
+                artifact_id: entry for artifact_id, entry in fetched.items() if artifact_id in listing
+            }
+            deleted = [artifact_id for artifact_id in stored[category] if artifact_id not in listing]
+
+            self.save(category, [
+                (artifact_id, name, listing[artifact_id], payload)
+                for artifact_id, (name, payload) in category_fetched.items()
+            ])
+            self.delete(category, deleted)
+
+            current = {
+                artifact_id: entry for artifact_id, entry in stored[category].items()
+                if artifact_id in listing
+            }
+            for artifact_id, (name, payload) in category_fetched.items():
+                current[artifact_id] = (name, listing[artifact_id], payload)
+
+            results[category] = (current, len(category_fetched), len(deleted))
+
+        return results
+
+    def load(self, category: str) -> Dict[str, Tuple[str, str, Any]]:
+        """
+        Load every stored artifact of a category
+
+        Returns:
+            Dict of artifact Id -> (name, last_modified, payload)
+        """
+        if not self._db:
+            return {}
+        try:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT artifact_id, name, last_modified, payload FROM usage_artifacts "
+                    "WHERE org_id = ? AND category = ?",
+                    (self.org_id, category)
+                ).fetchall()
+            return {row[0]: (row[1], row[2], json.loads(row[3])) for row in rows}
+        except Exception:
+            return {}
+
+    def save(self, category: str, artifacts: Iterable[Tuple[str, str, str, Any]]):
+        """
+        Insert or replace artifacts
+
+        Args:
+            category: Artifact category
+            artifacts: (artifact Id, name, last_modified, payload) tuples
+        """
+        if not self._db:
+            return
+        try:
+            with self._lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO usage_artifacts "
+                    "(org_id, category, artifact_id, name, last_modified, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (self.org_id, category, artifact_id, name, last_modified, json.dumps(payload))
+                        for artifact_id, name, last_modified, payload in artifacts
+                    ]
+                )
+                self._db.commit()
+        except Exception:
+            pass
+
+    def delete(self, category: str, artifact_ids: List[str]):
+        """Remove artifacts that no longer exist in the org"""
+        if not self._db or not artifact_ids:
+            return
+        try:
+            with self._lock:
+                self._db.executemany(
+                    "DELETE FROM usage_artifacts WHERE org_id = ? AND category = ? AND artifact_id = ?",
+                    [(self.org_id, category, artifact_id) for artifact_id in artifact_ids]
+                )
+                self._db.commit()
+        except Exception:
+            pass
+
+    def clear(self):
+        """Drop everything stored for this org"""
+        if not self._db:
+            return
+        try:
+            with self._lock:
+                self._db.execute("DELETE FROM usage_artifacts WHERE org_id = ?", (self.org_id,))
+                self._db.commit()
+        except Exception:
+            pass
+
+    def close(self):
+        """Close the persistent store"""
+        with self._lock:
+            if self._db:
+                try:
+                    self._db.close()
+                except Exception:
+                    pass
+                self._db = None
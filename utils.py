@@ -62,6 +62,8 @@ def print_content_document_statistics(stats: Dict, runtime_formatted: str, outpu
     print(f"Total ContentDocuments Found:   {stats['total_documents']}")
     print(f"Total Versions Found:           {stats['total_versions']}")
     print(f"✅ Successfully Downloaded:      {stats['successful_downloads']}")
+    print(f"⏭️ Already Downloaded (resumed): {stats.get('skipped_downloads', 0)}")
+    print(f"🔗 Deduplicated (hardlinked):    {stats.get('deduplicated_downloads', 0)}")
     print(f"❌ Failed Downloads:             {stats['failed_downloads']}")
 
     # Format file size
@@ -0,0 +1,254 @@
+"""
+Virtual results grid for query results
+Keeps records in a columnar buffer and only materializes the visible rows -
+scrolls 1,000,000+ rows smoothly
+"""
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, Iterator, List
+
+
+class ColumnarResultBuffer:
+    """
+    Query results stored column by column.
+
+    One list per field instead of one dict per record: a row costs a
+    pointer per column, and pages can be appended as they arrive.
+    """
+
+    def __init__(self):
+        self.columns: List[str] = []
+        self._values: Dict[str, List] = {}
+        self._row_count = 0
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def append_records(self, records: List[Dict]):
+        """
+        Append a page of cleaned records
+
+        Fields first seen on a later page become new columns (earlier rows
+        are None there).
+        """
+        if not records:
+            return
+
+        for key in dict.fromkeys(key for record in records for key in record):
+            if key not in self._values:
+                self.columns.append(key)
+                self._values[key] = [None] * self._row_count
+
+        for column in self.columns:
+            self._values[column].extend(record.get(column) for record in records)
+        self._row_count += len(records)
+
+    def row_values(self, index: int) -> List:
+        """Get one row's values in column order"""
+        return [self._values[column][index] for column in self.columns]
+
+    def column_values(self, column: str, start: int, stop: int) -> List:
+        """Get a slice of one column"""
+        return self._values[column][start:stop]
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Rebuild the records one at a time (e.g. for export)"""
+        for index in range(self._row_count):
+            yield {column: self._values[column][index] for column in self.columns}
+
+
+class VirtualResultsGrid:
+    """
+    Treeview that only holds the rows currently on screen.
+
+    A fixed set of Treeview items is reused and re-filled from the buffer
+    whenever the viewport moves, so scrolling costs the same for 100 rows
+    or 1,000,000. Column widths are estimated lazily from the rows that
+    have actually been displayed, growing as wider values scroll into view.
+    """
+
+    SCROLL_UNITS_PER_NOTCH = 3
+
+    def __init__(self, parent, min_column_width: int = 100, max_column_width: int = 400,
+                 char_width: int = 8):
+        """
+        Initialize the grid (placed in rows 0-1 / columns 0-1 of parent)
+
+        Args:
+            parent: Container frame (grid row/column 0 should have weight)
+            min_column_width: Narrowest column in pixels
+            max_column_width: Widest a column grows from its values
+            char_width: Estimated pixels per character
+        """
+        self.min_column_width = min_column_width
+        self.max_column_width = max_column_width
+        self.char_width = char_width
+
+        self.buffer = ColumnarResultBuffer()
+        self.first_row = 0
+        self.visible_rows = 0
+        self.column_widths: Dict[str, int] = {}
+        self._slots: List[str] = []  # Treeview item ids reused for the visible rows
+        self._render_pending = False
+
+        self.tree = ttk.Treeview(parent, show="headings", selectmode="browse")
+        self.tree.grid(row=0, column=0, sticky="nsew")
+
+        # Vertical scrollbar drives the buffer offset, not the Treeview
+        self.vsb = ttk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
+        self.vsb.grid(row=0, column=1, sticky="ns")
+
+        # Horizontal scrolling is the Treeview's own
+        self.hsb = ttk.Scrollbar(parent, orient="horizontal", command=self.tree.xview)
+        self.hsb.grid(row=1, column=0, sticky="ew")
+        self.tree.configure(xscrollcommand=self.hsb.set)
+
+        self._setup_bindings()
+
+    def _setup_bindings(self):
+        """Route resize, wheel and paging keys to the virtual viewport"""
+        self.tree.bind("<Configure>", lambda e: self._schedule_render(), add="+")
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-self.SCROLL_UNITS_PER_NOTCH))  # Linux scroll up
+        self.tree.bind("<Button-5>", lambda e: self.scroll(self.SCROLL_UNITS_PER_NOTCH))  # Linux scroll down
+        self.tree.bind("<Prior>", lambda e: self.scroll(-max(1, self.visible_rows - 1)))
+        self.tree.bind("<Next>", lambda e: self.scroll(max(1, self.visible_rows - 1)))
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0))
+        self.tree.bind("<End>", lambda e: self.scroll_to(len(self.buffer)))
+        self.tree.bind("<Up>", lambda e: self._on_arrow(-1))
+        self.tree.bind("<Down>", lambda e: self._on_arrow(1))
+
+    def set_buffer(self, buffer: ColumnarResultBuffer):
+        """
+        Show a new result set
+
+        Args:
+            buffer: Results to display (kept by reference, not copied)
+        """
+        self.buffer = buffer
+        self.first_row = 0
+        self._clear_slots()
+
+        self.tree["columns"] = buffer.columns
+        self.column_widths = {}
+        for column in buffer.columns:
+            width = max(self.min_column_width, len(column) * 10)
+            self.column_widths[column] = width
+            self.tree.heading(column, text=column, anchor="w")
+            self.tree.column(column, width=width, minwidth=self.min_column_width, anchor="w")
+
+        self._schedule_render()
+
+    def clear(self):
+        """Remove all rows and columns"""
+        self.set_buffer(ColumnarResultBuffer())
+
+    def scroll(self, rows: int):
+        """Move the viewport by a number of rows"""
+        return self.scroll_to(self.first_row + rows)
+
+    def scroll_to(self, row: int):
+        """Move the viewport so that row is the first visible one"""
+        last_first_row = max(0, len(self.buffer) - self.visible_rows)
+        row = max(0, min(row, last_first_row))
+        if row != self.first_row:
+            self.first_row = row
+            self._schedule_render()
+        return "break"
+
+    def _on_scrollbar(self, *args):
+        """Translate scrollbar commands (moveto / scroll) to buffer rows"""
+        total = len(self.buffer)
+        if not total:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * total))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= max(1, self.visible_rows - 1)
+            self.scroll(amount)
+
+    def _on_mousewheel(self, event):
+        """Windows reports multiples of 120 per notch, macOS small deltas"""
+        notches = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-notches * self.SCROLL_UNITS_PER_NOTCH)
+
+    def _on_arrow(self, direction: int):
+        """Scroll when the keyboard selection moves past the first/last visible row"""
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self._slots:
+            return None
+
+        position = self._slots.index(selection[0])
+        at_edge = position == 0 if direction < 0 else position == len(self._slots) - 1
+        if not at_edge:
+            return None  # Let the Treeview move the selection itself
+
+        self.scroll(direction)
+        return "break"
+
+    def _schedule_render(self):
+        """Coalesce bursts of scroll events into one render"""
+        if not self._render_pending:
+            self._render_pending = True
+            self.tree.after_idle(self._render)
+
+    def _render(self):
+        """Fill the reused Treeview items with the rows in the viewport"""
+        self._render_pending = False
+        total = len(self.buffer)
+
+        self.visible_rows = self._rows_that_fit()
+        self.first_row = max(0, min(self.first_row, total - self.visible_rows))
+        shown = min(self.visible_rows, total - self.first_row)
+
+        # Grow or shrink the pool of items to the viewport size
+        while len(self._slots) < shown:
+            self._slots.append(self.tree.insert("", "end"))
+        while len(self._slots) > shown:
+            self.tree.delete(self._slots.pop())
+
+        for offset, item_id in enumerate(self._slots):
+            values = self.buffer.row_values(self.first_row + offset)
+            self.tree.item(item_id, values=["" if value is None else value for value in values])
+
+        self.tree.yview_moveto(0)
+        self._grow_column_widths(self.first_row, self.first_row + shown)
+
+        if total:
+            self.vsb.set(self.first_row / total, (self.first_row + shown) / total)
+        else:
+            self.vsb.set(0, 1)
+
+    def _rows_that_fit(self) -> int:
+        """Number of rows the Treeview can show at its current height"""
+        try:
+            row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        except (tk.TclError, ValueError):
+            row_height = 20
+
+        height = self.tree.winfo_height()
+        if height <= 1:
+            # Not mapped yet - render a first screenful, <Configure> corrects it
+            return 25
+        heading_height = row_height + 5
+        return max(1, (height - heading_height) // row_height)
+
+    def _grow_column_widths(self, start: int, stop: int):
+        """Widen columns to fit the rows just displayed (never narrows them)"""
+        for column in self.buffer.columns:
+            longest = max(
+                (len(str(value)) for value in self.buffer.column_values(column, start, stop) if value is not None),
+                default=0
+            )
+            width = min(self.max_column_width, longest * self.char_width + 20)
+            if width > self.column_widths.get(column, 0):
+                self.column_widths[column] = width
+                self.tree.column(column, width=width)
+
+    def _clear_slots(self):
+        """Delete the reused items"""
+        if self._slots:
+            self.tree.delete(*self._slots)
+        self._slots = []
@@ -0,0 +1,114 @@
+"""
+Ordered worker pool for per-object export pipelines
+
+Runs a function over many items on a bounded thread pool and hands results
+back in input order. Log lines written by workers are buffered per item and
+replayed in order on the consuming thread, so progress output never
+interleaves and GUI callbacks are only invoked from one thread.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+
+class OrderedWorkerPool:
+    """Bounded thread pool that yields results in input order"""
+
+    def __init__(self, max_workers: int, emit: Callable[[str], None],
+                 thread_name_prefix: str = 'export-worker'):
+        """
+        Initialize the pool
+
+        Args:
+            max_workers: Maximum items processed in parallel
+            emit: Callback that actually writes a log line (e.g. the GUI status box)
+            thread_name_prefix: Name prefix for worker threads
+        """
+        self.max_workers = max(1, max_workers)
+        self._emit = emit
+        self._thread_name_prefix = thread_name_prefix
+        self._emit_lock = threading.Lock()
+        self._thread_state = threading.local()
+
+    def log(self, message: str):
+        """Log a line - buffered when called from a worker, emitted otherwise"""
+        log_buffer = getattr(self._thread_state, 'log_buffer', None)
+        if log_buffer is not None:
+            log_buffer.append(message)
+            return
+        with self._emit_lock:
+            self._emit(message)
+
+    def imap(self, func: Callable[[Any], Any], items: Sequence[Any],
+             header: Optional[Callable[[int, int, Any], str]] = None,
+             timeout: Optional[float] = None
+             ) -> Iterator[Tuple[int, Any, Any, Optional[Exception]]]:
+        """
+        Apply func to every item concurrently, yielding in input order
+
+        Args:
+            func: Work function (runs on a worker thread)
+            items: Items in output order
+            header: Optional formatter for a progress line logged before each
+                    item's buffered output, called as header(position, total, item)
+            timeout: Optional seconds each item may take, counted from when it
+                     starts running (time spent queued for a free worker does not
+                     count). A late item is reported with a TimeoutError and
+                     abandoned - its thread finishes in the background, still
+                     holding its worker, and its output is discarded.
+
+        Yields:
+            Tuple of (position, item, result or None, error or None)
+        """
+        total = len(items)
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, max(1, total)),
+            thread_name_prefix=self._thread_name_prefix
+        )
+        timed_out = False
+        # Set by each item as it starts, so its timeout excludes queueing
+        start_times: List[Optional[float]] = [None] * total
+        start_events = [threading.Event() for _ in items]
+
+        def run(index: int) -> Tuple[Any, List[str], Optional[Exception]]:
+            start_times[index] = time.monotonic()
+            start_events[index].set()
+            return self._run_buffered(func, items[index])
+
+        try:
+            futures = [executor.submit(run, index) for index in range(total)]
+
+            for i, (item, future) in enumerate(zip(items, futures), 1):
+                try:
+                    remaining = None
+                    if timeout is not None:
+                        start_events[i - 1].wait()
+                        remaining = max(0.0, start_times[i - 1] + timeout - time.monotonic())
+                    result, log_lines, error = future.result(timeout=remaining)
+                except FutureTimeoutError:
+                    timed_out = True
+                    result, log_lines = None, []
+                    error = TimeoutError(f"Timed out after {timeout:.0f}s")
+
+                if header:
+                    self.log(header(i, total, item))
+                for line in log_lines:
+                    self.log(line)
+
+                yield i, item, result, error
+        finally:
+            # Stop queued items if the caller bails out early; never block on
+            # work that already timed out
+            executor.shutdown(wait=not timed_out, cancel_futures=True)
+
+    def _run_buffered(self, func: Callable[[Any], Any], item: Any
+                      ) -> Tuple[Any, List[str], Optional[Exception]]:
+        """Run func on a worker thread, capturing its log lines"""
+        self._thread_state.log_buffer = []
+        try:
+            return func(item), self._thread_state.log_buffer, None
+        except Exception as e:
+            return None, self._thread_state.log_buffer, e
+        finally:
+            self._thread_state.log_buffer = None